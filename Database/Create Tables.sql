@@ -188,3 +188,109 @@ CREATE TABLE public.activitiesschedule (
   as_activity_location character varying,
   CONSTRAINT activitiesschedule_as_activity_id_fkey FOREIGN KEY (as_activity_id) REFERENCES public.groupactivities(activity_id)
 );
+
+-- Tabla de versiones de entidades (ETag de las respuestas del backend)
+-- La mantiene el trigger fn_notify_entity_changed; ev_tag sigue el formato de las etiquetas de caché ('group:5').
+-- Solo tiene filas por entidad; las versiones salen de entityversions_seq y la de una lista ('activities')
+-- es la mayor de las entidades de las que depende (fn_get_entity_versions).
+CREATE SEQUENCE public.entityversions_seq;
+
+CREATE TABLE public.entityversions (
+  ev_tag text PRIMARY KEY,
+  ev_version bigint NOT NULL DEFAULT nextval('public.entityversions_seq'),
+  ev_updated_at timestamp with time zone DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX entityversions_family_idx ON public.entityversions (split_part(ev_tag, ':', 1), ev_version);
+
+-- Bandeja de salida de correos (outbox transaccional)
+-- Las filas se insertan en la misma transacción que el cambio que origina el correo
+-- y las envía el dispatcher del servicio de listener.
+CREATE TABLE public.emailoutbox (
+  email_id bigserial PRIMARY KEY,
+  eo_kind character varying NOT NULL,
+  eo_recipient character varying NOT NULL,
+  eo_payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+  eo_status character varying NOT NULL DEFAULT 'pending',
+  eo_attempts integer NOT NULL DEFAULT 0,
+  eo_available_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  eo_created_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  eo_sent_at timestamp with time zone,
+  eo_last_error text,
+  CONSTRAINT emailoutbox_eo_status_check CHECK (eo_status IN ('pending', 'sent', 'failed'))
+);
+
+CREATE INDEX emailoutbox_pending_idx ON public.emailoutbox (eo_available_at, email_id) WHERE eo_status = 'pending';
+
+-- Subidas de fotos de perfil en segundo plano
+-- La petición de subida crea el trabajo y responde con su ID; el backend sube la imagen, guarda la URL
+-- en el usuario o grupo y marca el trabajo como terminado. Cualquier worker puede informar su estado.
+CREATE TABLE public.imageuploadjobs (
+  job_id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  iuj_user_id integer NOT NULL,
+  iuj_target character varying NOT NULL,
+  iuj_target_id integer NOT NULL,
+  iuj_status character varying NOT NULL DEFAULT 'pending',
+  iuj_url character varying,
+  iuj_error text,
+  iuj_created_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  iuj_finished_at timestamp with time zone,
+  CONSTRAINT imageuploadjobs_iuj_user_id_fkey FOREIGN KEY (iuj_user_id) REFERENCES public.users(user_id),
+  CONSTRAINT imageuploadjobs_iuj_target_check CHECK (iuj_target IN ('user', 'group')),
+  CONSTRAINT imageuploadjobs_iuj_status_check CHECK (iuj_status IN ('pending', 'done', 'failed'))
+);
+
+-- Resúmenes de analítica de clubes (panel de administración)
+-- Los mantiene el trigger fn_club_analytics_changed en la misma transacción que cada cambio en miembros,
+-- actividades, horarios e inscripciones, para que fn_adm_get_member_status, fn_adm_weekly_activity_heatmap y
+-- fn_adm_activity_enrollment_stats lean pocas filas por club en lugar de agregar todo su historial.
+-- fn_rebuild_club_analytics los recalcula desde las tablas de origen (carga inicial o corrección).
+-- Los días y horas se calculan en la zona horaria de fn_analytics_timezone.
+
+-- Miembros aprobados de cada club
+CREATE TABLE public.clubmembersummary (
+  group_id integer PRIMARY KEY,
+  cms_active integer NOT NULL DEFAULT 0,
+  cms_updated_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT clubmembersummary_group_id_fkey FOREIGN KEY (group_id) REFERENCES public.groups(group_id)
+);
+
+-- Por club y día: miembros aprobados que se inscribieron ese día y bajas (eliminados o que dejaron de estar aprobados)
+CREATE TABLE public.clubmemberdaily (
+  group_id integer NOT NULL,
+  cmd_day date NOT NULL,
+  cmd_joined integer NOT NULL DEFAULT 0,
+  cmd_dropped integer NOT NULL DEFAULT 0,
+  CONSTRAINT clubmemberdaily_pkey PRIMARY KEY (group_id, cmd_day),
+  CONSTRAINT clubmemberdaily_group_id_fkey FOREIGN KEY (group_id) REFERENCES public.groups(group_id)
+);
+
+-- Horarios de actividades no canceladas por club, día de la semana (0 = domingo) y hora de inicio
+CREATE TABLE public.clubactivityheatmap (
+  group_id integer NOT NULL,
+  cah_day_of_week smallint NOT NULL,
+  cah_hour_of_day smallint NOT NULL,
+  cah_activity_count integer NOT NULL DEFAULT 0,
+  CONSTRAINT clubactivityheatmap_pkey PRIMARY KEY (group_id, cah_day_of_week, cah_hour_of_day),
+  CONSTRAINT clubactivityheatmap_group_id_fkey FOREIGN KEY (group_id) REFERENCES public.groups(group_id)
+);
+
+-- Inscripciones a actividades por club y día de registro
+CREATE TABLE public.clubenrollmentdaily (
+  group_id integer NOT NULL,
+  ced_day date NOT NULL,
+  ced_enrollments integer NOT NULL DEFAULT 0,
+  CONSTRAINT clubenrollmentdaily_pkey PRIMARY KEY (group_id, ced_day),
+  CONSTRAINT clubenrollmentdaily_group_id_fkey FOREIGN KEY (group_id) REFERENCES public.groups(group_id)
+);
+
+-- Cupos ocupados por actividad, mantenidos por el trigger fn_activity_seats_changed sobre activityparticipants.
+-- Cada inscripción reserva su cupo con un UPDATE condicional sobre esta fila, que serializa solo las
+-- inscripciones de la misma actividad; los cupos restantes son ga_max_participants - acs_taken.
+-- La fila de cada actividad se crea con su primera inscripción a partir de los participantes existentes.
+CREATE TABLE public.activityseats (
+  activity_id integer PRIMARY KEY,
+  acs_taken integer NOT NULL DEFAULT 0,
+  acs_updated_at timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  CONSTRAINT activityseats_activity_id_fkey FOREIGN KEY (activity_id) REFERENCES public.groupactivities(activity_id) ON DELETE CASCADE
+);
@@ -1,30 +1,29 @@
--- Devuelve todas las actividades futuras de los grupos a los que pertenece el usuario
-CREATE OR REPLACE FUNCTION get_upcoming_activities(user_id INT)
+-- Devuelve las actividades futuras de los grupos a los que pertenece el usuario (miembro aprobado), en orden de inicio.
+-- El parámetro se llama p_user_id: con el nombre user_id el filtro "user_id = user_id" comparaba la columna
+-- consigo misma y recorría las membresías de todos los usuarios.
+-- Para el backend usar public.fn_user_upcoming_activities_page (ventana de tiempo y paginación).
+DROP FUNCTION IF EXISTS get_upcoming_activities(INT);
+
+CREATE OR REPLACE FUNCTION get_upcoming_activities(p_user_id INT)
 RETURNS TABLE (
     activity_id INT,
     activity_name VARCHAR,
-    start_date DATE,
+    start_date TIMESTAMP WITH TIME ZONE,
     location VARCHAR
 )
-LANGUAGE plpgsql
+LANGUAGE sql
+STABLE
 AS $$
-BEGIN
-    RETURN QUERY
     SELECT
         a.activity_id,
         a.ga_activity_name,
         s.as_activity_start_date,
         s.as_activity_location
-    FROM groupActivities a
+    FROM groupMembers gm
+    JOIN groupActivities a ON a.ga_group_id = gm.group_id
     JOIN activitiesSchedule s ON s.as_activity_id = a.activity_id
-    WHERE a.ga_group_id IN (
-        SELECT group_id FROM groupMembers
-        WHERE user_id = user_id AND gm_status_id = 2
-    )
-    AND s.as_activity_start_date >= CURRENT_DATE;
-
-EXCEPTION
-    WHEN OTHERS THEN
-        RAISE EXCEPTION 'Error en get_upcoming_activities: %', SQLERRM;
-END;
-$$;
\ No newline at end of file
+    WHERE gm.user_id = p_user_id
+      AND gm.gm_status_id = 2
+      AND s.as_activity_start_date >= CURRENT_DATE
+    ORDER BY s.as_activity_start_date;
+$$;
@@ -0,0 +1,87 @@
+-- FUNCTION: public.fn_activity_seats_changed()
+
+-- DROP FUNCTION IF EXISTS public.fn_activity_seats_changed() CASCADE;
+
+-- Trigger que reserva y libera cupos en activityseats al inscribir o retirar participantes, por cualquier camino
+-- (fn_join_activity, fn_leave_activity o SQL directo), para que ninguna actividad supere ga_max_participants.
+-- - Reserva: un UPDATE condicional (acs_taken < ga_max_participants) sobre la fila de la actividad. Las
+--   inscripciones simultáneas a la misma actividad esperan el bloqueo de esa fila y reevalúan la condición con
+--   el valor ya confirmado, por lo que nunca se sobrepasa el máximo. Las inscripciones a otras actividades no
+--   esperan esta fila, pero las del mismo club comparten filas que se bloquean al confirmar (la del día en
+--   clubenrollmentdaily y 'group_activities:<club>' en entityversions, ambas con triggers diferidos): entre
+--   ellas solo se serializa la confirmación.
+-- - Camino rápido: si una lectura sin bloqueo ya muestra la actividad llena se rechaza sin esperar la fila.
+-- - Sin cupos se lanza check_violation con la restricción 'activityseats_capacity' y se revierte la inscripción;
+--   el backend la reconoce para responder que la actividad está llena, también si fn_join_activity la captura
+--   y la vuelve a lanzar o la devuelve como mensaje (se busca el texto 'La actividad no tiene cupos disponibles').
+-- - La fila de una actividad se crea en su primera reserva contando los participantes existentes.
+-- ga_max_participants NULL es sin límite. Reducir el máximo por debajo de los inscritos no retira a nadie:
+-- solo impide nuevas inscripciones hasta que haya cupos.
+-- Los triggers son BEFORE para que todas las inscripciones y bajas bloqueen primero la fila de cupos, antes que
+-- cualquier otro trigger; las filas de entityversions (fn_notify_entity_changed) y de clubenrollmentdaily
+-- (fn_club_analytics_changed) se bloquean recién al confirmar.
+CREATE OR REPLACE FUNCTION public.fn_activity_seats_changed()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+DECLARE
+	v_capacity integer;
+	v_taken integer;
+BEGIN
+	IF TG_OP <> 'INSERT' THEN
+		UPDATE public.activityseats
+		SET acs_taken = acs_taken - 1,
+			acs_updated_at = CURRENT_TIMESTAMP
+		WHERE activity_id = OLD.ap_activity_id;
+	END IF;
+
+	IF TG_OP <> 'DELETE' THEN
+		SELECT ga.ga_max_participants, s.acs_taken INTO v_capacity, v_taken
+		FROM public.groupactivities ga
+			LEFT JOIN public.activityseats s ON s.activity_id = ga.activity_id
+		WHERE ga.activity_id = NEW.ap_activity_id;
+
+		IF v_capacity IS NOT NULL AND v_taken >= v_capacity THEN
+			RAISE EXCEPTION 'La actividad no tiene cupos disponibles'
+				USING ERRCODE = 'check_violation', CONSTRAINT = 'activityseats_capacity';
+		END IF;
+
+		IF v_taken IS NULL THEN
+			-- Si otra transacción crea la fila a la vez, ON CONFLICT espera a que confirme y no hace nada
+			INSERT INTO public.activityseats (activity_id, acs_taken)
+			SELECT NEW.ap_activity_id, count(*)
+			FROM public.activityparticipants ap
+			WHERE ap.ap_activity_id = NEW.ap_activity_id
+			ON CONFLICT (activity_id) DO NOTHING;
+		END IF;
+
+		UPDATE public.activityseats s
+		SET acs_taken = s.acs_taken + 1,
+			acs_updated_at = CURRENT_TIMESTAMP
+		FROM public.groupactivities ga
+		WHERE s.activity_id = NEW.ap_activity_id
+			AND ga.activity_id = s.activity_id
+			AND (ga.ga_max_participants IS NULL OR s.acs_taken < ga.ga_max_participants);
+
+		IF NOT FOUND THEN
+			RAISE EXCEPTION 'La actividad no tiene cupos disponibles'
+				USING ERRCODE = 'check_violation', CONSTRAINT = 'activityseats_capacity';
+		END IF;
+		RETURN NEW;
+	END IF;
+	RETURN OLD;
+END;
+$BODY$;
+
+DROP TRIGGER IF EXISTS trg_activityparticipants_seats ON public.activityparticipants;
+CREATE TRIGGER trg_activityparticipants_seats
+	BEFORE INSERT OR DELETE ON public.activityparticipants
+	FOR EACH ROW EXECUTE FUNCTION public.fn_activity_seats_changed();
+
+DROP TRIGGER IF EXISTS trg_activityparticipants_seats_moved ON public.activityparticipants;
+CREATE TRIGGER trg_activityparticipants_seats_moved
+	BEFORE UPDATE OF ap_activity_id ON public.activityparticipants
+	FOR EACH ROW
+	WHEN (OLD.ap_activity_id IS DISTINCT FROM NEW.ap_activity_id)
+	EXECUTE FUNCTION public.fn_activity_seats_changed();
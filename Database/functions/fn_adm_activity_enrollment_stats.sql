@@ -0,0 +1,22 @@
+-- FUNCTION: public.fn_adm_activity_enrollment_stats(integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_adm_activity_enrollment_stats(integer);
+
+-- Inscripciones diarias a las actividades de un club durante los últimos 90 días.
+-- Lee el resumen clubenrollmentdaily (a lo sumo 90 filas por club).
+-- Formato: [{"date": "2024-05-01", "enrollments": 7}, ...] ordenado por fecha; los días sin inscripciones no aparecen.
+CREATE OR REPLACE FUNCTION public.fn_adm_activity_enrollment_stats(
+	p_club_id integer)
+    RETURNS json
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+AS $BODY$
+	SELECT COALESCE(json_agg(json_build_object(
+		'date', e.ced_day,
+		'enrollments', e.ced_enrollments
+	) ORDER BY e.ced_day), '[]'::json)
+	FROM public.clubenrollmentdaily e
+	WHERE e.group_id = p_club_id
+		AND e.ced_enrollments > 0
+		AND e.ced_day > (CURRENT_TIMESTAMP AT TIME ZONE public.fn_analytics_timezone())::date - 90;
+$BODY$;
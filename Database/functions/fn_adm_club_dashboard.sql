@@ -0,0 +1,26 @@
+-- FUNCTION: public.fn_adm_club_dashboard(integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_adm_club_dashboard(integer);
+
+-- Datos del panel de administración de un club en una sola llamada:
+-- estadísticas de miembros, mapa de calor semanal, inscripciones, miembros y solicitudes pendientes.
+-- Reúne los resultados de los procedimientos fn_adm_* que usan los endpoints individuales.
+-- Los miembros se devuelven como objetos con los nombres de columna de fn_adm_get_club_members, en orden.
+-- Devuelve NULL si el club no existe (el backend responde 404).
+-- El backend la ejecuta en una transacción REPEATABLE READ de solo lectura para que todas las secciones
+-- correspondan a la misma foto de la base de datos.
+CREATE OR REPLACE FUNCTION public.fn_adm_club_dashboard(
+	p_club_id integer)
+    RETURNS json
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	SELECT json_build_object(
+		'member_stats', public.fn_adm_get_member_status(p_club_id),
+		'heatmap_data', public.fn_adm_weekly_activity_heatmap(p_club_id),
+		'enrollment_data', public.fn_adm_activity_enrollment_stats(p_club_id),
+		'members_data', (SELECT COALESCE(json_agg(row_to_json(m)), '[]'::json) FROM public.fn_adm_get_club_members(p_club_id) m),
+		'requests_data', public.fn_adm_pending_approval_requests(p_club_id)
+	)
+	WHERE EXISTS (SELECT 1 FROM public.groups g WHERE g.group_id = p_club_id);
+$BODY$;
@@ -0,0 +1,23 @@
+-- FUNCTION: public.fn_adm_get_member_status(integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_adm_get_member_status(integer);
+
+-- Estadísticas de miembros de un club para el panel de administración:
+-- miembros aprobados, altas y bajas de los últimos 30 días.
+-- Lee los resúmenes clubmembersummary y clubmemberdaily (una fila y a lo sumo 30 filas por club).
+-- Formato: {"active": 25, "newMembers": 3, "droppedMembers": 1}
+CREATE OR REPLACE FUNCTION public.fn_adm_get_member_status(
+	p_club_id integer)
+    RETURNS json
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+AS $BODY$
+	SELECT json_build_object(
+		'active', COALESCE((SELECT s.cms_active FROM public.clubmembersummary s WHERE s.group_id = p_club_id), 0),
+		'newMembers', COALESCE(sum(d.cmd_joined), 0),
+		'droppedMembers', COALESCE(sum(d.cmd_dropped), 0)
+	)
+	FROM public.clubmemberdaily d
+	WHERE d.group_id = p_club_id
+		AND d.cmd_day > (CURRENT_TIMESTAMP AT TIME ZONE public.fn_analytics_timezone())::date - 30;
+$BODY$;
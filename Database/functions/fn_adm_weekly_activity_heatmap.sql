@@ -0,0 +1,22 @@
+-- FUNCTION: public.fn_adm_weekly_activity_heatmap(integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_adm_weekly_activity_heatmap(integer);
+
+-- Mapa de calor semanal de las actividades (no canceladas) de un club: horarios por día de la semana y hora de inicio.
+-- Lee el resumen clubactivityheatmap (a lo sumo 7 x 24 filas por club).
+-- Formato: [{"day_of_week": 1, "hour_of_day": 18, "activity_count": 4}, ...] con day_of_week 0 = domingo.
+CREATE OR REPLACE FUNCTION public.fn_adm_weekly_activity_heatmap(
+	p_club_id integer)
+    RETURNS json
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+AS $BODY$
+	SELECT COALESCE(json_agg(json_build_object(
+		'day_of_week', h.cah_day_of_week,
+		'hour_of_day', h.cah_hour_of_day,
+		'activity_count', h.cah_activity_count
+	) ORDER BY h.cah_day_of_week, h.cah_hour_of_day), '[]'::json)
+	FROM public.clubactivityheatmap h
+	WHERE h.group_id = p_club_id
+		AND h.cah_activity_count > 0;
+$BODY$;
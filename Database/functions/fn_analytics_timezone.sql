@@ -0,0 +1,16 @@
+-- FUNCTION: public.fn_analytics_timezone()
+
+-- DROP FUNCTION IF EXISTS public.fn_analytics_timezone();
+
+-- Zona horaria con la que se agrupan por día y hora los resúmenes de analítica de clubes.
+-- Se toma del parámetro app.analytics_timezone (UTC si no está definido) y no de la zona de la sesión,
+-- para que todas las conexiones guarden los mismos días. Se configura con:
+--   ALTER DATABASE <base> SET app.analytics_timezone = 'America/Bogota';
+-- Después de cambiarla hay que ejecutar fn_rebuild_club_analytics().
+CREATE OR REPLACE FUNCTION public.fn_analytics_timezone()
+    RETURNS text
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+AS $BODY$
+	SELECT COALESCE(NULLIF(current_setting('app.analytics_timezone', true), ''), 'UTC');
+$BODY$;
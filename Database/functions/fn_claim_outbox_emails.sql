@@ -0,0 +1,31 @@
+-- FUNCTION: public.fn_claim_outbox_emails(integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_claim_outbox_emails(integer, integer);
+
+-- Reserva hasta p_limit correos pendientes para enviarlos.
+-- FOR UPDATE SKIP LOCKED permite varios dispatchers sin que tomen las mismas filas.
+-- La reserva no mantiene la transacción abierta durante el envío: se posterga eo_available_at p_lease_seconds,
+-- de modo que si el dispatcher muere los correos vuelven a estar disponibles al vencer la reserva.
+CREATE OR REPLACE FUNCTION public.fn_claim_outbox_emails(
+	p_limit integer,
+	p_lease_seconds integer DEFAULT 300)
+    RETURNS TABLE(email_id bigint, kind character varying, recipient character varying, payload jsonb, attempts integer) 
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	WITH claimed AS (
+		SELECT eo.email_id
+		FROM public.emailoutbox eo
+		WHERE eo.eo_status = 'pending'
+			AND eo.eo_available_at <= CURRENT_TIMESTAMP
+		ORDER BY eo.eo_available_at, eo.email_id
+		LIMIT p_limit
+		FOR UPDATE SKIP LOCKED
+	)
+	UPDATE public.emailoutbox eo
+	SET eo_attempts = eo.eo_attempts + 1,
+		eo_available_at = CURRENT_TIMESTAMP + make_interval(secs => p_lease_seconds)
+	FROM claimed
+	WHERE eo.email_id = claimed.email_id
+	RETURNING eo.email_id, eo.eo_kind, eo.eo_recipient, eo.eo_payload, eo.eo_attempts;
+$BODY$;
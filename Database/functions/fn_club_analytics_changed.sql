@@ -0,0 +1,204 @@
+-- FUNCTION: public.fn_club_analytics_changed()
+
+-- DROP FUNCTION IF EXISTS public.fn_club_analytics_changed() CASCADE;
+
+-- Trigger que mantiene los resúmenes de analítica de clubes (clubmembersummary, clubmemberdaily,
+-- clubactivityheatmap, clubenrollmentdaily) en la misma transacción que el cambio de origen.
+-- Cada fila de origen resta su aporte anterior (OLD) y suma el nuevo (NEW), por lo que los resúmenes
+-- siempre coinciden con lo que calcularía fn_rebuild_club_analytics, salvo las bajas de miembros,
+-- que solo se pueden registrar en el momento en que ocurren.
+-- Requiere una carga inicial con fn_rebuild_club_analytics() al instalarse.
+-- Las filas de horarios e inscripciones bloquean su actividad (FOR SHARE) para no cruzarse con un cambio
+-- simultáneo de club o de estado, que mueve todos sus aportes.
+-- El trigger de inscripciones es diferido (se ejecuta al confirmar): la fila (club, día) de clubenrollmentdaily
+-- la comparten todas las inscripciones del club en el día, y así solo queda bloqueada durante la confirmación
+-- y no durante toda la transacción de fn_join_activity. Una misma transacción que inscribe participantes y
+-- luego cambia de club su actividad los cuenta dos veces; fn_rebuild_club_analytics lo corrige.
+--   groupmembers          miembros aprobados (estado 2), altas por día de inscripción y bajas por día
+-- Las filas sin fecha (gm_signup_date, ap_registration_date o as_activity_start_date NULL) solo cuentan en
+-- clubmembersummary: no tienen día ni hora en los resúmenes diarios y el mapa de calor.
+--   activitiesschedule    mapa de calor por día de la semana y hora de inicio (actividades no canceladas)
+--   activityparticipants  inscripciones por día de registro
+--   groupactivities       cambio de club o de estado de una actividad: mueve sus horarios e inscripciones
+CREATE OR REPLACE FUNCTION public.fn_club_analytics_changed()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+DECLARE
+	v_tz text := public.fn_analytics_timezone();
+	v_today date := (CURRENT_TIMESTAMP AT TIME ZONE v_tz)::date;
+	v_group_id integer;
+	v_status integer;
+BEGIN
+	CASE TG_TABLE_NAME
+		WHEN 'groupmembers' THEN
+			IF TG_OP <> 'INSERT' AND OLD.gm_status_id = 2 THEN
+				UPDATE public.clubmembersummary
+				SET cms_active = cms_active - 1,
+					cms_updated_at = CURRENT_TIMESTAMP
+				WHERE group_id = OLD.group_id;
+				IF OLD.gm_signup_date IS NOT NULL THEN
+					UPDATE public.clubmemberdaily
+					SET cmd_joined = cmd_joined - 1
+					WHERE group_id = OLD.group_id
+						AND cmd_day = (OLD.gm_signup_date AT TIME ZONE v_tz)::date;
+				END IF;
+				-- Baja: el miembro se elimina, deja de estar aprobado o pasa a otro club
+				IF TG_OP = 'DELETE' OR NEW.gm_status_id <> 2 OR NEW.group_id <> OLD.group_id THEN
+					INSERT INTO public.clubmemberdaily AS d (group_id, cmd_day, cmd_dropped)
+					VALUES (OLD.group_id, v_today, 1)
+					ON CONFLICT (group_id, cmd_day) DO UPDATE
+						SET cmd_dropped = d.cmd_dropped + 1;
+				END IF;
+			END IF;
+			IF TG_OP <> 'DELETE' AND NEW.gm_status_id = 2 THEN
+				INSERT INTO public.clubmembersummary AS s (group_id, cms_active)
+				VALUES (NEW.group_id, 1)
+				ON CONFLICT (group_id) DO UPDATE
+					SET cms_active = s.cms_active + 1,
+						cms_updated_at = CURRENT_TIMESTAMP;
+				IF NEW.gm_signup_date IS NOT NULL THEN
+					INSERT INTO public.clubmemberdaily AS d (group_id, cmd_day, cmd_joined)
+					VALUES (NEW.group_id, (NEW.gm_signup_date AT TIME ZONE v_tz)::date, 1)
+					ON CONFLICT (group_id, cmd_day) DO UPDATE
+						SET cmd_joined = d.cmd_joined + 1;
+				END IF;
+			END IF;
+
+		WHEN 'activitiesschedule' THEN
+			IF TG_OP <> 'INSERT' AND OLD.as_activity_start_date IS NOT NULL THEN
+				SELECT ga.ga_group_id, ga.ga_activity_status INTO v_group_id, v_status
+				FROM public.groupactivities ga
+				WHERE ga.activity_id = OLD.as_activity_id
+				FOR SHARE;
+				IF v_status <> 3 THEN
+					UPDATE public.clubactivityheatmap
+					SET cah_activity_count = cah_activity_count - 1
+					WHERE group_id = v_group_id
+						AND cah_day_of_week = EXTRACT(DOW FROM OLD.as_activity_start_date AT TIME ZONE v_tz)
+						AND cah_hour_of_day = EXTRACT(HOUR FROM OLD.as_activity_start_date AT TIME ZONE v_tz);
+				END IF;
+			END IF;
+			IF TG_OP <> 'DELETE' AND NEW.as_activity_start_date IS NOT NULL THEN
+				SELECT ga.ga_group_id, ga.ga_activity_status INTO v_group_id, v_status
+				FROM public.groupactivities ga
+				WHERE ga.activity_id = NEW.as_activity_id
+				FOR SHARE;
+				IF v_status <> 3 THEN
+					INSERT INTO public.clubactivityheatmap AS h (group_id, cah_day_of_week, cah_hour_of_day, cah_activity_count)
+					VALUES (v_group_id,
+						EXTRACT(DOW FROM NEW.as_activity_start_date AT TIME ZONE v_tz),
+						EXTRACT(HOUR FROM NEW.as_activity_start_date AT TIME ZONE v_tz),
+						1)
+					ON CONFLICT (group_id, cah_day_of_week, cah_hour_of_day) DO UPDATE
+						SET cah_activity_count = h.cah_activity_count + 1;
+				END IF;
+			END IF;
+
+		WHEN 'activityparticipants' THEN
+			IF TG_OP <> 'INSERT' AND OLD.ap_registration_date IS NOT NULL THEN
+				SELECT ga.ga_group_id INTO v_group_id
+				FROM public.groupactivities ga
+				WHERE ga.activity_id = OLD.ap_activity_id
+				FOR SHARE;
+				UPDATE public.clubenrollmentdaily
+				SET ced_enrollments = ced_enrollments - 1
+				WHERE group_id = v_group_id
+					AND ced_day = (OLD.ap_registration_date AT TIME ZONE v_tz)::date;
+			END IF;
+			IF TG_OP <> 'DELETE' AND NEW.ap_registration_date IS NOT NULL THEN
+				SELECT ga.ga_group_id INTO v_group_id
+				FROM public.groupactivities ga
+				WHERE ga.activity_id = NEW.ap_activity_id
+				FOR SHARE;
+				INSERT INTO public.clubenrollmentdaily AS e (group_id, ced_day, ced_enrollments)
+				VALUES (v_group_id, (NEW.ap_registration_date AT TIME ZONE v_tz)::date, 1)
+				ON CONFLICT (group_id, ced_day) DO UPDATE
+					SET ced_enrollments = e.ced_enrollments + 1;
+			END IF;
+
+		WHEN 'groupactivities' THEN
+			-- Solo UPDATE: una actividad nueva aún no tiene horarios ni inscripciones y, por las llaves foráneas,
+			-- los suyos se eliminan (y se descuentan con sus propios triggers) antes que ella
+			IF OLD.ga_activity_status <> 3 THEN
+				UPDATE public.clubactivityheatmap h
+				SET cah_activity_count = h.cah_activity_count - s.activity_count
+				FROM (
+					SELECT EXTRACT(DOW FROM sc.as_activity_start_date AT TIME ZONE v_tz) AS day_of_week,
+						EXTRACT(HOUR FROM sc.as_activity_start_date AT TIME ZONE v_tz) AS hour_of_day,
+						count(*) AS activity_count
+					FROM public.activitiesschedule sc
+					WHERE sc.as_activity_id = OLD.activity_id
+						AND sc.as_activity_start_date IS NOT NULL
+					GROUP BY 1, 2
+				) s
+				WHERE h.group_id = OLD.ga_group_id
+					AND h.cah_day_of_week = s.day_of_week
+					AND h.cah_hour_of_day = s.hour_of_day;
+			END IF;
+			IF NEW.ga_activity_status <> 3 THEN
+				INSERT INTO public.clubactivityheatmap AS h (group_id, cah_day_of_week, cah_hour_of_day, cah_activity_count)
+				SELECT NEW.ga_group_id,
+					EXTRACT(DOW FROM sc.as_activity_start_date AT TIME ZONE v_tz),
+					EXTRACT(HOUR FROM sc.as_activity_start_date AT TIME ZONE v_tz),
+					count(*)
+				FROM public.activitiesschedule sc
+				WHERE sc.as_activity_id = NEW.activity_id
+					AND sc.as_activity_start_date IS NOT NULL
+				GROUP BY 1, 2, 3
+				ON CONFLICT (group_id, cah_day_of_week, cah_hour_of_day) DO UPDATE
+					SET cah_activity_count = h.cah_activity_count + EXCLUDED.cah_activity_count;
+			END IF;
+			IF NEW.ga_group_id <> OLD.ga_group_id THEN
+				UPDATE public.clubenrollmentdaily e
+				SET ced_enrollments = e.ced_enrollments - p.enrollments
+				FROM (
+					SELECT (ap.ap_registration_date AT TIME ZONE v_tz)::date AS day, count(*) AS enrollments
+					FROM public.activityparticipants ap
+					WHERE ap.ap_activity_id = OLD.activity_id
+						AND ap.ap_registration_date IS NOT NULL
+					GROUP BY 1
+				) p
+				WHERE e.group_id = OLD.ga_group_id
+					AND e.ced_day = p.day;
+				INSERT INTO public.clubenrollmentdaily AS e (group_id, ced_day, ced_enrollments)
+				SELECT NEW.ga_group_id, (ap.ap_registration_date AT TIME ZONE v_tz)::date, count(*)
+				FROM public.activityparticipants ap
+				WHERE ap.ap_activity_id = NEW.activity_id
+					AND ap.ap_registration_date IS NOT NULL
+				GROUP BY 1, 2
+				ON CONFLICT (group_id, ced_day) DO UPDATE
+					SET ced_enrollments = e.ced_enrollments + EXCLUDED.ced_enrollments;
+			END IF;
+
+		ELSE
+			RETURN NULL;
+	END CASE;
+	RETURN NULL;
+END;
+$BODY$;
+
+DROP TRIGGER IF EXISTS trg_groupmembers_club_analytics ON public.groupmembers;
+CREATE TRIGGER trg_groupmembers_club_analytics
+	AFTER INSERT OR DELETE OR UPDATE OF gm_status_id, group_id, gm_signup_date ON public.groupmembers
+	FOR EACH ROW EXECUTE FUNCTION public.fn_club_analytics_changed();
+
+DROP TRIGGER IF EXISTS trg_activitiesschedule_club_analytics ON public.activitiesschedule;
+CREATE TRIGGER trg_activitiesschedule_club_analytics
+	AFTER INSERT OR DELETE OR UPDATE OF as_activity_id, as_activity_start_date ON public.activitiesschedule
+	FOR EACH ROW EXECUTE FUNCTION public.fn_club_analytics_changed();
+
+DROP TRIGGER IF EXISTS trg_activityparticipants_club_analytics ON public.activityparticipants;
+CREATE CONSTRAINT TRIGGER trg_activityparticipants_club_analytics
+	AFTER INSERT OR DELETE OR UPDATE OF ap_activity_id, ap_registration_date ON public.activityparticipants
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_club_analytics_changed();
+
+DROP TRIGGER IF EXISTS trg_groupactivities_club_analytics ON public.groupactivities;
+CREATE TRIGGER trg_groupactivities_club_analytics
+	AFTER UPDATE OF ga_group_id, ga_activity_status ON public.groupactivities
+	FOR EACH ROW
+	WHEN (OLD.ga_group_id IS DISTINCT FROM NEW.ga_group_id
+		OR (OLD.ga_activity_status = 3) IS DISTINCT FROM (NEW.ga_activity_status = 3))
+	EXECUTE FUNCTION public.fn_club_analytics_changed();
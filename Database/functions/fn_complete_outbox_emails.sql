@@ -0,0 +1,30 @@
+-- FUNCTION: public.fn_complete_outbox_emails(bigint[], bigint[], text[], integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_complete_outbox_emails(bigint[], bigint[], text[], integer);
+
+-- Registra el resultado de un lote enviado por el dispatcher.
+-- p_sent_ids: correos enviados.
+-- p_failed_ids / p_errors: correos fallidos y su error (mismo orden). Se reintentan con espera exponencial
+-- hasta p_max_attempts intentos; después quedan en estado 'failed'.
+CREATE OR REPLACE FUNCTION public.fn_complete_outbox_emails(
+	p_sent_ids bigint[],
+	p_failed_ids bigint[] DEFAULT '{}',
+	p_errors text[] DEFAULT '{}',
+	p_max_attempts integer DEFAULT 5)
+    RETURNS void
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	UPDATE public.emailoutbox
+	SET eo_status = 'sent',
+		eo_sent_at = CURRENT_TIMESTAMP,
+		eo_last_error = NULL
+	WHERE email_id = ANY(p_sent_ids);
+
+	UPDATE public.emailoutbox eo
+	SET eo_status = CASE WHEN eo.eo_attempts >= p_max_attempts THEN 'failed' ELSE 'pending' END,
+		eo_available_at = CURRENT_TIMESTAMP + make_interval(secs => LEAST(30 * power(2, eo.eo_attempts - 1), 3600)),
+		eo_last_error = f.error
+	FROM unnest(p_failed_ids, p_errors) AS f(email_id, error)
+	WHERE eo.email_id = f.email_id;
+$BODY$;
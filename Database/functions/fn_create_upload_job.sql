@@ -0,0 +1,27 @@
+-- FUNCTION: public.fn_create_upload_job(integer, character varying, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_create_upload_job(integer, character varying, integer);
+
+-- Registra una subida de foto de perfil pendiente y devuelve su ID.
+-- p_target: 'user' (foto del usuario p_user_id) o 'group' (foto del grupo p_target_id).
+-- La foto de un grupo solo la puede cambiar su dueño: si p_user_id no lo es, no se registra nada y devuelve NULL,
+-- antes de guardar o encolar la imagen.
+CREATE OR REPLACE FUNCTION public.fn_create_upload_job(
+	p_user_id integer,
+	p_target character varying,
+	p_target_id integer)
+    RETURNS uuid
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	INSERT INTO public.imageuploadjobs (iuj_user_id, iuj_target, iuj_target_id)
+	SELECT p_user_id, p_target, p_target_id
+	WHERE p_target <> 'group'
+		OR EXISTS (
+			SELECT 1
+			FROM public.groups g
+			WHERE g.group_id = p_target_id
+				AND g.g_group_owner_id = p_user_id
+		)
+	RETURNING job_id;
+$BODY$;
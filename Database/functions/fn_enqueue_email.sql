@@ -0,0 +1,25 @@
+-- FUNCTION: public.fn_enqueue_email(character varying, character varying, jsonb)
+
+-- DROP FUNCTION IF EXISTS public.fn_enqueue_email(character varying, character varying, jsonb);
+
+-- Agrega un correo a la bandeja de salida. Debe llamarse en la misma transacción que el cambio que lo origina.
+-- La notificación 'outbox_email' despierta al dispatcher cuando la transacción se confirma.
+CREATE OR REPLACE FUNCTION public.fn_enqueue_email(
+	p_kind character varying,
+	p_recipient character varying,
+	p_payload jsonb DEFAULT '{}'::jsonb)
+    RETURNS bigint
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+DECLARE
+	v_email_id bigint;
+BEGIN
+	INSERT INTO public.emailoutbox (eo_kind, eo_recipient, eo_payload)
+	VALUES (p_kind, p_recipient, COALESCE(p_payload, '{}'::jsonb))
+	RETURNING email_id INTO v_email_id;
+
+	PERFORM pg_notify('database_events', json_build_object('event', 'outbox_email')::text);
+	RETURN v_email_id;
+END;
+$BODY$;
@@ -0,0 +1,23 @@
+-- FUNCTION: public.fn_entity_version_sources(text)
+
+-- DROP FUNCTION IF EXISTS public.fn_entity_version_sources(text);
+
+-- Familias de etiquetas por entidad de las que depende la versión de una etiqueta sin ID (ver fn_get_entity_versions):
+--   groups       lista de clubes: cualquier club ('group:<id>') o el nombre de un usuario ('user:<id>')
+--   activities   lista de actividades: las actividades de cualquier club ('group_activities:<id>') o un usuario
+--   otras        familias ('activity', 'group_members', ...): solo cambian todas juntas al renombrar un usuario
+-- fn_notify_entity_changed incrementa 'group_activities:<id>' con todo cambio de una actividad, sus horarios o
+-- sus participantes, y 'group:<id>' con todo cambio de un club o de sus miembros.
+CREATE OR REPLACE FUNCTION public.fn_entity_version_sources(
+	p_tag text)
+    RETURNS text[]
+    LANGUAGE 'sql'
+    IMMUTABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT CASE p_tag
+		WHEN 'groups' THEN ARRAY['group', 'user']
+		WHEN 'activities' THEN ARRAY['group_activities', 'user']
+		ELSE ARRAY['user']
+	END;
+$BODY$;
@@ -0,0 +1,20 @@
+-- FUNCTION: public.fn_finish_upload_job(uuid, character varying, text)
+
+-- DROP FUNCTION IF EXISTS public.fn_finish_upload_job(uuid, character varying, text);
+
+-- Registra el resultado de una subida: con p_url queda 'done', con p_error queda 'failed'.
+CREATE OR REPLACE FUNCTION public.fn_finish_upload_job(
+	p_job_id uuid,
+	p_url character varying,
+	p_error text DEFAULT NULL)
+    RETURNS void
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	UPDATE public.imageuploadjobs
+	SET iuj_status = CASE WHEN p_url IS NOT NULL THEN 'done' ELSE 'failed' END,
+		iuj_url = p_url,
+		iuj_error = p_error,
+		iuj_finished_at = CURRENT_TIMESTAMP
+	WHERE job_id = p_job_id;
+$BODY$;
@@ -0,0 +1,33 @@
+-- FUNCTION: public.fn_get_catalogs()
+
+-- DROP FUNCTION IF EXISTS public.fn_get_catalogs();
+
+-- Devuelve en una sola consulta el contenido de todas las tablas de catálogo (ver insert_catalogos.sql).
+-- El backend las mantiene en memoria y resuelve los IDs a nombres sin volver a consultar la base de datos.
+CREATE OR REPLACE FUNCTION public.fn_get_catalogs()
+    RETURNS TABLE(catalog text, item_id integer, item_name character varying, item_description text) 
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT 'usertypes', type_id, ut_type_name, ut_description FROM public.usertypes
+	UNION ALL
+	SELECT 'userstatus', user_status_id, us_status_name, us_description FROM public.userstatus
+	UNION ALL
+	SELECT 'documenttypes', document_type_id, dt_type_name, dt_description FROM public.documenttypes
+	UNION ALL
+	SELECT 'gendertypes', gender_id, g_gender_name, g_description FROM public.gendertypes
+	UNION ALL
+	SELECT 'groupcategories', group_category_id, gc_category_name, gc_description FROM public.groupcategories
+	UNION ALL
+	SELECT 'groupstatus', group_status_id, gs_status_name, gs_description FROM public.groupstatus
+	UNION ALL
+	SELECT 'groupmemberstatus', group_member_status_id, gms_status_name, gms_description FROM public.groupmemberstatus
+	UNION ALL
+	SELECT 'memberroles', role_id, mr_role_name, mr_description FROM public.memberroles
+	UNION ALL
+	SELECT 'activitytypes', activity_type_id, at_activity_type_name, at_description FROM public.activitytypes
+	UNION ALL
+	SELECT 'activitystatus', activity_status_id, as_activity_status_name, NULL::text FROM public.activitystatus
+	ORDER BY 1, 2;
+$BODY$;
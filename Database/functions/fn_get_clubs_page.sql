@@ -0,0 +1,36 @@
+-- FUNCTION: public.fn_get_clubs_page(integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_get_clubs_page(integer, integer);
+
+-- Página de clubes/grupos ordenada por group_id (paginación keyset).
+-- p_after_id: último group_id entregado (NULL para la primera página).
+-- p_limit: tamaño de la página (NULL devuelve todas las filas restantes).
+-- La categoría y el estado se devuelven como IDs; el backend los resuelve con su caché de catálogos.
+-- creation_date y logo_url no forman parte de la tabla groups en "Create Tables.sql", por lo que se devuelven NULL.
+CREATE OR REPLACE FUNCTION public.fn_get_clubs_page(
+	p_after_id integer DEFAULT NULL,
+	p_limit integer DEFAULT NULL)
+    RETURNS TABLE(group_id integer, group_name character varying, group_description text, owner_name text, creation_date timestamp with time zone, logo_url character varying, group_category_id integer, group_status_id integer, members_count bigint) 
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT
+		g.group_id,
+		g.g_group_name,
+		g.g_group_description,
+		u.u_name || ' ' || u.u_last_name AS owner_name,
+		NULL::timestamp with time zone AS creation_date,
+		NULL::character varying AS logo_url,
+		g.g_group_category_id,
+		g.g_group_status_id,
+		(SELECT COUNT(*) FROM public.groupmembers gm WHERE gm.group_id = g.group_id AND gm.gm_status_id = 2) AS members_count
+	FROM
+		public.groups g
+			INNER JOIN public.users u ON u.user_id = g.g_group_owner_id
+	WHERE
+		g.group_id > COALESCE(p_after_id, 0)
+	ORDER BY
+		g.group_id
+	LIMIT p_limit;
+$BODY$;
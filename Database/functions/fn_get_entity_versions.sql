@@ -0,0 +1,37 @@
+-- FUNCTION: public.fn_get_entity_versions(text[])
+
+-- DROP FUNCTION IF EXISTS public.fn_get_entity_versions(text[]);
+
+-- Devuelve la versión actual de las etiquetas de entidad solicitadas.
+-- Las etiquetas con ID ('activity:12') se leen de entityversions; las de listas y familias ('activities',
+-- 'activity') no tienen fila: su versión es la mayor de las familias de las que dependen
+-- (fn_entity_version_sources), que como salen de entityversions_seq crece con cada cambio confirmado.
+-- Las etiquetas que nunca han cambiado no aparecen en el resultado (el backend las considera versión 0).
+CREATE OR REPLACE FUNCTION public.fn_get_entity_versions(
+	p_tags text[])
+    RETURNS TABLE(tag text, version bigint) 
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT ev.ev_tag, ev.ev_version
+	FROM public.entityversions ev
+	WHERE ev.ev_tag = ANY(p_tags)
+	UNION ALL
+	SELECT t.tag, v.version
+	FROM unnest(p_tags) AS t(tag)
+		CROSS JOIN LATERAL (
+			SELECT max(latest.ev_version) AS version
+			FROM unnest(public.fn_entity_version_sources(t.tag)) AS f(family)
+				CROSS JOIN LATERAL (
+					-- Recorrido descendente de entityversions_family_idx: una fila por familia
+					SELECT ev.ev_version
+					FROM public.entityversions ev
+					WHERE split_part(ev.ev_tag, ':', 1) = f.family
+					ORDER BY split_part(ev.ev_tag, ':', 1) DESC, ev.ev_version DESC
+					LIMIT 1
+				) latest
+		) v
+	WHERE strpos(t.tag, ':') = 0
+		AND v.version IS NOT NULL;
+$BODY$;
@@ -0,0 +1,38 @@
+-- FUNCTION: public.fn_get_upload_job(uuid, integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_get_upload_job(uuid, integer, integer);
+
+-- Estado de una subida del usuario p_user_id.
+-- Una subida pendiente por más de p_stale_seconds (p. ej. porque el worker que la atendía se reinició)
+-- se informa como 'failed'.
+CREATE OR REPLACE FUNCTION public.fn_get_upload_job(
+	p_job_id uuid,
+	p_user_id integer,
+	p_stale_seconds integer DEFAULT 300)
+    RETURNS TABLE(job_id uuid, status character varying, url character varying, error text, target character varying, target_id integer, created_at timestamp with time zone, finished_at timestamp with time zone) 
+    LANGUAGE 'sql'
+    STABLE
+AS $BODY$
+	SELECT
+		j.job_id,
+		CASE
+			WHEN j.iuj_status = 'pending' AND j.iuj_created_at < CURRENT_TIMESTAMP - make_interval(secs => p_stale_seconds)
+				THEN 'failed'::character varying
+			ELSE j.iuj_status
+		END,
+		j.iuj_url,
+		CASE
+			WHEN j.iuj_status = 'pending' AND j.iuj_created_at < CURRENT_TIMESTAMP - make_interval(secs => p_stale_seconds)
+				THEN 'La subida no terminó a tiempo'
+			ELSE j.iuj_error
+		END,
+		j.iuj_target,
+		j.iuj_target_id,
+		j.iuj_created_at,
+		j.iuj_finished_at
+	FROM
+		public.imageuploadjobs j
+	WHERE
+		j.job_id = p_job_id
+		AND j.iuj_user_id = p_user_id;
+$BODY$;
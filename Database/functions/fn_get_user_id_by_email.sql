@@ -0,0 +1,17 @@
+-- FUNCTION: public.fn_get_user_id_by_email(character varying)
+
+-- DROP FUNCTION IF EXISTS public.fn_get_user_id_by_email(character varying);
+
+-- Devuelve el ID del usuario con el correo indicado, o NULL si no existe.
+-- Se usa tras restablecer la contraseña por correo para avisar la revocación de sus refresh tokens.
+CREATE OR REPLACE FUNCTION public.fn_get_user_id_by_email(
+	p_email character varying)
+    RETURNS integer
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT u.user_id
+	FROM public.users u
+	WHERE u.u_email = p_email;
+$BODY$;
@@ -0,0 +1,67 @@
+-- FUNCTION: public.fn_notify_catalogs_changed()
+
+-- DROP FUNCTION IF EXISTS public.fn_notify_catalogs_changed() CASCADE;
+
+-- Trigger de sentencia que avisa a los procesos web que cambió alguna tabla de catálogo (ver fn_get_catalogs),
+-- para que descarten su copia en memoria (utils/catalogs.py) sin esperar el TTL.
+-- Formato del mensaje: {"event": "catalogs_changed", "catalog": "activitytypes"}
+CREATE OR REPLACE FUNCTION public.fn_notify_catalogs_changed()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+BEGIN
+	PERFORM pg_notify('database_events', json_build_object('event', 'catalogs_changed', 'catalog', TG_TABLE_NAME)::text);
+	RETURN NULL;
+END;
+$BODY$;
+
+DROP TRIGGER IF EXISTS trg_usertypes_catalogs_changed ON public.usertypes;
+CREATE TRIGGER trg_usertypes_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.usertypes
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_userstatus_catalogs_changed ON public.userstatus;
+CREATE TRIGGER trg_userstatus_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.userstatus
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_documenttypes_catalogs_changed ON public.documenttypes;
+CREATE TRIGGER trg_documenttypes_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.documenttypes
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_gendertypes_catalogs_changed ON public.gendertypes;
+CREATE TRIGGER trg_gendertypes_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.gendertypes
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_groupcategories_catalogs_changed ON public.groupcategories;
+CREATE TRIGGER trg_groupcategories_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.groupcategories
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_groupstatus_catalogs_changed ON public.groupstatus;
+CREATE TRIGGER trg_groupstatus_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.groupstatus
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_groupmemberstatus_catalogs_changed ON public.groupmemberstatus;
+CREATE TRIGGER trg_groupmemberstatus_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.groupmemberstatus
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_memberroles_catalogs_changed ON public.memberroles;
+CREATE TRIGGER trg_memberroles_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.memberroles
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_activitytypes_catalogs_changed ON public.activitytypes;
+CREATE TRIGGER trg_activitytypes_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.activitytypes
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
+
+DROP TRIGGER IF EXISTS trg_activitystatus_catalogs_changed ON public.activitystatus;
+CREATE TRIGGER trg_activitystatus_catalogs_changed
+	AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.activitystatus
+	FOR EACH STATEMENT EXECUTE FUNCTION public.fn_notify_catalogs_changed();
@@ -0,0 +1,172 @@
+-- FUNCTION: public.fn_notify_entity_changed()
+
+-- DROP FUNCTION IF EXISTS public.fn_notify_entity_changed() CASCADE;
+
+-- Trigger que incrementa la versión de las etiquetas de entidad afectadas por un cambio (tabla entityversions)
+-- y las publica en el canal 'database_events'.
+-- El backend descarta de su caché de respuestas solo las entradas con esas etiquetas y usa las versiones para los ETag.
+-- Formato del mensaje: {"event": "entity_changed", "tags": ["groups", "group:5", ...], "versions": {"groups": 12, ...},
+--                       "reset": []}
+-- Etiquetas:
+--   groups / group:<id>                  lista y detalle de clubes
+--   activities / activity:<id>           lista y detalle de actividades
+--   group_activities:<id>                actividades de un club
+--   group_members:<id>                   miembros de un club
+--   user_groups:<id>                     clubes a los que pertenece un usuario
+--   user:<id>                            nombre de un usuario (solo versión, para las familias)
+--   <familia> sin ID (p. ej. 'activity') descarta todas las entradas de esa familia
+-- Solo las etiquetas con ID tienen fila en entityversions, y cada transacción bloquea solo las de las entidades
+-- que cambia: las listas y familias no tienen fila (serían una fila que toda inscripción debe bloquear) y su
+-- versión es la mayor de las entidades de las que dependen (fn_entity_version_sources, fn_get_entity_versions).
+-- Las versiones salen de entityversions_seq, por lo que cualquier cambio produce una versión mayor que todas
+-- las anteriores. Los triggers son diferidos: la versión se asigna y las filas se bloquean al confirmar, lo que
+-- deja el orden de las versiones igual al de las confirmaciones salvo por el instante que dura la confirmación.
+-- Si un club con más de 50 actividades cambia, sus actividades se versionan pero el mensaje lleva la familia
+-- 'activity' en "reset" en lugar de sus versiones, para no superar el tamaño máximo de NOTIFY.
+CREATE OR REPLACE FUNCTION public.fn_notify_entity_changed()
+    RETURNS trigger
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+DECLARE
+	v_tags text[] := ARRAY[]::text[];
+	v_activity_id integer;
+	v_group_id integer;
+	-- Actividades que se versionan sin publicar su etiqueta (club con más de 50 actividades)
+	v_activity_tags text[];
+	v_reset text[] := ARRAY[]::text[];
+	v_versions json;
+	v_payload text;
+BEGIN
+	CASE TG_TABLE_NAME
+		WHEN 'groups' THEN
+			v_group_id := COALESCE(NEW.group_id, OLD.group_id);
+			-- El detalle de cada actividad incluye el nombre del club
+			SELECT array_agg('activity:' || ga.activity_id)
+			INTO v_activity_tags
+			FROM public.groupactivities ga
+			WHERE ga.ga_group_id = v_group_id;
+			v_tags := ARRAY['groups', 'group:' || v_group_id, 'activities', 'group_activities:' || v_group_id];
+			IF COALESCE(array_length(v_activity_tags, 1), 0) > 50 THEN
+				v_tags := v_tags || 'activity'::text;
+				v_reset := ARRAY['activity'];
+			ELSE
+				v_tags := v_tags || COALESCE(v_activity_tags, ARRAY[]::text[]);
+				v_activity_tags := NULL;
+			END IF;
+
+		WHEN 'groupmembers' THEN
+			v_tags := ARRAY['groups', 'group:' || COALESCE(NEW.group_id, OLD.group_id),
+				'group_members:' || COALESCE(NEW.group_id, OLD.group_id),
+				'user_groups:' || COALESCE(NEW.user_id, OLD.user_id)];
+			IF TG_OP = 'UPDATE' AND NEW.group_id IS DISTINCT FROM OLD.group_id THEN
+				v_tags := v_tags || ARRAY['group:' || OLD.group_id, 'group_members:' || OLD.group_id];
+			END IF;
+			IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+				v_tags := v_tags || ('user_groups:' || OLD.user_id);
+			END IF;
+
+		WHEN 'groupactivities' THEN
+			v_tags := ARRAY['activities', 'activity:' || COALESCE(NEW.activity_id, OLD.activity_id),
+				'group_activities:' || COALESCE(NEW.ga_group_id, OLD.ga_group_id)];
+			IF TG_OP = 'UPDATE' AND NEW.ga_group_id IS DISTINCT FROM OLD.ga_group_id THEN
+				v_tags := v_tags || ('group_activities:' || OLD.ga_group_id);
+			END IF;
+
+		WHEN 'activitiesschedule', 'activityparticipants' THEN
+			IF TG_TABLE_NAME = 'activitiesschedule' THEN
+				v_activity_id := COALESCE(NEW.as_activity_id, OLD.as_activity_id);
+			ELSE
+				v_activity_id := COALESCE(NEW.ap_activity_id, OLD.ap_activity_id);
+			END IF;
+			SELECT ga.ga_group_id INTO v_group_id
+			FROM public.groupactivities ga
+			WHERE ga.activity_id = v_activity_id;
+			v_tags := ARRAY['activities', 'activity:' || v_activity_id];
+			IF v_group_id IS NOT NULL THEN
+				v_tags := v_tags || ('group_activities:' || v_group_id);
+			END IF;
+
+		WHEN 'users' THEN
+			-- El nombre del dueño/creador y el usuario de cada miembro aparecen en todas las listas
+			v_tags := ARRAY['groups', 'group', 'activities', 'activity', 'group_activities', 'group_members',
+				'user:' || NEW.user_id];
+
+		ELSE
+			RETURN NULL;
+	END CASE;
+
+	-- Solo las etiquetas con ID tienen fila; se ordenan para bloquearlas siempre en el mismo orden
+	WITH bumped AS (
+		INSERT INTO public.entityversions AS ev (ev_tag, ev_version)
+		SELECT d.tag, nextval('public.entityversions_seq')
+		FROM (
+			SELECT DISTINCT t.tag
+			FROM unnest(v_tags || COALESCE(v_activity_tags, ARRAY[]::text[])) AS t(tag)
+			WHERE strpos(t.tag, ':') > 0
+		) d
+		ORDER BY d.tag
+		ON CONFLICT (ev_tag) DO UPDATE
+			SET ev_version = EXCLUDED.ev_version,
+				ev_updated_at = CURRENT_TIMESTAMP
+		RETURNING ev.ev_tag, ev.ev_version
+	),
+	versions AS (
+		SELECT b.ev_tag AS tag, b.ev_version AS version
+		FROM bumped b
+		WHERE b.ev_tag = ANY(v_tags)
+		UNION ALL
+		-- Listas y familias: la mayor versión asignada aquí entre las familias de las que dependen
+		SELECT t.tag, max(b.ev_version)
+		FROM unnest(v_tags) AS t(tag)
+			INNER JOIN bumped b ON split_part(b.ev_tag, ':', 1) = ANY(public.fn_entity_version_sources(t.tag))
+		WHERE strpos(t.tag, ':') = 0
+		GROUP BY t.tag
+	)
+	SELECT json_object_agg(v.tag, v.version) INTO v_versions FROM versions v;
+
+	v_payload := json_build_object('event', 'entity_changed', 'tags', v_tags, 'versions', v_versions,
+		'reset', v_reset)::text;
+	PERFORM pg_notify('database_events', v_payload);
+	RETURN NULL;
+END;
+$BODY$;
+
+DROP TRIGGER IF EXISTS trg_groups_entity_changed ON public.groups;
+CREATE CONSTRAINT TRIGGER trg_groups_entity_changed
+	AFTER INSERT OR UPDATE OR DELETE ON public.groups
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_notify_entity_changed();
+
+DROP TRIGGER IF EXISTS trg_groupmembers_entity_changed ON public.groupmembers;
+CREATE CONSTRAINT TRIGGER trg_groupmembers_entity_changed
+	AFTER INSERT OR UPDATE OR DELETE ON public.groupmembers
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_notify_entity_changed();
+
+DROP TRIGGER IF EXISTS trg_groupactivities_entity_changed ON public.groupactivities;
+CREATE CONSTRAINT TRIGGER trg_groupactivities_entity_changed
+	AFTER INSERT OR UPDATE OR DELETE ON public.groupactivities
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_notify_entity_changed();
+
+DROP TRIGGER IF EXISTS trg_activitiesschedule_entity_changed ON public.activitiesschedule;
+CREATE CONSTRAINT TRIGGER trg_activitiesschedule_entity_changed
+	AFTER INSERT OR UPDATE OR DELETE ON public.activitiesschedule
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_notify_entity_changed();
+
+DROP TRIGGER IF EXISTS trg_activityparticipants_entity_changed ON public.activityparticipants;
+CREATE CONSTRAINT TRIGGER trg_activityparticipants_entity_changed
+	AFTER INSERT OR UPDATE OR DELETE ON public.activityparticipants
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW EXECUTE FUNCTION public.fn_notify_entity_changed();
+
+DROP TRIGGER IF EXISTS trg_users_entity_changed ON public.users;
+CREATE CONSTRAINT TRIGGER trg_users_entity_changed
+	AFTER UPDATE OF u_name, u_last_name, u_username ON public.users
+	DEFERRABLE INITIALLY DEFERRED
+	FOR EACH ROW
+	WHEN (OLD.u_name IS DISTINCT FROM NEW.u_name OR OLD.u_last_name IS DISTINCT FROM NEW.u_last_name
+		OR OLD.u_username IS DISTINCT FROM NEW.u_username)
+	EXECUTE FUNCTION public.fn_notify_entity_changed();
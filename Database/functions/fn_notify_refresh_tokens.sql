@@ -0,0 +1,25 @@
+-- FUNCTION: public.fn_notify_refresh_tokens(integer, character varying, character varying)
+
+-- DROP FUNCTION IF EXISTS public.fn_notify_refresh_tokens(integer, character varying, character varying);
+
+-- Avisa a los procesos web que cambiaron los refresh tokens de un usuario, para mantener su caché de jti.
+-- p_action: 'created' (p_jti es el nuevo token activo y los anteriores dejan de valer) o 'revoked' (todos los
+-- tokens del usuario dejan de valer).
+-- Debe llamarse en la misma transacción que sp_create_user_refresh_token, fn_revoke_user_session,
+-- sp_deactivate_user_tokens o fn_update_user_password_by_email: la notificación solo se entrega si el cambio
+-- se confirma.
+CREATE OR REPLACE FUNCTION public.fn_notify_refresh_tokens(
+	p_user_id integer,
+	p_action character varying,
+	p_jti character varying DEFAULT NULL)
+    RETURNS void
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	SELECT pg_notify('database_events', json_build_object(
+		'event', 'refresh_tokens_changed',
+		'user_id', p_user_id,
+		'action', p_action,
+		'jti', p_jti
+	)::text);
+$BODY$;
@@ -0,0 +1,132 @@
+-- FUNCTION: public.fn_query_activities(integer, integer, integer, integer, timestamp with time zone, timestamp with time zone, boolean, text, timestamp with time zone, integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_query_activities(integer, integer, integer, integer, timestamp with time zone, timestamp with time zone, boolean, text, timestamp with time zone, integer, integer);
+
+-- Listado de actividades con filtros y orden (RF3.2), paginado por keyset.
+-- p_type_id, p_status_id, p_group_id, p_category_id: filtros por tipo, estado, club y categoría del club.
+-- p_from / p_to: solo actividades con algún horario que empiece en [p_from, p_to); activity_datetime es entonces
+--   el primer horario dentro de la ventana (sin ventana, el primer horario de la actividad).
+-- p_with_seats: solo actividades con cupos disponibles (sin máximo o con menos participantes que el máximo).
+-- p_sort: 'id' (activity_id ascendente), 'recent' (más recientes primero) o 'soonest' (por fecha de inicio;
+--   las actividades sin horario van al final).
+-- p_after_start / p_after_id: clave de la última fila entregada (p_after_start solo con 'soonest').
+-- p_limit: tamaño de la página (NULL devuelve todas las filas restantes).
+-- La consulta se arma solo con los filtros presentes y se ejecuta con EXECUTE ... USING, por lo que cada
+-- combinación se planifica con sus propios valores y puede usar los índices que le corresponden: con ventana
+-- se recorren los horarios del rango (activitiesschedule_start_idx); sin ella, las actividades en el orden
+-- de la clave primaria. Los valores nunca se concatenan al texto de la consulta.
+-- El tipo y el estado se devuelven como IDs; el backend los resuelve con su caché de catálogos.
+CREATE OR REPLACE FUNCTION public.fn_query_activities(
+	p_type_id integer DEFAULT NULL,
+	p_status_id integer DEFAULT NULL,
+	p_group_id integer DEFAULT NULL,
+	p_category_id integer DEFAULT NULL,
+	p_from timestamp with time zone DEFAULT NULL,
+	p_to timestamp with time zone DEFAULT NULL,
+	p_with_seats boolean DEFAULT FALSE,
+	p_sort text DEFAULT 'id',
+	p_after_start timestamp with time zone DEFAULT NULL,
+	p_after_id integer DEFAULT NULL,
+	p_limit integer DEFAULT NULL)
+    RETURNS TABLE(activity_id integer, activity_name character varying, activity_description text, max_participants integer, group_id integer, creator_name text, activity_datetime timestamp with time zone, location character varying, participants_count bigint, activity_type_id integer, activity_status_id integer, group_name character varying)
+    LANGUAGE 'plpgsql'
+    STABLE
+AS $BODY$
+DECLARE
+	v_schedule text;
+	v_where text[] := ARRAY['TRUE'];
+	v_order text;
+BEGIN
+	IF p_sort IS NULL OR p_sort NOT IN ('id', 'recent', 'soonest') THEN
+		RAISE EXCEPTION 'Orden de actividades no soportado: %', p_sort USING ERRCODE = 'invalid_parameter_value';
+	END IF;
+
+	IF p_from IS NOT NULL OR p_to IS NOT NULL THEN
+		-- Primer horario de cada actividad dentro de la ventana
+		v_schedule := format($q$
+			INNER JOIN (
+				SELECT DISTINCT ON (sc.as_activity_id) sc.as_activity_id, sc.as_activity_start_date, sc.as_activity_location
+				FROM public.activitiesschedule sc
+				WHERE %s
+				ORDER BY sc.as_activity_id, sc.as_activity_start_date
+			) s ON s.as_activity_id = ga.activity_id$q$,
+			concat_ws(' AND ',
+				CASE WHEN p_from IS NOT NULL THEN 'sc.as_activity_start_date >= $5' END,
+				CASE WHEN p_to IS NOT NULL THEN 'sc.as_activity_start_date < $6' END));
+	ELSE
+		v_schedule := $q$
+			LEFT JOIN LATERAL (
+				SELECT sc.as_activity_start_date, sc.as_activity_location
+				FROM public.activitiesschedule sc
+				WHERE sc.as_activity_id = ga.activity_id
+				ORDER BY sc.as_activity_start_date
+				LIMIT 1
+			) s ON TRUE$q$;
+	END IF;
+
+	IF p_type_id IS NOT NULL THEN
+		v_where := v_where || 'ga.ga_activity_type = $1';
+	END IF;
+	IF p_status_id IS NOT NULL THEN
+		v_where := v_where || 'ga.ga_activity_status = $2';
+	END IF;
+	IF p_group_id IS NOT NULL THEN
+		v_where := v_where || 'ga.ga_group_id = $3';
+	END IF;
+	IF p_category_id IS NOT NULL THEN
+		v_where := v_where || 'g.g_group_category_id = $4';
+	END IF;
+	IF p_with_seats THEN
+		v_where := v_where || '(ga.ga_max_participants IS NULL OR pc.participants_count < ga.ga_max_participants)';
+	END IF;
+
+	CASE p_sort
+		WHEN 'soonest' THEN
+			IF p_after_id IS NOT NULL THEN
+				v_where := v_where || $q$(COALESCE(s.as_activity_start_date, 'infinity'), ga.activity_id) > (COALESCE($9, 'infinity'), $10)$q$;
+			END IF;
+			v_order := $q$COALESCE(s.as_activity_start_date, 'infinity'), ga.activity_id$q$;
+		WHEN 'recent' THEN
+			IF p_after_id IS NOT NULL THEN
+				v_where := v_where || 'ga.activity_id < $10';
+			END IF;
+			v_order := 'ga.activity_id DESC';
+		ELSE
+			IF p_after_id IS NOT NULL THEN
+				v_where := v_where || 'ga.activity_id > $10';
+			END IF;
+			v_order := 'ga.activity_id';
+	END CASE;
+
+	RETURN QUERY EXECUTE format($q$
+		SELECT
+			ga.activity_id,
+			ga.ga_activity_name,
+			ga.ga_activity_description,
+			ga.ga_max_participants,
+			ga.ga_group_id,
+			u.u_name || ' ' || u.u_last_name,
+			s.as_activity_start_date,
+			s.as_activity_location,
+			pc.participants_count,
+			ga.ga_activity_type,
+			ga.ga_activity_status,
+			g.g_group_name
+		FROM
+			public.groupactivities ga
+				INNER JOIN public.groups g ON g.group_id = ga.ga_group_id
+				INNER JOIN public.users u ON u.user_id = ga.ga_creator_id
+				%s
+				CROSS JOIN LATERAL (
+					SELECT COUNT(*) AS participants_count
+					FROM public.activityparticipants ap
+					WHERE ap.ap_activity_id = ga.activity_id
+				) pc
+		WHERE %s
+		ORDER BY %s
+		LIMIT $11$q$,
+		v_schedule, array_to_string(v_where, ' AND '), v_order)
+	USING p_type_id, p_status_id, p_group_id, p_category_id, p_from, p_to, p_with_seats, p_sort,
+		p_after_start, p_after_id, p_limit;
+END;
+$BODY$;
@@ -0,0 +1,89 @@
+-- FUNCTION: public.fn_rebuild_club_analytics(integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_rebuild_club_analytics(integer);
+
+-- Recalcula desde las tablas de origen los resúmenes de analítica de un club, o de todos si p_club_id es NULL.
+-- Se usa para la carga inicial, después de cambiar app.analytics_timezone o para corregir diferencias;
+-- el backend la expone con `python rebuild_club_analytics.py`.
+-- Bloquea las escrituras en las tablas de origen (modo SHARE) hasta el final de la transacción, para que
+-- ningún trigger de fn_club_analytics_changed se aplique sobre un resumen a medio reconstruir.
+-- Las bajas de miembros (cmd_dropped) no se pueden recalcular porque las filas eliminadas ya no existen; se conservan.
+-- Devuelve la cantidad de clubes reconstruidos.
+CREATE OR REPLACE FUNCTION public.fn_rebuild_club_analytics(
+	p_club_id integer DEFAULT NULL)
+    RETURNS integer
+    LANGUAGE 'plpgsql'
+    VOLATILE
+AS $BODY$
+DECLARE
+	v_tz text := public.fn_analytics_timezone();
+	v_clubs integer;
+BEGIN
+	LOCK TABLE public.groupmembers, public.groupactivities, public.activitiesschedule, public.activityparticipants
+		IN SHARE MODE;
+
+	-- Miembros aprobados
+	DELETE FROM public.clubmembersummary
+	WHERE p_club_id IS NULL OR group_id = p_club_id;
+
+	INSERT INTO public.clubmembersummary (group_id, cms_active)
+	SELECT g.group_id, count(gm.user_id)
+	FROM public.groups g
+	LEFT JOIN public.groupmembers gm
+		ON gm.group_id = g.group_id
+		AND gm.gm_status_id = 2
+	WHERE p_club_id IS NULL OR g.group_id = p_club_id
+	GROUP BY g.group_id;
+	GET DIAGNOSTICS v_clubs = ROW_COUNT;
+
+	-- Altas por día de inscripción
+	UPDATE public.clubmemberdaily
+	SET cmd_joined = 0
+	WHERE p_club_id IS NULL OR group_id = p_club_id;
+
+	INSERT INTO public.clubmemberdaily AS d (group_id, cmd_day, cmd_joined)
+	SELECT gm.group_id, (gm.gm_signup_date AT TIME ZONE v_tz)::date, count(*)
+	FROM public.groupmembers gm
+	WHERE gm.gm_status_id = 2
+		AND gm.gm_signup_date IS NOT NULL
+		AND (p_club_id IS NULL OR gm.group_id = p_club_id)
+	GROUP BY 1, 2
+	ON CONFLICT (group_id, cmd_day) DO UPDATE
+		SET cmd_joined = EXCLUDED.cmd_joined;
+
+	DELETE FROM public.clubmemberdaily
+	WHERE cmd_joined = 0
+		AND cmd_dropped = 0
+		AND (p_club_id IS NULL OR group_id = p_club_id);
+
+	-- Mapa de calor de horarios de actividades no canceladas
+	DELETE FROM public.clubactivityheatmap
+	WHERE p_club_id IS NULL OR group_id = p_club_id;
+
+	INSERT INTO public.clubactivityheatmap (group_id, cah_day_of_week, cah_hour_of_day, cah_activity_count)
+	SELECT ga.ga_group_id,
+		EXTRACT(DOW FROM sc.as_activity_start_date AT TIME ZONE v_tz),
+		EXTRACT(HOUR FROM sc.as_activity_start_date AT TIME ZONE v_tz),
+		count(*)
+	FROM public.activitiesschedule sc
+	INNER JOIN public.groupactivities ga ON ga.activity_id = sc.as_activity_id
+	WHERE ga.ga_activity_status <> 3
+		AND sc.as_activity_start_date IS NOT NULL
+		AND (p_club_id IS NULL OR ga.ga_group_id = p_club_id)
+	GROUP BY 1, 2, 3;
+
+	-- Inscripciones por día de registro
+	DELETE FROM public.clubenrollmentdaily
+	WHERE p_club_id IS NULL OR group_id = p_club_id;
+
+	INSERT INTO public.clubenrollmentdaily (group_id, ced_day, ced_enrollments)
+	SELECT ga.ga_group_id, (ap.ap_registration_date AT TIME ZONE v_tz)::date, count(*)
+	FROM public.activityparticipants ap
+	INNER JOIN public.groupactivities ga ON ga.activity_id = ap.ap_activity_id
+	WHERE ap.ap_registration_date IS NOT NULL
+		AND (p_club_id IS NULL OR ga.ga_group_id = p_club_id)
+	GROUP BY 1, 2;
+
+	RETURN v_clubs;
+END;
+$BODY$;
@@ -0,0 +1,25 @@
+-- FUNCTION: public.fn_rehash_user_password(integer, text, text)
+
+-- DROP FUNCTION IF EXISTS public.fn_rehash_user_password(integer, text, text);
+
+-- Reemplaza el hash de la contraseña por uno recalculado con otro costo de bcrypt (misma contraseña).
+-- Solo lo reemplaza si el hash guardado sigue siendo p_old_hash, para no pisar un cambio de contraseña
+-- ocurrido mientras se calculaba. No modifica u_last_password_update porque la contraseña no cambió.
+-- Devuelve si se reemplazó.
+CREATE OR REPLACE FUNCTION public.fn_rehash_user_password(
+	p_user_id integer,
+	p_old_hash text,
+	p_new_hash text)
+    RETURNS boolean
+    LANGUAGE 'sql'
+    VOLATILE
+AS $BODY$
+	WITH updated AS (
+		UPDATE public.users
+		SET u_password = p_new_hash
+		WHERE user_id = p_user_id
+			AND u_password = p_old_hash
+		RETURNING 1
+	)
+	SELECT EXISTS (SELECT 1 FROM updated);
+$BODY$;
@@ -0,0 +1,159 @@
+-- FUNCTION: public.fn_search(text, text, integer, integer, integer, integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_search(text, text, integer, integer, integer, integer, integer);
+
+-- Búsqueda por palabras clave de clubes y actividades (requiere la migración V002__search).
+-- p_query: texto del usuario, con la sintaxis de websearch_to_tsquery ("frase exacta", -excluir, or).
+-- p_type: 'club' o 'activity' (NULL para ambos).
+-- p_category_id: categoría del club (la del club organizador en las actividades).
+-- p_activity_type_id: tipo de actividad (excluye los clubes).
+-- p_status_id: estado del club o de la actividad, según p_type.
+-- p_limit / p_offset: página de resultados, ordenados por relevancia.
+-- Las coincidencias se buscan con los índices GIN de g_search_vector y ga_search_vector; si no hay ninguna,
+-- se recurre a la similitud de trigramas sobre los nombres (índices gin_trgm_ops) y "fuzzy" es true.
+-- Cada faceta cuenta las coincidencias con todos los filtros salvo el propio, para que el cliente pueda
+-- mostrar cuántos resultados tendría al cambiar ese filtro.
+-- Los IDs de categoría, tipo y estado se resuelven en el backend con su caché de catálogos.
+-- Formato: {"total": 42, "fuzzy": false,
+--           "facets": {"type": [{"id": "activity", "count": 30}, ...], "category": [{"id": 2, "count": 12}, ...],
+--                      "activity_type": [...], "status": [{"type": "club", "id": 1, "count": 10}, ...]},
+--           "results": [{"type": "activity", "id": 7, "name": ..., "description": ..., "group_id": 3,
+--                        "group_name": ..., "category_id": 2, "activity_type_id": 1, "status_id": 1,
+--                        "start_date": ..., "rank": 0.61}, ...]}
+CREATE OR REPLACE FUNCTION public.fn_search(
+	p_query text,
+	p_type text DEFAULT NULL,
+	p_category_id integer DEFAULT NULL,
+	p_activity_type_id integer DEFAULT NULL,
+	p_status_id integer DEFAULT NULL,
+	p_limit integer DEFAULT 20,
+	p_offset integer DEFAULT 0)
+    RETURNS json
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+AS $BODY$
+	WITH q AS (
+		SELECT websearch_to_tsquery('public.es_unaccent', p_query) AS tsq
+	),
+	fts AS MATERIALIZED (
+		SELECT 'club'::text AS type, g.group_id AS id, g.group_id, g.g_group_category_id AS category_id,
+			NULL::integer AS activity_type_id, g.g_group_status_id AS status_id,
+			ts_rank_cd(g.g_search_vector, q.tsq) AS rank
+		FROM public.groups g, q
+		WHERE g.g_search_vector @@ q.tsq
+		UNION ALL
+		SELECT 'activity', ga.activity_id, ga.ga_group_id, g.g_group_category_id,
+			ga.ga_activity_type, ga.ga_activity_status,
+			ts_rank_cd(ga.ga_search_vector, q.tsq)
+		FROM public.groupactivities ga
+			INNER JOIN public.groups g ON g.group_id = ga.ga_group_id, q
+		WHERE ga.ga_search_vector @@ q.tsq
+	),
+	-- Respaldo por trigramas: solo se recorre si la búsqueda de texto completo no encontró nada
+	fuzzy AS MATERIALIZED (
+		SELECT 'club'::text AS type, g.group_id AS id, g.group_id, g.g_group_category_id AS category_id,
+			NULL::integer AS activity_type_id, g.g_group_status_id AS status_id,
+			word_similarity(p_query, g.g_group_name) AS rank
+		FROM public.groups g
+		WHERE NOT EXISTS (SELECT 1 FROM fts)
+			AND p_query <% g.g_group_name
+		UNION ALL
+		SELECT 'activity', ga.activity_id, ga.ga_group_id, g.g_group_category_id,
+			ga.ga_activity_type, ga.ga_activity_status,
+			word_similarity(p_query, ga.ga_activity_name)
+		FROM public.groupactivities ga
+			INNER JOIN public.groups g ON g.group_id = ga.ga_group_id
+		WHERE NOT EXISTS (SELECT 1 FROM fts)
+			AND p_query <% ga.ga_activity_name
+	),
+	-- Coincidencias con el resultado de cada filtro por separado
+	matches AS MATERIALIZED (
+		SELECT m.*,
+			(p_type IS NULL OR m.type = p_type) AS f_type,
+			(p_category_id IS NULL OR m.category_id = p_category_id) AS f_category,
+			(p_activity_type_id IS NULL OR m.activity_type_id = p_activity_type_id) AS f_activity_type,
+			(p_status_id IS NULL OR m.status_id = p_status_id) AS f_status
+		FROM (
+			SELECT * FROM fts
+			UNION ALL
+			SELECT * FROM fuzzy
+		) m
+	),
+	page AS (
+		SELECT m.type, m.id, m.rank
+		FROM matches m
+		WHERE m.f_type AND m.f_category AND m.f_activity_type AND m.f_status
+		ORDER BY m.rank DESC, m.type, m.id
+		LIMIT p_limit
+		OFFSET p_offset
+	)
+	SELECT json_build_object(
+		'total', (
+			SELECT count(*) FROM matches m
+			WHERE m.f_type AND m.f_category AND m.f_activity_type AND m.f_status
+		),
+		'fuzzy', EXISTS (SELECT 1 FROM fuzzy),
+		'facets', json_build_object(
+			'type', (
+				SELECT COALESCE(json_agg(json_build_object('id', f.type, 'count', f.count) ORDER BY f.count DESC, f.type), '[]')
+				FROM (
+					SELECT m.type, count(*) AS count FROM matches m
+					WHERE m.f_category AND m.f_activity_type AND m.f_status
+					GROUP BY m.type
+				) f
+			),
+			'category', (
+				SELECT COALESCE(json_agg(json_build_object('id', f.category_id, 'count', f.count) ORDER BY f.count DESC, f.category_id), '[]')
+				FROM (
+					SELECT m.category_id, count(*) AS count FROM matches m
+					WHERE m.f_type AND m.f_activity_type AND m.f_status
+					GROUP BY m.category_id
+				) f
+			),
+			'activity_type', (
+				SELECT COALESCE(json_agg(json_build_object('id', f.activity_type_id, 'count', f.count) ORDER BY f.count DESC, f.activity_type_id), '[]')
+				FROM (
+					SELECT m.activity_type_id, count(*) AS count FROM matches m
+					WHERE m.activity_type_id IS NOT NULL AND m.f_type AND m.f_category AND m.f_status
+					GROUP BY m.activity_type_id
+				) f
+			),
+			'status', (
+				SELECT COALESCE(json_agg(json_build_object('type', f.type, 'id', f.status_id, 'count', f.count) ORDER BY f.type, f.count DESC, f.status_id), '[]')
+				FROM (
+					SELECT m.type, m.status_id, count(*) AS count FROM matches m
+					WHERE m.f_type AND m.f_category AND m.f_activity_type
+					GROUP BY m.type, m.status_id
+				) f
+			)
+		),
+		'results', (
+			SELECT COALESCE(json_agg(r ORDER BY r.rank DESC, r.type, r.id), '[]')
+			FROM (
+				SELECT p.type, p.id,
+					COALESCE(ga.ga_activity_name, g.g_group_name) AS name,
+					COALESCE(ga.ga_activity_description, g.g_group_description) AS description,
+					g.group_id,
+					g.g_group_name AS group_name,
+					g.g_group_category_id AS category_id,
+					ga.ga_activity_type AS activity_type_id,
+					COALESCE(ga.ga_activity_status, g.g_group_status_id) AS status_id,
+					s.as_activity_start_date AS start_date,
+					round(p.rank::numeric, 4) AS rank
+				FROM page p
+					LEFT JOIN public.groupactivities ga ON p.type = 'activity' AND ga.activity_id = p.id
+					INNER JOIN public.groups g ON g.group_id = CASE WHEN p.type = 'activity' THEN ga.ga_group_id ELSE p.id END
+					-- Próximo horario de la actividad (o el último, si ya pasaron todos)
+					LEFT JOIN LATERAL (
+						SELECT sc.as_activity_start_date
+						FROM public.activitiesschedule sc
+						WHERE sc.as_activity_id = ga.activity_id
+						ORDER BY sc.as_activity_start_date < CURRENT_TIMESTAMP,
+							CASE WHEN sc.as_activity_start_date >= CURRENT_TIMESTAMP THEN sc.as_activity_start_date END,
+							sc.as_activity_start_date DESC
+						LIMIT 1
+					) s ON TRUE
+			) r
+		)
+	);
+$BODY$;
@@ -0,0 +1,54 @@
+-- FUNCTION: public.fn_user_upcoming_activities_page(integer, timestamp with time zone, timestamp with time zone, timestamp with time zone, integer, integer)
+
+-- DROP FUNCTION IF EXISTS public.fn_user_upcoming_activities_page(integer, timestamp with time zone, timestamp with time zone, timestamp with time zone, integer, integer);
+
+-- Horarios de actividades (no canceladas) de los clubes en los que el usuario es miembro aprobado,
+-- dentro de la ventana [p_from, p_to), ordenados por (inicio, schedule_id) con paginación keyset.
+-- p_from: inicio de la ventana (NULL = ahora).
+-- p_to: fin de la ventana, exclusivo.
+-- p_after_start, p_after_schedule_id: clave de la última fila entregada (NULL para la primera página).
+-- p_limit: tamaño de la página (NULL devuelve todas las filas de la ventana).
+-- El recorrido parte de las membresías del usuario (llave primaria de groupmembers) y, por cada actividad de sus
+-- clubes, lee solo los horarios de la ventana con activitiesschedule_activity_start_idx (migración V001);
+-- el costo depende de los clubes del usuario y no del total de membresías.
+-- El estado se devuelve como ID; el backend lo resuelve con su caché de catálogos.
+CREATE OR REPLACE FUNCTION public.fn_user_upcoming_activities_page(
+	p_user_id integer,
+	p_from timestamp with time zone,
+	p_to timestamp with time zone,
+	p_after_start timestamp with time zone DEFAULT NULL,
+	p_after_schedule_id integer DEFAULT NULL,
+	p_limit integer DEFAULT NULL)
+    RETURNS TABLE(schedule_id integer, activity_id integer, activity_name character varying, group_id integer, group_name character varying, start_date timestamp with time zone, end_date timestamp with time zone, location character varying, activity_status_id integer) 
+    LANGUAGE 'sql'
+    STABLE PARALLEL SAFE
+
+AS $BODY$
+	SELECT
+		s.schedule_id,
+		ga.activity_id,
+		ga.ga_activity_name,
+		g.group_id,
+		g.g_group_name,
+		s.as_activity_start_date,
+		s.as_activity_end_date,
+		s.as_activity_location,
+		ga.ga_activity_status
+	FROM
+		public.groupmembers gm
+			INNER JOIN public.groups g ON g.group_id = gm.group_id
+			INNER JOIN public.groupactivities ga ON ga.ga_group_id = gm.group_id
+			INNER JOIN public.activitiesschedule s ON s.as_activity_id = ga.activity_id
+	WHERE
+		gm.user_id = p_user_id
+		AND gm.gm_status_id = 2
+		AND ga.ga_activity_status <> 3
+		AND s.as_activity_start_date >= COALESCE(p_from, CURRENT_TIMESTAMP)
+		AND s.as_activity_start_date < p_to
+		AND (p_after_start IS NULL
+			OR (s.as_activity_start_date, s.schedule_id) > (p_after_start, COALESCE(p_after_schedule_id, 0)))
+	ORDER BY
+		s.as_activity_start_date,
+		s.schedule_id
+	LIMIT p_limit;
+$BODY$;
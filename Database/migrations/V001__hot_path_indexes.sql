@@ -0,0 +1,53 @@
+-- MIGRATION: V001__hot_path_indexes
+
+-- Índices para los procedimientos de lectura más usados. "Create Tables.sql" solo define llaves primarias y
+-- UUID únicos, por lo que cada conteo de miembros o participantes, la búsqueda del próximo horario de una
+-- actividad y las solicitudes pendientes de un club recorrían la tabla completa.
+-- Los índices se crean con CONCURRENTLY para no bloquear las escrituras en producción; por eso este archivo
+-- no puede ejecutarse dentro de una transacción (psql -f sin --single-transaction). Es idempotente:
+-- si una creación concurrente se interrumpe, el índice queda inválido y hay que eliminarlo antes de repetirla.
+-- El arnés backend/benchmarks/bench_query_plans.py verifica que los planes usen estos índices.
+
+-- Miembros de un club por estado (conteos de miembros aprobados, fn_adm_get_club_members, membresía)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupmembers_group_status_idx
+	ON public.groupmembers (group_id, gm_status_id);
+
+-- Participantes de una actividad (participants_count, inscripciones)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS activityparticipants_activity_idx
+	ON public.activityparticipants (ap_activity_id);
+
+-- Actividades de un usuario
+CREATE INDEX CONCURRENTLY IF NOT EXISTS activityparticipants_user_activity_idx
+	ON public.activityparticipants (ap_user_id, ap_activity_id);
+
+-- Horarios de una actividad en orden (primer horario, próximas actividades)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS activitiesschedule_activity_start_idx
+	ON public.activitiesschedule (as_activity_id, as_activity_start_date);
+
+-- Actividades de un club
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupactivities_group_idx
+	ON public.groupactivities (ga_group_id);
+
+-- Actividades programadas (estado 1) de un club: listas y calendario de próximas actividades
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupactivities_group_scheduled_idx
+	ON public.groupactivities (ga_group_id, activity_id)
+	WHERE ga_activity_status = 1;
+
+-- Solicitudes de unión de un club por estado
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupjoinrequests_group_status_idx
+	ON public.groupjoinrequests (gjr_group_id, gjr_request_status_id);
+
+-- Solicitudes pendientes (estado 1) de un usuario en un club (user_has_pending_join_request)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupjoinrequests_user_group_pending_idx
+	ON public.groupjoinrequests (gjr_user_id, gjr_group_id)
+	WHERE gjr_request_status_id = 1;
+
+-- Dueños de clubes y creadores de actividades (llaves foráneas hacia users)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groups_owner_idx
+	ON public.groups (g_group_owner_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupactivities_creator_idx
+	ON public.groupactivities (ga_creator_id);
+
+ANALYZE public.groupmembers, public.activityparticipants, public.activitiesschedule,
+	public.groupactivities, public.groupjoinrequests, public.groups;
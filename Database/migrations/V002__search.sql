@@ -0,0 +1,55 @@
+-- MIGRATION: V002__search
+
+-- Búsqueda por palabras clave de clubes y actividades (RF3.2, RF4.2.1), usada por public.fn_search.
+-- - Columnas tsvector generadas (STORED) con el nombre (peso A) y la descripción (peso B), indexadas con GIN.
+-- - Configuración de texto public.es_unaccent: la de español sin tildes, para que "futbol" encuentre "Fútbol".
+-- - Índices de trigramas (pg_trgm) sobre los nombres, para el respaldo por similitud cuando la búsqueda
+--   de texto completo no encuentra nada (errores de tipeo).
+-- Requiere las extensiones de contrib pg_trgm y unaccent (CREATE EXTENSION necesita permisos de dueño de la base).
+-- Agregar una columna STORED reescribe la tabla con un bloqueo exclusivo: en producción conviene aplicarla
+-- en una ventana de mantenimiento. Los índices se crean con CONCURRENTLY, por lo que, como V001, este archivo
+-- no puede ejecutarse dentro de una transacción. Es idempotente.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+DO $$
+BEGIN
+	IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent' AND cfgnamespace = 'public'::regnamespace) THEN
+		CREATE TEXT SEARCH CONFIGURATION public.es_unaccent (COPY = pg_catalog.spanish);
+		ALTER TEXT SEARCH CONFIGURATION public.es_unaccent
+			ALTER MAPPING FOR hword, hword_part, word WITH public.unaccent, pg_catalog.spanish_stem;
+	END IF;
+END
+$$;
+
+-- Vectores de búsqueda (to_tsvector con una configuración explícita es inmutable, requisito de las columnas generadas)
+ALTER TABLE public.groups
+	ADD COLUMN IF NOT EXISTS g_search_vector tsvector
+	GENERATED ALWAYS AS (
+		setweight(to_tsvector('public.es_unaccent', COALESCE(g_group_name, '')), 'A') ||
+		setweight(to_tsvector('public.es_unaccent', COALESCE(g_group_description, '')), 'B')
+	) STORED;
+
+ALTER TABLE public.groupactivities
+	ADD COLUMN IF NOT EXISTS ga_search_vector tsvector
+	GENERATED ALWAYS AS (
+		setweight(to_tsvector('public.es_unaccent', COALESCE(ga_activity_name, '')), 'A') ||
+		setweight(to_tsvector('public.es_unaccent', COALESCE(ga_activity_description, '')), 'B')
+	) STORED;
+
+-- Texto completo
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groups_search_idx
+	ON public.groups USING gin (g_search_vector);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupactivities_search_idx
+	ON public.groupactivities USING gin (ga_search_vector);
+
+-- Similitud de trigramas sobre los nombres (operador <% de fn_search)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groups_name_trgm_idx
+	ON public.groups USING gin (g_group_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS groupactivities_name_trgm_idx
+	ON public.groupactivities USING gin (ga_activity_name gin_trgm_ops);
+
+ANALYZE public.groups, public.groupactivities;
@@ -0,0 +1,12 @@
+-- MIGRATION: V003__activity_query_indexes
+
+-- Índices de public.fn_query_activities (filtros y orden del listado de actividades, RF3.2).
+-- Como V001, los índices se crean con CONCURRENTLY, por lo que este archivo no puede ejecutarse dentro de una
+-- transacción. Es idempotente.
+
+-- Horarios por fecha de inicio: las ventanas hoy / semana / próximas recorren solo los horarios del rango
+-- en lugar de calcular el primer horario de cada actividad
+CREATE INDEX CONCURRENTLY IF NOT EXISTS activitiesschedule_start_idx
+	ON public.activitiesschedule (as_activity_start_date, as_activity_id);
+
+ANALYZE public.activitiesschedule;
@@ -0,0 +1,25 @@
+-- MIGRATION: V004__entity_versions_sequence
+
+-- Las versiones de entidad (ETag, ver fn_notify_entity_changed) dejan de tener filas para las listas y familias
+-- ('activities', 'groups', 'activity', ...): cada inscripción, baja o cambio de horario actualizaba la fila
+-- 'activities' y la dejaba bloqueada hasta el final de la transacción, por lo que todas se ejecutaban de a una.
+-- Ahora solo hay filas por entidad ('activity:12', 'group_activities:5', 'user:3'), sus versiones se toman de
+-- la secuencia entityversions_seq y la versión de una lista es la mayor de las entidades de las que depende
+-- (fn_get_entity_versions).
+-- Ejecutar en una transacción junto con fn_entity_version_sources.sql, fn_notify_entity_changed.sql y
+-- fn_get_entity_versions.sql. Es idempotente.
+
+CREATE SEQUENCE IF NOT EXISTS public.entityversions_seq;
+
+-- Las versiones nuevas deben superar a todas las ya publicadas (los procesos web nunca retroceden una versión)
+SELECT setval('public.entityversions_seq', GREATEST(max(ev_version), 1))
+FROM public.entityversions;
+
+ALTER TABLE public.entityversions ALTER COLUMN ev_version SET DEFAULT nextval('public.entityversions_seq');
+
+DELETE FROM public.entityversions
+WHERE strpos(ev_tag, ':') = 0;
+
+-- Mayor versión de cada familia ('activity', 'group_activities', ...)
+CREATE INDEX IF NOT EXISTS entityversions_family_idx
+	ON public.entityversions (split_part(ev_tag, ':', 1), ev_version);
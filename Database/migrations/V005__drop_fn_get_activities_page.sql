@@ -0,0 +1,6 @@
+-- MIGRATION: V005__drop_fn_get_activities_page
+
+-- public.fn_get_activities_page quedó sin uso: el listado de actividades (/api/activities), con o sin filtros,
+-- usa public.fn_query_activities, cuyo orden por defecto ('id') es la misma paginación keyset.
+-- Es idempotente.
+DROP FUNCTION IF EXISTS public.fn_get_activities_page(integer, integer);
@@ -4,16 +4,24 @@ Este archivo configura la aplicación Flask, incluyendo las rutas, CORS y el cor
 Se utiliza para inicializar la aplicación y registrar los blueprints necesarios.
 Se carga la configuración desde un archivo .env y se inicializa Flask-Mail.
 Se configura CORS para permitir solicitudes desde el frontend.
-Los blueprints registrados incluyen autenticación, utilidades de usuario, actividades y clubes.
+Los blueprints registrados incluyen autenticación, utilidades de usuario, actividades, clubes, catálogos y monitoreo.
 La aplicación se ejecuta en modo de depuración en el puerto 3000.
 Este archivo es el punto de entrada de la aplicación Flask."""
 import os
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from routes.auth_routes import auth_bp
 from routes.user_utilities_routes import users_bp
 from routes.activity_routes import activity_bp
 from routes.club_routes import club_bp
+from routes.monitoring_routes import monitoring_bp
+from routes.catalog_routes import catalog_bp
+from routes.media_routes import media_bp
+from routes.upload_routes import upload_bp
+from routes.batch_routes import batch_bp
+from routes.search_routes import search_bp
+from utils.catalogs import catalogs
 from emails.mail import init_mail
 from dotenv import load_dotenv
 #Cargar variables de entorno
@@ -32,9 +40,18 @@ app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
 app.config['MAIL_USE_TLS'] = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
 app.config['MAIL_USE_SSL'] = os.getenv("MAIL_USE_SSL", "false").lower() == "true"
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv("MAIL_DEFAULT_SENDER", "no-reply@localhost")
+# Envíos masivos: conexiones SMTP simultáneas, mensajes por segundo por conexión (0 sin límite) y reintentos
+app.config['MAIL_BATCH_CONNECTIONS'] = int(os.getenv("MAIL_BATCH_CONNECTIONS", 3))
+app.config['MAIL_BATCH_RATE'] = float(os.getenv("MAIL_BATCH_RATE", 0))
+app.config['MAIL_BATCH_RETRIES'] = int(os.getenv("MAIL_BATCH_RETRIES", 2))
 #Inicializacion de flask mail
 init_mail(app)
 
+#Detrás de un proxy inverso, la IP del cliente (límite de inicios de sesión) se toma de X-Forwarded-For
+proxy_hops = int(os.getenv('PROXY_FIX_X_FOR', 0))
+if proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
+
 #CORS
 frontend_origins = os.getenv('FRONTEND_ORIGIN', '')
 allowed_origins = [origin.strip() for origin in frontend_origins.split(',') if origin.strip()]
@@ -45,6 +62,18 @@ app.register_blueprint(auth_bp)
 app.register_blueprint(users_bp)
 app.register_blueprint(activity_bp)
 app.register_blueprint(club_bp)
+app.register_blueprint(monitoring_bp)
+app.register_blueprint(catalog_bp)
+app.register_blueprint(media_bp)
+app.register_blueprint(upload_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(search_bp)
+
+#Precarga de catálogos; si la base de datos no está disponible se cargan en la primera consulta
+try:
+    catalogs.preload()
+except Exception as e:
+    print(f"No se pudieron precargar los catálogos: {e}")
 
 if __name__ == "__main__":
     app.run(debug=True, port=3000)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Benchmark de envío masivo de correos.
+Levanta un servidor SMTP local que descarta los mensajes (con una demora configurable al conectar para simular
+TLS y login) y compara el envío de un mensaje por conexión (`EmailSender.send_html`) contra `BatchEmailSender`.
+
+Uso (desde backend/):
+    python benchmarks/bench_email_fanout.py --messages 500 --connect-delay 0.05 --connections 1 3 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from emails.mail import init_mail
+from emails.sender import EmailSender, BatchEmailSender
+
+
+class SMTPSink:
+    """Servidor SMTP mínimo que acepta y descarta los mensajes."""
+
+    def __init__(self, connect_delay: float, message_delay: float):
+        self.connect_delay = connect_delay
+        self.message_delay = message_delay
+        self.connections = 0
+        self.messages = 0
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._session, '127.0.0.1', 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(self.connect_delay)
+        writer.write(b'220 sink ESMTP\r\n')
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line[:4].upper()
+            if command in (b'EHLO', b'HELO'):
+                writer.write(b'250 sink\r\n')
+            elif command == b'DATA':
+                writer.write(b'354 end with .\r\n')
+                await writer.drain()
+                while (await reader.readline()) not in (b'.\r\n', b''):
+                    pass
+                await asyncio.sleep(self.message_delay)
+                self.messages += 1
+                writer.write(b'250 OK\r\n')
+            elif command == b'QUIT':
+                writer.write(b'221 bye\r\n')
+                await writer.drain()
+                break
+            else:
+                writer.write(b'250 OK\r\n')
+            await writer.drain()
+        writer.close()
+
+
+def build_app(port: int) -> Flask:
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False, MAIL_USE_SSL=False,
+                      MAIL_DEFAULT_SENDER='bench@localhost', MAIL_BATCH_RATE=0, MAIL_BATCH_RETRIES=0)
+    init_mail(app)
+    return app
+
+
+def html_for(index: int) -> str:
+    return f"<html><body><h1>Hola usuario {index}</h1><p>{'Contenido del correo. ' * 40}</p></body></html>"
+
+
+def bench_single(app, count: int) -> float:
+    with app.app_context():
+        start = time.perf_counter()
+        for i in range(count):
+            EmailSender('Benchmark', [f'user{i}@example.com']).send_html(html_for(i))
+        return time.perf_counter() - start
+
+
+def bench_batch(app, count: int, connections: int) -> float:
+    with app.app_context():
+        messages = (EmailSender('Benchmark', [f'user{i}@example.com']).build_message(html_for(i)) for i in range(count))
+        start = time.perf_counter()
+        sent, failed = BatchEmailSender(connections=connections).send(messages)
+        elapsed = time.perf_counter() - start
+        assert sent == count and not failed, (sent, failed)
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--connect-delay', type=float, default=0.05, help='Segundos por conexión (simula TLS + login)')
+    parser.add_argument('--message-delay', type=float, default=0.002, help='Segundos por mensaje en el servidor')
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 3, 5])
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.connect_delay, args.message_delay)
+    sink.start()
+    app = build_app(sink.port)
+
+    print(f"{'modo':<24}{'mensajes':>10}{'conexiones':>12}{'segundos':>10}{'msg/s':>10}")
+    before = sink.connections
+    elapsed = bench_single(app, args.messages)
+    print(f"{'una conexión por correo':<24}{args.messages:>10}{sink.connections - before:>12}{elapsed:>10.2f}{args.messages / elapsed:>10.1f}")
+    for connections in args.connections:
+        before = sink.connections
+        elapsed = bench_batch(app, args.messages, connections)
+        print(f"{f'lote x{connections}':<24}{args.messages:>10}{sink.connections - before:>12}{elapsed:>10.2f}{args.messages / elapsed:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark del procesamiento de imágenes subidas.
+Genera JPEG sintéticos de distintos megapíxeles y compara el procesamiento anterior (decodificación completa,
+recorte y LANCZOS) contra `utils.images.process_square` (reducción al decodificar). Cada caso se ejecuta en un
+proceso nuevo para medir el pico de memoria (ru_maxrss) sin que lo contamine el caso anterior.
+
+Uso (desde backend/):
+    python benchmarks/bench_image_processing.py --megapixels 2 8 12 24 --size 1024 --repeat 3
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from utils.images import process_square
+
+
+def legacy_process(data: bytes, size: int) -> bytes:
+    """Procesamiento previo de ImageUploader, conservado como referencia."""
+    img = Image.open(io.BytesIO(data))
+    width, height = img.size
+    if width != height:
+        min_dim = min(width, height)
+        img = img.crop(((width - min_dim) / 2, (height - min_dim) / 2, (width + min_dim) / 2, (height + min_dim) / 2))
+    img = img.resize((size, size), Image.Resampling.LANCZOS)
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGB")
+    output = io.BytesIO()
+    img.save(output, format='JPEG')
+    return output.getvalue()
+
+
+MODES = {'anterior': legacy_process, 'draft': process_square}
+
+
+def make_jpeg(megapixels: float) -> bytes:
+    """JPEG 4:3 con degradados y figuras para que el decodificador tenga trabajo realista."""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    img = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for i in range(0, width, max(1, width // 40)):
+        draw.ellipse((i, i * height // width, i + width // 10, i * height // width + height // 10),
+                     outline=(i % 255, 80, 200), width=5)
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+def write_jpeg(path: str, megapixels: float):
+    with open(path, 'wb') as f:
+        f.write(make_jpeg(megapixels))
+
+
+def max_rss_mb() -> float:
+    # En Linux ru_maxrss está en KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(path: str, mode: str, size: int, repeat: int, results):
+    with open(path, 'rb') as f:
+        data = f.read()
+    baseline = max_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        MODES[mode](data, size)
+        timings.append(time.perf_counter() - start)
+    results.put((min(timings), baseline, max_rss_mb()))
+
+
+def measure(path: str, mode: str, size: int, repeat: int) -> tuple:
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=run_case, args=(path, mode, size, repeat, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[2, 8, 12, 24])
+    parser.add_argument('--size', type=int, default=1024, help='Lado del cuadrado final (IMGUR_IMAGE_SQUARE_SIZE)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workdir', default='/tmp')
+    args = parser.parse_args()
+
+    print(f"{'MP':>6}{'modo':>10}{'ms':>10}{'ms/MP':>9}{'MB base':>10}{'MB pico':>10}{'MB/MP':>8}")
+    for megapixels in args.megapixels:
+        path = os.path.join(args.workdir, f'bench_image_{megapixels:g}mp.jpg')
+        # ru_maxrss se hereda a través de fork/exec: la imagen se genera en otro proceso para no inflar la base
+        generator = multiprocessing.get_context('spawn').Process(target=write_jpeg, args=(path, megapixels))
+        generator.start()
+        generator.join()
+        for mode in MODES:
+            elapsed, baseline, peak = measure(path, mode, args.size, args.repeat)
+            # MB/MP: crecimiento del pico de memoria sobre la base del proceso, por megapíxel
+            print(f"{megapixels:>6g}{mode:>10}{elapsed * 1000:>10.0f}{elapsed * 1000 / megapixels:>9.1f}"
+                  f"{baseline:>10.1f}{peak:>10.1f}{(peak - baseline) / megapixels:>8.2f}")
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark del cliente HTTP de subidas a Imgur contra el stub local (benchmarks/imgur_stub.py).
+Compara `requests.post` sin sesión (comportamiento anterior) contra `HttpClient` en tres escenarios:
+- normal: costo de conexión por subida frente a conexiones keep-alive reutilizadas,
+- inestable: un porcentaje de respuestas 503, que HttpClient reintenta con jitter,
+- colgado: el servicio no responde; sin timeout el worker queda bloqueado, con HttpClient la petición
+  termina al vencer el timeout de lectura y, con el circuit breaker abierto, las siguientes fallan de inmediato.
+
+Uso (desde backend/):
+    python benchmarks/bench_imgur_upload.py --uploads 50 --connect-delay 0.05 --latency 0.02
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from benchmarks.imgur_stub import ImgurStub
+from utils.http_client import HttpClient, CircuitOpenError
+
+PAYLOAD = os.urandom(150 * 1024)
+
+
+def upload_plain(endpoint: str) -> bool:
+    response = requests.post(endpoint, files={'image': ('image.jpg', PAYLOAD, 'image/jpeg')})
+    return response.status_code == 200
+
+
+def upload_client(client: HttpClient, endpoint: str) -> bool:
+    try:
+        response = client.post(endpoint, files={'image': ('image.jpg', PAYLOAD, 'image/jpeg')})
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+def run(stub: ImgurStub, uploads: int, upload) -> tuple:
+    before = stub.connections
+    start = time.perf_counter()
+    ok = sum(upload() for _ in range(uploads))
+    return ok, stub.connections - before, time.perf_counter() - start
+
+
+def print_row(scenario: str, mode: str, uploads: int, ok: int, connections: int, elapsed: float):
+    print(f"{scenario:<11}{mode:<14}{uploads:>8}{ok:>6}{connections:>12}{elapsed:>10.2f}{elapsed / uploads * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=50)
+    parser.add_argument('--connect-delay', type=float, default=0.05, help='Segundos por conexión (simula DNS + TCP + TLS)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Segundos por subida en el servidor')
+    parser.add_argument('--fail-rate', type=float, default=0.2, help='Proporción de respuestas 503 en el escenario inestable')
+    parser.add_argument('--read-timeout', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'escenario':<11}{'modo':<14}{'subidas':>8}{'ok':>6}{'conexiones':>12}{'segundos':>10}{'ms/subida':>10}")
+    for scenario, fail_rate in (('normal', 0), ('inestable', args.fail_rate)):
+        stub = ImgurStub(connect_delay=args.connect_delay, latency=args.latency, fail_rate=fail_rate).start()
+        client = HttpClient('bench', read_timeout=args.read_timeout, backoff=0.05, failure_threshold=1000)
+        print_row(scenario, 'requests.post', args.uploads, *run(stub, args.uploads, lambda: upload_plain(stub.endpoint)))
+        print_row(scenario, 'HttpClient', args.uploads, *run(stub, args.uploads, lambda: upload_client(client, stub.endpoint)))
+        stub.stop()
+
+    # Servicio colgado: requests.post sin timeout no termina; se abandona el hilo tras unos segundos
+    stub = ImgurStub(hang=True).start()
+    wait = args.read_timeout * 5
+    thread = threading.Thread(target=upload_plain, args=(stub.endpoint,), daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    thread.join(wait)
+    state = 'bloqueado' if thread.is_alive() else 'terminó'
+    print(f"\ncolgado    requests.post: {state} tras {time.perf_counter() - start:.1f}s")
+
+    client = HttpClient('bench', read_timeout=args.read_timeout, retries=1, backoff=0.05, failure_threshold=2)
+    for i in range(4):
+        start = time.perf_counter()
+        try:
+            client.post(stub.endpoint, files={'image': ('image.jpg', PAYLOAD, 'image/jpeg')})
+            outcome = 'respuesta'
+        except CircuitOpenError:
+            outcome = 'circuit breaker abierto'
+        except requests.exceptions.RequestException as e:
+            outcome = type(e).__name__
+        print(f"colgado    HttpClient #{i + 1}: {outcome} en {time.perf_counter() - start:.2f}s (circuito {client.breaker.state})")
+
+
+if __name__ == '__main__':
+    main()
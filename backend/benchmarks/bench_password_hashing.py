@@ -0,0 +1,74 @@
+"""
+Benchmark de verificación de contraseñas (inicio de sesión).
+Mide inicios de sesión por segundo (`security.validate_password`) según la cantidad de hilos del pool de hashing
+(PASSWORD_HASH_WORKERS) y el costo de bcrypt (BCRYPT_ROUNDS). Cada combinación se ejecuta en un proceso nuevo
+porque el pool se configura al importar `utils.security`; los clientes concurrentes simulan peticiones simultáneas.
+Los resultados solo escalan hasta la cantidad de núcleos disponibles.
+
+Uso (desde backend/):
+    python benchmarks/bench_password_hashing.py --workers 1 2 4 --rounds 10 12 --seconds 3
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_case(workers: int, rounds: int, clients: int, seconds: float, results):
+    os.environ['PASSWORD_HASH_WORKERS'] = str(workers)
+    os.environ['BCRYPT_ROUNDS'] = str(rounds)
+    sys.path.insert(0, BACKEND_DIR)
+    from utils import security
+
+    hashed = security.hash_password('contraseña-de-prueba')
+    deadline = time.perf_counter() + seconds
+    counts = [0] * clients
+
+    def client(index: int):
+        while time.perf_counter() < deadline:
+            assert security.validate_password('contraseña-de-prueba', hashed)
+            counts[index] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    results.put(sum(counts) / elapsed)
+
+
+def measure(workers: int, rounds: int, clients: int, seconds: float) -> float:
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    process = ctx.Process(target=run_case, args=(workers, rounds, clients, seconds, results))
+    process.start()
+    rate = results.get()
+    process.join()
+    return rate
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, cores}))
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    parser.add_argument('--clients', type=int, default=16, help='Peticiones de inicio de sesión simultáneas')
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"núcleos disponibles: {cores}")
+    print(f"{'costo':>6}{'hilos':>7}{'logins/s':>10}{'ms/login':>10}")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            rate = measure(workers, rounds, args.clients, args.seconds)
+            print(f"{rounds:>6}{workers:>7}{rate:>10.1f}{1000 / rate:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
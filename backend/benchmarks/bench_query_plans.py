@@ -0,0 +1,360 @@
+"""
+Arnés de planes de consulta de los procedimientos de lectura (fn_*) que usa el backend.
+Captura EXPLAIN (ANALYZE, BUFFERS) de cada procedimiento antes y después de aplicar una migración de índices
+(por defecto Database/migrations/V001__hot_path_indexes.sql), muestra tiempo y bloques leídos de cada uno y
+termina con código 1 si, después de la migración, algún plan recorre con Seq Scan una de las tablas grandes
+(HOT_TABLES), si algún procedimiento falla o si falta uno de los obligatorios (REQUIRED).
+
+Un EXPLAIN de `SELECT * FROM fn_x(...)` solo muestra el Function Scan; los planes de las consultas internas se
+obtienen con auto_explain (log_nested_statements) enviado al cliente como mensajes LOG, por lo que el usuario
+necesita permiso para `LOAD 'auto_explain'` (superusuario, o auto_explain en $libdir/plugins).
+Cada procedimiento se ejecuta dentro de una transacción que se revierte, así que los que escriben no dejan cambios.
+
+Con --seed se cargan datos sintéticos (usuarios, clubes, miembros, actividades, horarios, inscripciones y
+solicitudes); con pocas filas el planificador prefiere Seq Scan aunque existan índices, así que la verificación
+solo tiene sentido sobre un volumen grande. Usar únicamente contra una base de datos desechable.
+Con --reset se eliminan antes los índices de la migración, para medir el "antes" en una base donde ya se aplicó.
+
+Uso (desde backend/, con las variables DB_* apuntando a la base de pruebas):
+    python benchmarks/bench_query_plans.py --seed --users 50000 --groups 2000 --reset
+    python benchmarks/bench_query_plans.py --output /tmp/planes
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db import get_connection
+
+DEFAULT_MIGRATION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Database', 'migrations',
+                                 'V001__hot_path_indexes.sql')
+#Tablas que crecen con el uso; un Seq Scan sobre ellas es una regresión
+HOT_TABLES = {'groupmembers', 'activityparticipants', 'activitiesschedule', 'groupactivities', 'groupjoinrequests'}
+
+QUERY_ACTIVITIES = ('public.fn_query_activities(integer, integer, integer, integer, timestamp with time zone, '
+                    'timestamp with time zone, boolean, text, timestamp with time zone, integer, integer)')
+#Procedimientos que deben existir: si faltan la verificación falla en lugar de omitirlos
+REQUIRED = {QUERY_ACTIVITIES}
+
+#Procedimientos de lectura: (nombre, firma para comprobar que existe, consulta con parámetros de ejemplo)
+CASES = (
+    ('fn_get_clubs_page', 'public.fn_get_clubs_page(integer, integer)',
+     'SELECT * FROM public.fn_get_clubs_page(NULL, 50)'),
+    ('fn_query_activities (listado)',
+     QUERY_ACTIVITIES,
+     "SELECT * FROM public.fn_query_activities(NULL, NULL, NULL, NULL, NULL, NULL, FALSE, 'id', NULL, NULL, 50)"),
+    ('fn_query_activities (semana, próximas)',
+     QUERY_ACTIVITIES,
+     "SELECT * FROM public.fn_query_activities(NULL, 1, NULL, NULL, CURRENT_DATE, CURRENT_DATE + 7, TRUE, "
+     "'soonest', NULL, NULL, 50)"),
+    ('fn_query_activities (club, recientes)',
+     QUERY_ACTIVITIES,
+     "SELECT * FROM public.fn_query_activities(NULL, NULL, %(club_id)s, NULL, NULL, NULL, FALSE, "
+     "'recent', NULL, NULL, 50)"),
+    ('fn_get_club_details', 'public.fn_get_club_details(integer)',
+     'SELECT * FROM public.fn_get_club_details(%(club_id)s)'),
+    ('fn_get_activity_by_id', 'public.fn_get_activity_by_id(integer)',
+     'SELECT * FROM public.fn_get_activity_by_id(%(activity_id)s)'),
+    ('fn_get_user_related_groups', 'public.fn_get_user_related_groups(integer)',
+     'SELECT * FROM public.fn_get_user_related_groups(%(user_id)s)'),
+    ('fn_get_user_related_activities', 'public.fn_get_user_related_activities(integer)',
+     'SELECT * FROM public.fn_get_user_related_activities(%(user_id)s)'),
+    ('fn_user_upcoming_events', 'public.fn_user_upcoming_events(integer)',
+     'SELECT public.fn_user_upcoming_events(%(user_id)s)'),
+    ('fn_adm_get_club_members', 'public.fn_adm_get_club_members(integer)',
+     'SELECT * FROM public.fn_adm_get_club_members(%(club_id)s)'),
+    ('fn_adm_pending_approval_requests', 'public.fn_adm_pending_approval_requests(integer)',
+     'SELECT public.fn_adm_pending_approval_requests(%(club_id)s)'),
+    ('fn_adm_get_member_status', 'public.fn_adm_get_member_status(integer)',
+     'SELECT public.fn_adm_get_member_status(%(club_id)s)'),
+    ('fn_adm_weekly_activity_heatmap', 'public.fn_adm_weekly_activity_heatmap(integer)',
+     'SELECT public.fn_adm_weekly_activity_heatmap(%(club_id)s)'),
+    ('fn_adm_activity_enrollment_stats', 'public.fn_adm_activity_enrollment_stats(integer)',
+     'SELECT public.fn_adm_activity_enrollment_stats(%(club_id)s)'),
+    ('fn_adm_club_dashboard', 'public.fn_adm_club_dashboard(integer)',
+     'SELECT public.fn_adm_club_dashboard(%(club_id)s)'),
+)
+
+SEED_SQL = """
+INSERT INTO public.usertypes (type_id, ut_type_name) VALUES (1, 'Estudiante') ON CONFLICT DO NOTHING;
+INSERT INTO public.userstatus (user_status_id, us_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupcategories (group_category_id, gc_category_name) VALUES (1, 'Académico') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupstatus (group_status_id, gs_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.memberroles (role_id, mr_role_name) VALUES (1, 'Miembro') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupmemberstatus (group_member_status_id, gms_status_name)
+VALUES (1, 'Pendiente'), (2, 'Aprobado'), (3, 'Rechazado') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitytypes (activity_type_id, at_activity_type_name) VALUES (1, 'Taller') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitystatus (activity_status_id, as_activity_status_name)
+VALUES (1, 'Programada'), (2, 'Realizada'), (3, 'Cancelada') ON CONFLICT DO NOTHING;
+
+INSERT INTO public.users (u_name, u_last_name, u_username, u_email, u_user_type_id, u_user_status_id)
+SELECT 'Bench', 'Run ' || %(run)s, 'bench_' || %(run)s || '_' || i, 'bench_' || %(run)s || '_' || i || '@example.com', 1, 1
+FROM generate_series(1, %(users)s) i;
+
+CREATE TEMP TABLE bench_users ON COMMIT DROP AS
+SELECT user_id, row_number() OVER (ORDER BY user_id) - 1 AS n
+FROM public.users
+WHERE u_last_name = 'Run ' || %(run)s;
+
+INSERT INTO public.groups (g_group_name, g_group_description, g_group_status_id, g_group_owner_id, g_group_category_id)
+SELECT 'Club ' || i, 'Club de prueba ' || %(run)s, 1, u.user_id, 1
+FROM generate_series(0, %(groups)s - 1) i
+INNER JOIN bench_users u ON u.n = i %% %(users)s;
+
+CREATE TEMP TABLE bench_groups ON COMMIT DROP AS
+SELECT group_id, g_group_owner_id AS owner_id, row_number() OVER (ORDER BY group_id) - 1 AS n
+FROM public.groups
+WHERE g_group_description = 'Club de prueba ' || %(run)s;
+
+INSERT INTO public.groupmembers (user_id, group_id, gm_role_id, gm_status_id, gm_approved_by, gm_signup_date)
+SELECT u.user_id, g.group_id, 1, CASE WHEN (u.n + j) %% 10 = 0 THEN 1 ELSE 2 END, g.owner_id,
+	CURRENT_TIMESTAMP - ((u.n * 7 + j) %% 365) * INTERVAL '1 day'
+FROM bench_users u
+CROSS JOIN generate_series(1, %(memberships)s) j
+INNER JOIN bench_groups g ON g.n = (u.n * 7 + j * 13) %% %(groups)s
+ON CONFLICT DO NOTHING;
+
+INSERT INTO public.groupactivities (ga_activity_name, ga_activity_description, ga_max_participants, ga_activity_type,
+	ga_activity_status, ga_group_id, ga_creator_id)
+SELECT 'Actividad ' || g.n || '-' || j, 'Actividad de prueba ' || %(run)s, 50, 1, CASE WHEN j %% 10 = 0 THEN 3 ELSE 1 END,
+	g.group_id, g.owner_id
+FROM bench_groups g
+CROSS JOIN generate_series(1, %(activities)s) j;
+
+CREATE TEMP TABLE bench_activities ON COMMIT DROP AS
+SELECT activity_id, row_number() OVER (ORDER BY activity_id) - 1 AS n
+FROM public.groupactivities
+WHERE ga_activity_description = 'Actividad de prueba ' || %(run)s;
+
+INSERT INTO public.activitiesschedule (as_activity_id, as_activity_start_date, as_activity_end_date, as_activity_location)
+SELECT a.activity_id, t.start_date, t.start_date + INTERVAL '2 hours', 'Sala ' || (a.n %% 20)
+FROM bench_activities a
+CROSS JOIN generate_series(1, 2) j
+CROSS JOIN LATERAL (
+	SELECT date_trunc('hour', CURRENT_TIMESTAMP) + ((a.n * 3 + j * 11) %% 180 - 60) * INTERVAL '1 day'
+		+ ((a.n + j) %% 12) * INTERVAL '1 hour' AS start_date
+) t;
+
+INSERT INTO public.activityparticipants (ap_user_id, ap_activity_id)
+SELECT u.user_id, a.activity_id
+FROM bench_activities a
+CROSS JOIN generate_series(1, %(participants)s) j
+INNER JOIN bench_users u ON u.n = (a.n * 31 + j * 17) %% %(users)s;
+
+INSERT INTO public.groupjoinrequests (gjr_group_id, gjr_user_id, gjr_request_status_id)
+SELECT g.group_id, u.user_id, CASE WHEN j %% 3 = 0 THEN 2 ELSE 1 END
+FROM bench_groups g
+CROSS JOIN generate_series(1, %(requests)s) j
+INNER JOIN bench_users u ON u.n = (g.n * 11 + j * 29) %% %(users)s;
+"""
+
+SAMPLE_SQL = """
+SELECT
+	(SELECT gm.group_id FROM public.groupmembers gm WHERE gm.gm_status_id = 2
+	 GROUP BY gm.group_id ORDER BY count(*) DESC LIMIT 1),
+	(SELECT gm.user_id FROM public.groupmembers gm WHERE gm.gm_status_id = 2
+	 GROUP BY gm.user_id ORDER BY count(*) DESC LIMIT 1),
+	(SELECT ap.ap_activity_id FROM public.activityparticipants ap
+	 GROUP BY ap.ap_activity_id ORDER BY count(*) DESC LIMIT 1)
+"""
+
+
+def seed(conn, args):
+    """Carga los datos sintéticos sin disparar triggers y reconstruye los resúmenes de analítica."""
+    start = time.perf_counter()
+    with conn.cursor() as cursor:
+        cursor.execute("SET LOCAL session_replication_role = replica")
+        cursor.execute(SEED_SQL, {'run': int(time.time()), 'users': args.users, 'groups': args.groups,
+                                  'memberships': args.memberships, 'activities': args.activities,
+                                  'participants': args.participants, 'requests': args.requests})
+        cursor.execute("SELECT to_regprocedure('public.fn_rebuild_club_analytics(integer)') IS NOT NULL")
+        if cursor.fetchone()[0]:
+            cursor.execute("SELECT public.fn_rebuild_club_analytics(NULL)")
+    conn.commit()
+    analyze(conn)
+    print(f"Datos sintéticos cargados en {time.perf_counter() - start:.1f}s")
+
+
+def analyze(conn):
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    finally:
+        conn.autocommit = False
+
+
+def migration_statements(path: str) -> list[str]:
+    """Sentencias de la migración, sin comentarios (CONCURRENTLY exige ejecutarlas una por una)."""
+    with open(path, encoding='utf-8') as file:
+        source = re.sub(r'--[^\n]*', '', file.read())
+    return [statement.strip() for statement in source.split(';') if statement.strip()]
+
+
+def migration_indexes(path: str) -> list[str]:
+    return [statement.split('IF NOT EXISTS')[1].split()[0]
+            for statement in migration_statements(path) if 'IF NOT EXISTS' in statement]
+
+
+def run_statements(conn, statements: list[str]):
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    finally:
+        conn.autocommit = False
+
+
+def enable_auto_explain(conn) -> bool:
+    """Activa auto_explain en la sesión; sin él solo se ve el plan externo de cada procedimiento."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("LOAD 'auto_explain'")
+            for setting in ("auto_explain.log_min_duration = 0", "auto_explain.log_analyze = on",
+                            "auto_explain.log_buffers = on", "auto_explain.log_nested_statements = on",
+                            "auto_explain.log_format = json", "client_min_messages = log"):
+                cursor.execute(f"SET {setting}")
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"auto_explain no disponible ({e}); solo se capturan los planes externos")
+        return False
+
+
+def nested_plans(notices: list[str]) -> list[dict]:
+    """Planes JSON de auto_explain incluidos en los mensajes LOG recibidos."""
+    plans = []
+    for notice in notices:
+        if 'plan:' not in notice:
+            continue
+        try:
+            plans.append(json.loads(notice.split('plan:', 1)[1]))
+        except ValueError:
+            continue
+    return plans
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from walk(child)
+
+
+def capture(conn, sample: dict) -> dict:
+    """Ejecuta cada caso con EXPLAIN (ANALYZE, BUFFERS) y resume tiempo, bloques y Seq Scan sobre HOT_TABLES."""
+    results = {}
+    for name, signature, query in CASES:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regprocedure(%s) IS NOT NULL", (signature, ))
+            exists = cursor.fetchone()[0]
+        conn.rollback()
+        if not exists:
+            results[name] = {'status': 'no existe'}
+            continue
+        conn.notices.clear()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, sample)
+                outer = cursor.fetchone()[0][0]
+        except Exception as e:
+            conn.rollback()
+            results[name] = {'status': 'error', 'error': str(e).strip().splitlines()[0]}
+            continue
+        conn.rollback()
+        # auto_explain también registra el propio EXPLAIN; se descarta para no contarlo dos veces
+        plans = [outer] + [plan for plan in nested_plans(conn.notices)
+                           if not plan.get('Query Text', '').lstrip().upper().startswith('EXPLAIN')]
+        seq_scans = sorted({node['Relation Name'] for plan in plans for node in walk(plan['Plan'])
+                            if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES})
+        results[name] = {
+            'status': 'ok',
+            'ms': outer['Execution Time'],
+            'buffers': outer['Plan'].get('Shared Hit Blocks', 0) + outer['Plan'].get('Shared Read Blocks', 0),
+            'seq_scans': seq_scans,
+            'plans': plans
+        }
+    return results
+
+
+def print_report(before: dict, after: dict) -> bool:
+    """Imprime la comparación; devuelve True si no hay regresiones."""
+    print(f"\n{'procedimiento':<34}{'ms antes':>10}{'ms después':>12}{'bloques antes':>15}{'bloques después':>17}  seq scan")
+    ok = True
+    for name, signature, _ in CASES:
+        b, a = before.get(name, {}), after[name]
+        if a['status'] != 'ok':
+            print(f"{name:<34}  {a['status']}{': ' + a['error'] if a.get('error') else ''}")
+            ok = ok and a['status'] == 'no existe' and signature not in REQUIRED
+            continue
+        ms_before = f"{b['ms']:.2f}" if b.get('status') == 'ok' else '-'
+        buffers_before = str(b['buffers']) if b.get('status') == 'ok' else '-'
+        print(f"{name:<34}{ms_before:>10}{a['ms']:>12.2f}{buffers_before:>15}{a['buffers']:>17}  {', '.join(a['seq_scans']) or '-'}")
+        ok = ok and not a['seq_scans']
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--migration', default=DEFAULT_MIGRATION, help='Migración de índices a aplicar entre capturas')
+    parser.add_argument('--reset', action='store_true', help='Eliminar antes los índices de la migración')
+    parser.add_argument('--seed', action='store_true', help='Cargar datos sintéticos (solo en una base desechable)')
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--groups', type=int, default=2000)
+    parser.add_argument('--memberships', type=int, default=4, help='Clubes por usuario')
+    parser.add_argument('--activities', type=int, default=25, help='Actividades por club')
+    parser.add_argument('--participants', type=int, default=20, help='Inscritos por actividad')
+    parser.add_argument('--requests', type=int, default=10, help='Solicitudes de unión por club')
+    parser.add_argument('--output', help='Directorio donde guardar los planes JSON de cada captura')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    # psycopg2 conserva solo los últimos 50 mensajes por defecto; un procedimiento puede registrar más planes
+    conn.notices = deque(maxlen=10000)
+    try:
+        if args.seed:
+            seed(conn, args)
+        if args.reset:
+            run_statements(conn, [f"DROP INDEX CONCURRENTLY IF EXISTS public.{index}"
+                                  for index in migration_indexes(args.migration)])
+            analyze(conn)
+
+        with conn.cursor() as cursor:
+            cursor.execute(SAMPLE_SQL)
+            club_id, user_id, activity_id = cursor.fetchone()
+        conn.rollback()
+        if club_id is None:
+            print("La base de datos no tiene miembros ni inscripciones; use --seed")
+            sys.exit(2)
+        sample = {'club_id': club_id, 'user_id': user_id, 'activity_id': activity_id}
+        print(f"Parámetros de ejemplo: {sample}")
+
+        enable_auto_explain(conn)
+        before = capture(conn, sample)
+        start = time.perf_counter()
+        run_statements(conn, migration_statements(args.migration))
+        print(f"Migración {os.path.basename(args.migration)} aplicada en {time.perf_counter() - start:.1f}s")
+        after = capture(conn, sample)
+
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            for label, results in (('antes', before), ('despues', after)):
+                with open(os.path.join(args.output, f"planes_{label}.json"), 'w', encoding='utf-8') as file:
+                    json.dump(results, file, indent=2, default=str)
+
+        if not print_report(before, after):
+            print("\nFALLA: hay procedimientos con Seq Scan sobre tablas grandes o con errores")
+            sys.exit(1)
+        print("\nOK: ningún procedimiento recorre secuencialmente las tablas grandes")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark de aciertos de la caché de refresh tokens (`utils.token_cache`) con la cadencia real de renovación.
+Simula --users sesiones durante --hours horas con un reloj simulado: cada cliente inicia sesión en un instante
+al azar y llama a /api/auth/refresh una vez por vida del access token (ACCESS_TOKEN_EXPIRES, con un adelanto
+al azar de hasta --jitter segundos); en cada renovación, con probabilidad --logout-rate, cierra sesión y vuelve
+a entrar con un jti nuevo. Los inicios de sesión y cierres llegan a la caché como los eventos
+'refresh_tokens_changed' del canal database_events (se despachan por `utils.db_events`, sin base de datos).
+Cada fallo de la caché es una consulta a verify_auth_refresh; se informa la tasa de aciertos por TTL.
+
+Uso (desde backend/):
+    python benchmarks/bench_refresh_token_cache.py --users 5000 --hours 8 --ttl 30 900 1800 604800
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import db_events
+from utils import token_cache
+from utils.security import auth_token_ttl, refresh_token_ttl
+
+
+def simulate(ttl: float, args, interval: int) -> dict:
+    now = [0.0]
+    token_cache.time = SimpleNamespace(monotonic=lambda: now[0])
+    cache = token_cache.RefreshTokenCache(ttl=ttl, max_users=args.users * 2)
+    #Los eventos se entregan a esta caché como lo haría el hilo de escucha
+    db_events._subscribers[token_cache.EVENT] = [cache.handle_event]
+
+    def notify(data: dict):
+        db_events._dispatch(json.dumps({'event': token_cache.EVENT, **data}))
+
+    rng = random.Random(args.seed)
+    active = {}
+    refreshes = queries = 0
+    events = []
+    for user_id in range(args.users):
+        heapq.heappush(events, (rng.uniform(0, interval), user_id, 'login'))
+    end = args.hours * 3600
+    while events:
+        at, user_id, kind = heapq.heappop(events)
+        if at > end:
+            break
+        now[0] = at
+        if kind == 'login' or rng.random() < args.logout_rate:
+            if kind != 'login':
+                notify({'user_id': user_id, 'action': 'revoked'})
+            active[user_id] = f"{user_id}-{at}"
+            notify({'user_id': user_id, 'action': 'created', 'jti': active[user_id]})
+        else:
+            refreshes += 1
+            jti = active[user_id]
+            if cache.lookup(user_id, jti) is None:
+                queries += 1
+                cache.remember(user_id, jti, ('Token válido', True), cache.generation())
+        heapq.heappush(events, (at + interval - rng.uniform(0, args.jitter), user_id, 'refresh'))
+    return {'refreshes': refreshes, 'queries': queries, 'users': cache.stats()['users']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5000, help='Sesiones simuladas')
+    parser.add_argument('--hours', type=float, default=8, help='Duración simulada')
+    parser.add_argument('--ttl', type=float, nargs='+', default=[30, auth_token_ttl(), 2 * auth_token_ttl(), refresh_token_ttl()],
+                        help='TTL de la caché a comparar (segundos)')
+    parser.add_argument('--jitter', type=float, default=30, help='Adelanto máximo de la renovación (segundos)')
+    parser.add_argument('--logout-rate', type=float, default=0.02, help='Probabilidad de volver a iniciar sesión en cada renovación')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    interval = auth_token_ttl()
+    #El hilo de escucha se da por conectado: los eventos se despachan directamente
+    db_events._listener_pid = os.getpid()
+    db_events._connected.set()
+
+    print(f"{args.users} sesiones, {args.hours:g} h, renovación cada {interval} s")
+    print(f"{'TTL s':>10}{'renovaciones':>14}{'consultas':>12}{'aciertos':>10}")
+    for ttl in args.ttl:
+        result = simulate(ttl, args, interval)
+        hit_rate = 1 - result['queries'] / result['refreshes'] if result['refreshes'] else 0
+        print(f"{ttl:>10g}{result['refreshes']:>14}{result['queries']:>12}{hit_rate:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark de la búsqueda de clubes y actividades (/api/search) a 100 000 filas.
+Crea clubes y actividades con nombres y descripciones combinados de un vocabulario y mide, con
+EXPLAIN (ANALYZE, BUFFERS):
+- filtrado: la búsqueda que hacía el navegador sobre el listado completo, expresada como ILIKE sobre todas
+  las filas (sin contar la transferencia y la serialización del listado),
+- fn_search con un término poco frecuente, uno frecuente, una frase, un filtro de tipo y un error de tipeo
+  (respaldo por trigramas).
+
+Todo se ejecuta en una transacción que se revierte al final, por lo que no deja datos; requiere una base de datos
+de pruebas con la migración Database/migrations/V002__search.sql aplicada.
+
+Uso (desde backend/, con las variables DB_* apuntando a la base de pruebas):
+    python benchmarks/bench_search.py --activities 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db import get_connection
+
+SETUP_SQL = """
+INSERT INTO public.usertypes (type_id, ut_type_name) VALUES (1, 'Estudiante') ON CONFLICT DO NOTHING;
+INSERT INTO public.userstatus (user_status_id, us_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupcategories (group_category_id, gc_category_name)
+VALUES (1, 'Académico'), (2, 'Deportivo'), (3, 'Cultural') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupstatus (group_status_id, gs_status_name) VALUES (1, 'Activo'), (2, 'Inactivo') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitytypes (activity_type_id, at_activity_type_name)
+VALUES (1, 'Taller'), (2, 'Charla'), (3, 'Evento Social') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitystatus (activity_status_id, as_activity_status_name)
+VALUES (1, 'Programada'), (2, 'Realizada'), (3, 'Cancelada') ON CONFLICT DO NOTHING;
+
+CREATE TEMP TABLE bench_words (n integer, word text) ON COMMIT DROP;
+INSERT INTO bench_words
+SELECT row_number() OVER () - 1, word
+FROM unnest(string_to_array(%(words)s, ' ')) word;
+
+CREATE TEMP TABLE bench_groups (group_id integer, n integer) ON COMMIT DROP;
+
+INSERT INTO public.users (u_name, u_last_name, u_username, u_email, u_user_type_id, u_user_status_id)
+VALUES ('Bench', 'Búsqueda', 'bench_busqueda_' || %(run)s, 'bench_busqueda_' || %(run)s || '@example.com', 1, 1);
+
+-- Nombres y descripciones combinados del vocabulario; "ajedrez" solo aparece en uno de cada mil clubes y actividades,
+-- cada palabra del vocabulario en varios miles
+WITH inserted AS (
+	INSERT INTO public.groups (g_group_name, g_group_description, g_group_status_id, g_group_owner_id, g_group_category_id)
+	SELECT
+		CASE WHEN i %% 1000 = 0 THEN 'Club de Ajedrez ' || i ELSE 'Club ' || w1.word || ' ' || w2.word END,
+		w2.word || ' ' || w3.word || ' para estudiantes de ' || w1.word,
+		1 + (i %% 10 = 0)::integer,
+		currval(pg_get_serial_sequence('public.users', 'user_id')),
+		1 + i %% 3
+	FROM generate_series(1, %(groups)s) i
+	INNER JOIN bench_words w1 ON w1.n = i %% %(vocabulary)s
+	INNER JOIN bench_words w2 ON w2.n = (i * 7) %% %(vocabulary)s
+	INNER JOIN bench_words w3 ON w3.n = (i * 13) %% %(vocabulary)s
+	RETURNING group_id
+)
+INSERT INTO bench_groups SELECT group_id, row_number() OVER (ORDER BY group_id) - 1 FROM inserted;
+
+INSERT INTO public.groupactivities (ga_activity_name, ga_activity_description, ga_max_participants,
+	ga_activity_type, ga_activity_status, ga_group_id, ga_creator_id)
+SELECT
+	CASE WHEN i %% 1000 = 0 THEN 'Torneo de ajedrez ' || i ELSE initcap(w1.word) || ' ' || w2.word END,
+	'Sesión de ' || w2.word || ' y ' || w3.word || ', abierta a todos',
+	50,
+	1 + i %% 3,
+	1 + (i %% 20 = 0)::integer * 2,
+	g.group_id,
+	currval(pg_get_serial_sequence('public.users', 'user_id'))
+FROM generate_series(1, %(activities)s) i
+INNER JOIN bench_groups g ON g.n = i %% %(groups)s
+INNER JOIN bench_words w1 ON w1.n = (i * 3) %% %(vocabulary)s
+INNER JOIN bench_words w2 ON w2.n = (i * 11) %% %(vocabulary)s
+INNER JOIN bench_words w3 ON w3.n = (i * 17) %% %(vocabulary)s;
+"""
+
+#Vocabulario de nombres y descripciones (con tildes, para la configuración es_unaccent)
+WORDS = ('fútbol baloncesto natación música teatro pintura fotografía programación robótica matemáticas '
+         'física química biología historia filosofía literatura poesía cine danza yoga voleibol tenis '
+         'atletismo ciclismo senderismo escalada debate oratoria emprendimiento finanzas economía idiomas '
+         'inglés francés alemán japonés cocina jardinería voluntariado medioambiente astronomía ajedrecistas')
+
+#Filtrado en el navegador: recorrer todas las filas buscando el texto en nombre o descripción
+CLIENT_FILTER_SQL = """
+SELECT g.group_id FROM public.groups g
+WHERE g.g_group_name ILIKE '%%' || %(term)s || '%%' OR g.g_group_description ILIKE '%%' || %(term)s || '%%'
+UNION ALL
+SELECT ga.activity_id FROM public.groupactivities ga
+WHERE ga.ga_activity_name ILIKE '%%' || %(term)s || '%%' OR ga.ga_activity_description ILIKE '%%' || %(term)s || '%%'
+"""
+
+SEARCH_SQL = "SELECT public.fn_search(%(term)s, %(type)s, NULL, NULL, NULL, 20, 0)"
+
+CASES = (
+    ('poco frecuente', 'ajedrez', None),
+    ('frecuente', 'robotica', None),
+    ('frase', '"sesión de robótica"', None),
+    ('solo clubes', 'robotica', 'club'),
+    ('error de tipeo', 'robotika', None),
+)
+
+
+def explain(cursor, query: str, params: dict) -> tuple[float, int]:
+    """Tiempo de ejecución (ms) y bloques leídos de la consulta."""
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0][0]
+    return plan['Execution Time'], plan['Plan'].get('Shared Hit Blocks', 0) + plan['Plan'].get('Shared Read Blocks', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--groups', type=int, default=5000, help='Clubes de prueba')
+    parser.add_argument('--activities', type=int, default=100000, help='Actividades de prueba')
+    parser.add_argument('--repeat', type=int, default=5, help='Ejecuciones por medición (se toma la mediana)')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    run = int(time.time())
+    params = {'run': run, 'groups': args.groups, 'activities': args.activities,
+              'words': WORDS, 'vocabulary': len(WORDS.split())}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SETUP_SQL, params)
+            #Las filas recién insertadas quedan en la lista pendiente de los índices GIN; se vuelcan para medir
+            #el índice como estaría en producción
+            cursor.execute("SELECT gin_clean_pending_list(c.oid::regclass) FROM pg_class c "
+                           "WHERE c.relname IN ('groups_search_idx', 'groupactivities_search_idx', "
+                           "'groups_name_trgm_idx', 'groupactivities_name_trgm_idx')")
+            cursor.execute("ANALYZE public.groups, public.groupactivities")
+            print(f"{'caso':<16}{'término':<24}{'resultados':>11}{'filtrado ms':>13}{'búsqueda ms':>13}{'bloques':>10}")
+            for name, term, result_type in CASES:
+                query_params = {'term': term, 'type': result_type}
+                cursor.execute(SEARCH_SQL, query_params)
+                total = cursor.fetchone()[0]['total']
+                client = sorted(explain(cursor, CLIENT_FILTER_SQL, {'term': term.strip('"')})
+                                for _ in range(args.repeat))[args.repeat // 2]
+                search = sorted(explain(cursor, SEARCH_SQL, query_params) for _ in range(args.repeat))[args.repeat // 2]
+                print(f"{name:<16}{term:<24}{total:>11}{client[0]:>13.2f}{search[0]:>13.2f}{search[1]:>10}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark de los próximos eventos del usuario (página de inicio) a medida que crece el total de membresías.
+Un usuario de prueba pertenece siempre a los mismos clubes y actividades; en cada paso se agregan membresías de
+otros usuarios y se mide, con EXPLAIN (ANALYZE, BUFFERS):
+- anterior: la consulta de get_upcoming_activities con el filtro sombreado ("user_id = user_id"), que compara la
+  columna consigo misma y recorre todas las membresías,
+- página: fn_user_upcoming_activities_page (ventana de 30 días, 20 filas), que parte de las membresías del usuario.
+El costo de la página debe mantenerse plano mientras el de la consulta anterior crece con el total.
+
+Todo se ejecuta en una transacción que se revierte al final, por lo que no deja datos; aun así conviene usar una
+base de datos de pruebas con la migración Database/migrations/V001__hot_path_indexes.sql aplicada.
+
+Uso (desde backend/, con las variables DB_* apuntando a la base de pruebas):
+    python benchmarks/bench_upcoming_events.py --steps 10000 100000 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db import get_connection
+
+SETUP_SQL = """
+INSERT INTO public.usertypes (type_id, ut_type_name) VALUES (1, 'Estudiante') ON CONFLICT DO NOTHING;
+INSERT INTO public.userstatus (user_status_id, us_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupcategories (group_category_id, gc_category_name) VALUES (1, 'Académico') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupstatus (group_status_id, gs_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.memberroles (role_id, mr_role_name) VALUES (1, 'Miembro') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupmemberstatus (group_member_status_id, gms_status_name)
+VALUES (1, 'Pendiente'), (2, 'Aprobado'), (3, 'Rechazado') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitytypes (activity_type_id, at_activity_type_name) VALUES (1, 'Taller') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitystatus (activity_status_id, as_activity_status_name)
+VALUES (1, 'Programada'), (2, 'Realizada'), (3, 'Cancelada') ON CONFLICT DO NOTHING;
+
+CREATE TEMP TABLE bench_groups (group_id integer, n integer) ON COMMIT DROP;
+
+INSERT INTO public.users (u_name, u_last_name, u_username, u_email, u_user_type_id, u_user_status_id)
+VALUES ('Bench', 'Eventos', 'bench_eventos_' || %(run)s, 'bench_eventos_' || %(run)s || '@example.com', 1, 1);
+
+WITH inserted AS (
+	INSERT INTO public.groups (g_group_name, g_group_description, g_group_status_id, g_group_owner_id, g_group_category_id)
+	SELECT 'Club ' || i, 'Club de prueba', 1, currval(pg_get_serial_sequence('public.users', 'user_id')), 1
+	FROM generate_series(1, %(groups)s) i
+	RETURNING group_id
+)
+INSERT INTO bench_groups SELECT group_id, row_number() OVER (ORDER BY group_id) - 1 FROM inserted;
+
+-- El usuario de prueba es miembro de los primeros clubes (user_groups)
+INSERT INTO public.groupmembers (user_id, group_id, gm_role_id, gm_status_id, gm_approved_by)
+SELECT currval(pg_get_serial_sequence('public.users', 'user_id')), g.group_id, 1, 2,
+	currval(pg_get_serial_sequence('public.users', 'user_id'))
+FROM bench_groups g
+WHERE g.n < %(user_groups)s;
+
+WITH inserted AS (
+	INSERT INTO public.groupactivities (ga_activity_name, ga_max_participants, ga_activity_type, ga_activity_status,
+		ga_group_id, ga_creator_id)
+	SELECT 'Actividad ' || g.n || '-' || j, 50, 1, 1, g.group_id, currval(pg_get_serial_sequence('public.users', 'user_id'))
+	FROM bench_groups g
+	CROSS JOIN generate_series(1, %(activities)s) j
+	RETURNING activity_id
+)
+INSERT INTO public.activitiesschedule (as_activity_id, as_activity_start_date, as_activity_end_date, as_activity_location)
+SELECT i.activity_id, t.start_date, t.start_date + INTERVAL '2 hours', 'Sala'
+FROM inserted i
+CROSS JOIN generate_series(1, 4) j
+CROSS JOIN LATERAL (
+	SELECT date_trunc('hour', CURRENT_TIMESTAMP) + ((i.activity_id * 7 + j * 29) %% 240 - 90) * INTERVAL '1 day' AS start_date
+) t;
+
+SELECT currval(pg_get_serial_sequence('public.users', 'user_id'));
+"""
+
+#Agrega `count` usuarios, cada uno miembro aprobado de `per_user` clubes de prueba
+GROW_SQL = """
+WITH new_users AS (
+	INSERT INTO public.users (u_name, u_last_name, u_username, u_email, u_user_type_id, u_user_status_id)
+	SELECT 'Bench', 'Fondo', 'bench_fondo_' || %(run)s || '_' || %(offset)s || '_' || i,
+		'bench_fondo_' || %(run)s || '_' || %(offset)s || '_' || i || '@example.com', 1, 1
+	FROM generate_series(1, %(count)s) i
+	RETURNING user_id
+)
+INSERT INTO public.groupmembers (user_id, group_id, gm_role_id, gm_status_id, gm_approved_by)
+SELECT u.user_id, g.group_id, 1, 2, u.user_id
+FROM new_users u
+CROSS JOIN generate_series(1, %(per_user)s) j
+INNER JOIN bench_groups g ON g.n = (u.user_id * 7 + j * 13) %% %(groups)s
+ON CONFLICT DO NOTHING;
+"""
+
+#Consulta de get_upcoming_activities antes de corregir el nombre del parámetro
+PREVIOUS_SQL = """
+SELECT a.activity_id, a.ga_activity_name, s.as_activity_start_date, s.as_activity_location
+FROM public.groupactivities a
+JOIN public.activitiesschedule s ON s.as_activity_id = a.activity_id
+WHERE a.ga_group_id IN (
+	SELECT gm.group_id FROM public.groupmembers gm
+	WHERE gm.user_id = gm.user_id AND gm.gm_status_id = 2
+)
+AND s.as_activity_start_date >= CURRENT_DATE
+"""
+
+PAGE_SQL = """
+SELECT * FROM public.fn_user_upcoming_activities_page(
+	%(user_id)s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + INTERVAL '30 days', NULL, NULL, 20)
+"""
+
+
+def explain(cursor, query: str, params: dict) -> tuple[float, int]:
+    """Tiempo de ejecución (ms) y bloques leídos de la consulta."""
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0][0]
+    return plan['Execution Time'], plan['Plan'].get('Shared Hit Blocks', 0) + plan['Plan'].get('Shared Read Blocks', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help='Total de membresías de otros usuarios en cada paso')
+    parser.add_argument('--groups', type=int, default=2000, help='Clubes de prueba')
+    parser.add_argument('--user-groups', type=int, default=5, help='Clubes del usuario de prueba')
+    parser.add_argument('--activities', type=int, default=10, help='Actividades por club')
+    parser.add_argument('--per-user', type=int, default=4, help='Clubes por usuario de fondo')
+    parser.add_argument('--repeat', type=int, default=5, help='Ejecuciones por medición (se toma la mediana)')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    run = int(time.time())
+    params = {'run': run, 'groups': args.groups, 'user_groups': args.user_groups, 'activities': args.activities}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SETUP_SQL, params)
+            user_id = cursor.fetchone()[0]
+            print(f"{'membresías':>12}{'anterior ms':>13}{'bloques':>10}{'página ms':>12}{'bloques':>10}")
+            members = 0
+            for step in sorted(args.steps):
+                users = max(0, (step - members) // args.per_user)
+                if users:
+                    cursor.execute(GROW_SQL, {**params, 'count': users, 'offset': step, 'per_user': args.per_user})
+                    cursor.execute("ANALYZE public.users, public.groupmembers, public.groupactivities, public.activitiesschedule")
+                members = step
+                previous = sorted(explain(cursor, PREVIOUS_SQL, {}) for _ in range(args.repeat))[args.repeat // 2]
+                page = sorted(explain(cursor, PAGE_SQL, {'user_id': user_id}) for _ in range(args.repeat))[args.repeat // 2]
+                print(f"{members:>12}{previous[0]:>13.2f}{previous[1]:>10}{page[0]:>12.2f}{page[1]:>10}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
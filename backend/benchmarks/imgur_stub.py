@@ -0,0 +1,108 @@
+"""
+Servidor HTTP local que imita el endpoint de subida de Imgur, para pruebas y benchmarks.
+Responde como Imgur ({"data": {"link": ...}, "success": true, "status": 200}) y permite simular:
+- el costo de abrir cada conexión (DNS + TCP + TLS) con --connect-delay,
+- la latencia de cada subida con --latency,
+- fallas temporales (503) con --fail-rate,
+- un servicio colgado que no responde con --hang.
+
+Uso (desde backend/), apuntando el backend al stub con IMGUR_ENDPOINT=http://127.0.0.1:8099/3/image:
+    python benchmarks/imgur_stub.py --port 8099 --connect-delay 0.05 --latency 0.1
+"""
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ImgurStub:
+    """Servidor stub configurable; se puede usar desde otros scripts con start()/stop()."""
+
+    def __init__(self, port: int = 0, connect_delay: float = 0, latency: float = 0,
+                 fail_rate: float = 0, hang: bool = False):
+        self.connect_delay = connect_delay
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.hang = hang
+        self.connections = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.port}/3/image"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                time.sleep(stub.connect_delay)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if stub.hang:
+                    time.sleep(3600)
+                time.sleep(stub.latency)
+                if random.random() < stub.fail_rate:
+                    self._reply(503, {"data": {"error": "Over capacity"}, "success": False, "status": 503})
+                    return
+                with stub._lock:
+                    stub.uploads += 1
+                image_id = secrets.token_urlsafe(5).replace('-', 'a').replace('_', 'b')
+                self._reply(200, {"data": {"id": image_id, "link": f"https://i.imgur.com/{image_id}.jpg"},
+                                  "success": True, "status": 200})
+
+            def _reply(self, status: int, body: dict):
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--connect-delay', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--fail-rate', type=float, default=0)
+    parser.add_argument('--hang', action='store_true')
+    args = parser.parse_args()
+
+    stub = ImgurStub(args.port, args.connect_delay, args.latency, args.fail_rate, args.hang)
+    print(f"Stub de Imgur escuchando en {stub.endpoint}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Prueba de carga de inscripciones simultáneas a actividades con cupos limitados.
+Crea un club con --activities actividades de --capacity cupos y --users usuarios, reparte los usuarios entre
+las actividades (intercalados, para que cada hilo cambie de actividad en cada inscripción) y lanza todas las
+inscripciones a la vez desde --connections conexiones (cada hilo con la suya, liberados juntos con una barrera).
+Al final comprueba, por actividad, que:
+- los inscritos no superan el máximo y coinciden con las inscripciones aceptadas,
+- el contador de activityseats coincide con los inscritos,
+y en total que clubenrollmentdaily cuenta a todos los inscritos y que no hubo interbloqueos (40P01) ni errores
+distintos del rechazo por falta de cupos.
+Con varias actividades se ve el efecto de las filas compartidas por el club (clubenrollmentdaily del día y
+'group_activities:<club>' en entityversions): las inscripciones a actividades distintas no esperan la fila de
+cupos, pero sí se serializan al confirmar; comparar la latencia con --activities 1 y con varias.
+Modos:
+- insert: INSERT directo en activityparticipants (solo los triggers),
+- procedure: public.fn_join_activity, el procedimiento que usa POST /api/user/me/activity/<id>; el rechazo por
+  falta de cupos se reconoce igual que en el backend (utils.seats), también si el procedimiento lo envuelve.
+Los datos de prueba se confirman (las conexiones deben verse entre sí) y se eliminan al terminar.
+Termina con código 1 si alguna comprobación falla.
+
+Uso (desde backend/, con las variables DB_* apuntando a una base de pruebas con fn_activity_seats_changed instalada):
+    python benchmarks/load_join_activity.py --users 1000 --capacity 50 --connections 80
+    python benchmarks/load_join_activity.py --users 1000 --capacity 50 --activities 10 --mode procedure
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db import get_connection
+from utils.seats import is_full_error, is_full_message
+
+SETUP_SQL = """
+INSERT INTO public.usertypes (type_id, ut_type_name) VALUES (1, 'Estudiante') ON CONFLICT DO NOTHING;
+INSERT INTO public.userstatus (user_status_id, us_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupcategories (group_category_id, gc_category_name) VALUES (1, 'Académico') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupstatus (group_status_id, gs_status_name) VALUES (1, 'Activo') ON CONFLICT DO NOTHING;
+INSERT INTO public.memberroles (role_id, mr_role_name) VALUES (1, 'Miembro') ON CONFLICT DO NOTHING;
+INSERT INTO public.groupmemberstatus (group_member_status_id, gms_status_name)
+VALUES (1, 'Pendiente'), (2, 'Aprobado'), (3, 'Rechazado') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitytypes (activity_type_id, at_activity_type_name) VALUES (1, 'Taller') ON CONFLICT DO NOTHING;
+INSERT INTO public.activitystatus (activity_status_id, as_activity_status_name) VALUES (1, 'Programada') ON CONFLICT DO NOTHING;
+
+INSERT INTO public.users (u_name, u_last_name, u_username, u_email, u_user_type_id, u_user_status_id)
+SELECT 'Carga', 'Run ' || %(run)s, 'load_join_' || %(run)s || '_' || i, 'load_join_' || %(run)s || '_' || i || '@example.com', 1, 1
+FROM generate_series(1, %(users)s) i;
+
+INSERT INTO public.groups (g_group_name, g_group_description, g_group_status_id, g_group_owner_id, g_group_category_id)
+SELECT 'Club de carga', 'Run ' || %(run)s, 1, min(u.user_id), 1
+FROM public.users u
+WHERE u.u_last_name = 'Run ' || %(run)s;
+
+INSERT INTO public.groupactivities (ga_activity_name, ga_activity_description, ga_max_participants, ga_activity_type,
+	ga_activity_status, ga_group_id, ga_creator_id)
+SELECT 'Actividad de carga ' || i, 'Run ' || %(run)s, %(capacity)s, 1, 1, g.group_id, g.g_group_owner_id
+FROM public.groups g
+CROSS JOIN generate_series(1, %(activities)s) i
+WHERE g.g_group_description = 'Run ' || %(run)s;
+
+-- Los usuarios son miembros aprobados del club, como exige fn_join_activity
+INSERT INTO public.groupmembers (user_id, group_id, gm_role_id, gm_status_id, gm_approved_by)
+SELECT u.user_id, g.group_id, 1, 2, g.g_group_owner_id
+FROM public.users u
+CROSS JOIN public.groups g
+WHERE u.u_last_name = 'Run ' || %(run)s
+	AND g.g_group_description = 'Run ' || %(run)s;
+
+SELECT g.group_id, array_agg(ga.activity_id ORDER BY ga.activity_id)
+FROM public.groupactivities ga
+INNER JOIN public.groups g ON g.group_id = ga.ga_group_id
+WHERE g.g_group_description = 'Run ' || %(run)s
+GROUP BY g.group_id;
+"""
+
+USERS_SQL = "SELECT user_id FROM public.users WHERE u_last_name = 'Run ' || %(run)s ORDER BY user_id"
+
+JOIN_SQL = {
+    'insert': "INSERT INTO public.activityparticipants (ap_user_id, ap_activity_id) VALUES (%(user_id)s, %(activity_id)s)",
+    'procedure': "SELECT * FROM public.fn_join_activity(%(activity_id)s, %(user_id)s)",
+}
+
+CHECK_SQL = """
+SELECT ga.activity_id,
+	(SELECT count(*) FROM public.activityparticipants ap WHERE ap.ap_activity_id = ga.activity_id),
+	(SELECT s.acs_taken FROM public.activityseats s WHERE s.activity_id = ga.activity_id)
+FROM public.groupactivities ga
+WHERE ga.ga_group_id = %(group_id)s
+ORDER BY ga.activity_id
+"""
+
+ENROLLMENTS_SQL = "SELECT COALESCE(sum(ced_enrollments), 0) FROM public.clubenrollmentdaily WHERE group_id = %(group_id)s"
+
+CLEANUP_SQL = """
+DELETE FROM public.activityparticipants WHERE ap_activity_id = ANY(%(activity_ids)s);
+DELETE FROM public.groupactivities WHERE activity_id = ANY(%(activity_ids)s);
+DELETE FROM public.groupmembers WHERE group_id = %(group_id)s;
+DELETE FROM public.clubmembersummary WHERE group_id = %(group_id)s;
+DELETE FROM public.clubmemberdaily WHERE group_id = %(group_id)s;
+DELETE FROM public.clubenrollmentdaily WHERE group_id = %(group_id)s;
+DELETE FROM public.groups WHERE group_id = %(group_id)s;
+DELETE FROM public.users WHERE u_last_name = 'Run ' || %(run)s;
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000, help='Inscripciones simultáneas (una por usuario)')
+    parser.add_argument('--capacity', type=int, default=50, help='Cupos de cada actividad')
+    parser.add_argument('--activities', type=int, default=1, help='Actividades del club entre las que se reparten los usuarios')
+    parser.add_argument('--connections', type=int, default=80,
+                        help='Conexiones concurrentes (no más que max_connections del servidor)')
+    parser.add_argument('--mode', choices=tuple(JOIN_SQL), default='insert', help='Camino de inscripción')
+    args = parser.parse_args()
+    #La barrera espera a todos los hilos, y el pool no crea más hilos que tareas
+    args.connections = min(args.connections, args.users)
+
+    run = int(time.time())
+    params = {'run': run, 'users': args.users, 'capacity': args.capacity, 'activities': args.activities}
+    setup = get_connection()
+    with setup.cursor() as cursor:
+        cursor.execute(SETUP_SQL, params)
+        group_id, activity_ids = cursor.fetchone()
+        cursor.execute(USERS_SQL, params)
+        user_ids = [row[0] for row in cursor.fetchall()]
+    setup.commit()
+    params.update(group_id=group_id, activity_ids=activity_ids)
+    #Usuario i a la actividad i % N: las inscripciones consecutivas van a actividades distintas
+    joins = [(activity_ids[i % len(activity_ids)], user_id) for i, user_id in enumerate(user_ids)]
+
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+    barrier = threading.Barrier(args.connections)
+
+    def connect():
+        local.conn = get_connection()
+        with connections_lock:
+            connections.append(local.conn)
+        barrier.wait()
+
+    def join(target: tuple[int, int]) -> tuple[int, str, float]:
+        activity_id, user_id = target
+        conn = local.conn
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(JOIN_SQL[args.mode], {'activity_id': activity_id, 'user_id': user_id})
+                row = cursor.fetchone() if cursor.description else None
+            conn.commit()
+            if row is None or row[0]:
+                outcome = 'aceptada'
+            elif is_full_message(row[1] if len(row) > 1 else None):
+                outcome = 'sin cupos'
+            else:
+                outcome = f"rechazada por el procedimiento: {str(row[1] if len(row) > 1 else '')[:80]}"
+        except Exception as e:
+            conn.rollback()
+            if is_full_error(e):
+                outcome = 'sin cupos'
+            elif getattr(e, 'pgcode', None) == '40P01':
+                outcome = 'interbloqueo'
+            else:
+                outcome = f"error {getattr(e, 'pgcode', None) or type(e).__name__}: {str(e).strip()[:80]}"
+        return activity_id, outcome, (time.perf_counter() - start) * 1000
+
+    failed = False
+    try:
+        with ThreadPoolExecutor(max_workers=args.connections, initializer=connect) as executor:
+            start = time.perf_counter()
+            results = list(executor.map(join, joins))
+            elapsed = time.perf_counter() - start
+
+        outcomes = Counter(outcome for _, outcome, _ in results)
+        accepted = Counter(activity_id for activity_id, outcome, _ in results if outcome == 'aceptada')
+        latencies = sorted(latency for _, _, latency in results)
+        with setup.cursor() as cursor:
+            cursor.execute(CHECK_SQL, params)
+            counts = cursor.fetchall()
+            cursor.execute(ENROLLMENTS_SQL, params)
+            enrollments = cursor.fetchone()[0]
+        setup.commit()
+        participants = sum(count for _, count, _ in counts)
+
+        print(f"{len(user_ids)} inscripciones a {len(activity_ids)} actividad(es) de {args.capacity} cupos "
+              f"({args.mode}, {args.connections} conexiones) en {elapsed:.2f}s")
+        for outcome, count in outcomes.most_common():
+            print(f"  {outcome}: {count}")
+        print(f"  latencia p50 {latencies[len(latencies) // 2]:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms")
+        print(f"  inscritos: {participants}, clubenrollmentdaily: {enrollments}")
+
+        requested = Counter(activity_id for activity_id, _ in joins)
+        checks = (
+            ('sin sobrecupo', all(count <= args.capacity for _, count, _ in counts)),
+            ('inscritos = aceptadas', all(count == accepted[activity_id] for activity_id, count, _ in counts)),
+            ('contador = inscritos', all((taken or 0) == count for _, count, taken in counts)),
+            ('cupos completos', all(count == min(args.capacity, requested[activity_id])
+                                    for activity_id, count, _ in counts)),
+            ('clubenrollmentdaily = inscritos', enrollments == participants),
+            ('sin interbloqueos ni errores', all(o in ('aceptada', 'sin cupos') for o in outcomes)),
+        )
+        for name, ok in checks:
+            print(f"  {'OK   ' if ok else 'FALLA'} {name}")
+            failed = failed or not ok
+    finally:
+        for conn in connections:
+            conn.close()
+        with setup.cursor() as cursor:
+            cursor.execute(CLEANUP_SQL, params)
+        setup.commit()
+        setup.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
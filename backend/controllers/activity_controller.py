@@ -2,25 +2,52 @@
 Activity Controller
 Maneja las peticiones HTTP para las actividades
 """
-from flask import request, jsonify
-from services.activity_service import ActivityService
+import itertools
+from flask import request, jsonify, Response, stream_with_context
+from services.activity_service import ActivityService, ACTIVITY_QUERY_ARGS, parse_activity_query
+from utils.procedures import to_dict, to_dicts
+from utils.pagination import parse_limit, stream_json_array
+from utils.response_cache import response_cache
+from utils.etags import conditional
 from services.jwt_service import JWTService as jwts
 from emails.email_types.joined_activity import send_activity_join_email
 from emails.email_types.left_activity import send_activity_left_email
 
 
 @jwts.token_required('access')
+@conditional('activities', daily=True)
+@response_cache.cached('activities', daily=True)
 def get_all_activities():
     """
-    Obtiene todas las actividades disponibles para estudiantes
+    Obtiene todas las actividades disponibles para estudiantes.
+    Con `limit`, `after` o algún filtro devuelve una página y el cursor `next_cursor` de la siguiente:
+    - type, status, group, category: IDs de tipo, estado, club y categoría del club
+    - from, to: fechas ISO 8601 de la ventana de inicio; when: today, week o upcoming
+    - available=true: solo actividades con cupos disponibles
+    - sort: id (por defecto), recent (más recientes) o soonest (próximas, por fecha de inicio)
+    Sin ellos devuelve la lista completa en streaming.
     """
     try:
+        if any(arg in request.args for arg in ACTIVITY_QUERY_ARGS):
+            query = parse_activity_query(request.args)
+            limit = parse_limit(request.args.get('limit'))
+            activities, next_cursor = ActivityService.query_activities(query, limit=limit,
+                                                                       after=request.args.get('after'))
+            return jsonify({'activities_list': to_dicts(activities), 'next_cursor': next_cursor}), 200
+
         activities = ActivityService.get_all_activities()
-        return jsonify(activities), 200
+        # Leer la primera fila antes de responder para que un error de base de datos devuelva 500
+        first_activity = next(activities, None)
+        records = itertools.chain((first_activity,), activities) if first_activity is not None else ()
+        return Response(stream_with_context(stream_json_array(records)), mimetype='application/json'), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 @jwts.token_required('access')
+@conditional('activity:{activity_id}')
+@response_cache.cached('activity:{activity_id}')
 def get_activity_by_id(activity_id):
     """
     Obtiene una actividad específica por ID
@@ -30,11 +57,13 @@ def get_activity_by_id(activity_id):
         if not activity:
             return jsonify({'message': 'Actividad no encontrada', 'Success': True}), 404
         
-        return jsonify(activity), 200
+        return jsonify(to_dict(activity)), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 @jwts.token_required('access')
+@conditional('group_activities:{group_id}')
+@response_cache.cached('group_activities:{group_id}')
 def get_activities_by_group(group_id):
     """
     Obtiene todas las actividades de un grupo específico
@@ -43,7 +72,7 @@ def get_activities_by_group(group_id):
         activities = ActivityService.get_activities_by_group(group_id)
         if not activities:
             return jsonify({'message': 'No se encontraron actividades para el grupo.', 'Success': True}), 404
-        return jsonify(activities), 200
+        return jsonify(to_dicts(activities)), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
@@ -58,7 +87,7 @@ def get_activities_by_club_admin(club_id):
         if not activities:
             return jsonify({'message': 'No se encontraron actividades para el grupo.', 'Success': True}), 404
         
-        return jsonify(activities), 200
+        return jsonify(to_dicts(activities)), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
@@ -78,6 +107,7 @@ def create_activity(club_id):
         
         if not activity:
             return jsonify({'error': 'Error al crear la actividad'}), 500
+        response_cache.invalidate('activities', f'group_activities:{club_id}')
 
         return jsonify({'message': activity[0], 'success': activity[1]}), 201
     except Exception as e:
@@ -94,6 +124,8 @@ def update_activity_details(activity_id):
         data = request.get_json()
 
         success, message = ActivityService.update_activity(activity_id, user_id, data)
+        if success:
+            response_cache.invalidate('activities', f'activity:{activity_id}', 'group_activities')
 
         status_code = 200 if success else 409
         return jsonify({'success': success, 'message': message}), status_code
@@ -115,7 +147,7 @@ def delete_activity(activity_id):
         
         if not success[0]:
             return jsonify({'message': success[1], 'success':success[0]}), 500
-        
+        response_cache.invalidate('activities', f'activity:{activity_id}', 'group_activities')
         return jsonify({'message': success[1], 'success':success[0]}), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
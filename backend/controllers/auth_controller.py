@@ -2,6 +2,10 @@ from flask import request, jsonify, make_response
 import uuid
 from services import auth_service
 from services.jwt_service import JWTService as jwts
+from utils.procedures import to_dict
+from utils.rate_limit import login_admission
+from utils.security import validate_password, PasswordHashBusyError
+from utils.image_storage import thumb_url, variant_urls
 from emails.email_types import verification_code_email as vce
 from emails.email_types import welcome
 
@@ -23,13 +27,25 @@ def login_user() -> tuple:
     if not password or not (username or email):
         return jsonify({"success": False, "message": "Credenciales incompletas"}), 400
 
+    #Control de admisión antes de consultar la base de datos o verificar la contraseña
+    retry_after = login_admission.check(request.remote_addr, username or email)
+    if retry_after:
+        return jsonify({"success": False, "message": "Demasiados intentos de inicio de sesión, intente más tarde"}), 429, {'Retry-After': str(retry_after)}
+
     user_data = auth_service.login_user_db(username=username, email=email)
 
     if not user_data:
         return jsonify({"success": False, "message": "Usuario no encontrado"}), 404
     
-    if auth_service.validate_password(input_password=password, hashed_password=user_data[3]):
-    
+    try:
+        valid_password = validate_password(input_password=password, hashed_password=user_data[3])
+    except PasswordHashBusyError as e:
+        return jsonify({"success": False, "message": str(e)}), 503, {'Retry-After': '1'}
+
+    if valid_password:
+        login_admission.succeeded(request.remote_addr, username or email)
+        auth_service.rehash_password_if_needed(user_data[0], password, user_data[3])
+
         user_payload =  {
             'user_id': user_data[0],
             'username': user_data[1],
@@ -78,7 +94,7 @@ def get_user_information():
     try:
         user_id = request.current_user.get("user_id")
 
-        user_info = auth_service.get_user_info_db(user_id=user_id)
+        user_info = to_dict(auth_service.get_user_info_db(user_id=user_id))
 
         if not user_info:
             return jsonify({"message": "No se encontró información del usuario.", "success": False}), 404
@@ -94,7 +110,9 @@ def get_user_information():
             "birth_date": user_info.get("birth_date").isoformat() if user_info.get("birth_date") else None,
             "doc_number": user_info.get("doc_number"),
             "doc_type": user_info.get("doc_type"),
-            "profile_photo_url": user_info.get("profile_photo_url"),
+            #La foto se muestra como avatar (160 px); las demás versiones van en profile_photo_variants
+            "profile_photo_url": thumb_url(user_info.get("profile_photo_url")),
+            "profile_photo_variants": variant_urls(user_info.get("profile_photo_url")) if user_info.get("profile_photo_url") else None,
             "user_type": user_info.get("user_type"),
             "user_status": user_info.get("user_status"),
             "career": user_info.get("career")
@@ -156,7 +174,10 @@ def create_user() -> tuple:
     """
     data = request.get_json()
 
-    message, success = auth_service.create_user_db(data)
+    try:
+        message, success = auth_service.create_user_db(data)
+    except PasswordHashBusyError as e:
+        return jsonify({"success": False, "message": str(e)}), 503, {'Retry-After': '1'}
 
     if success:
         return jsonify({
@@ -228,7 +249,10 @@ def reset_password_via_code():
     if not password:
         return jsonify({"message": 'La contraseña o el correo son requeridos.', 'success':False})
 
-    hashed_password = auth_service.hash_password(password=password)
+    try:
+        hashed_password = auth_service.hash_password(password=password)
+    except PasswordHashBusyError as e:
+        return jsonify({"success": False, "message": str(e)}), 503, {'Retry-After': '1'}
 
     update_result = auth_service.reset_password(email=email, new_password=hashed_password)
 
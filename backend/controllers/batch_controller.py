@@ -0,0 +1,31 @@
+"""
+Batch Controller
+Maneja las peticiones agrupadas: varias peticiones GET a la API resueltas en un solo viaje de red
+"""
+from flask import request, jsonify, current_app
+from services.jwt_service import JWTService as jwts
+from utils.batch import batch_dispatcher, BatchRequestError
+
+
+@jwts.token_required('access')
+def batch_requests():
+    """
+    Ejecuta varias peticiones GET internas con una sola verificación del token.
+    Cuerpo: {"requests": ["/api/auth/me", "/api/users/me/groups", {"path": "/api/user/me/events",
+    "headers": {"If-None-Match": "..."}}]}
+    Returns:
+        JSON con {"responses": [{"path", "status", "body", "etag"?}, ...]} en el mismo orden que la petición.
+        Cada sub-petición conserva su propio estado (200, 304, 404, ...).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            items = batch_dispatcher.parse(data.get('requests'))
+        except BatchRequestError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
+
+        responses = batch_dispatcher.dispatch(current_app._get_current_object(), items,
+                                              request.current_user, request.remote_addr)
+        return jsonify({'responses': responses, 'success': True}), 200
+    except Exception as e:
+        return jsonify({'error': 'Error interno del servidor', 'success': False}), 500
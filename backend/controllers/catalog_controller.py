@@ -0,0 +1,25 @@
+"""
+Catalog Controller
+Maneja las peticiones HTTP para las tablas de catálogo
+"""
+from flask import request, jsonify, make_response
+from utils.catalogs import catalogs
+
+CATALOG_MAX_AGE = 3600
+
+def get_catalogs():
+    """
+    Devuelve todas las tablas de catálogo en una sola respuesta cacheable.
+    No requiere autenticación porque el formulario de registro las necesita.
+    """
+    try:
+        snapshot = catalogs.snapshot()
+        if snapshot.version in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = jsonify({'catalogs': snapshot.as_dict(), 'version': snapshot.version})
+        response.set_etag(snapshot.version)
+        response.headers['Cache-Control'] = f'public, max-age={CATALOG_MAX_AGE}'
+        return response
+    except Exception as e:
+        return jsonify({'error': 'Error interno del servidor'}), 500
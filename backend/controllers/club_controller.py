@@ -2,17 +2,23 @@
 Club Controller
 Maneja las peticiones HTTP para los clubs/grupos
 """
+import itertools
 import json
-from flask import request, jsonify, make_response
-from services.club_service import ClubService
+from flask import request, jsonify, Response, stream_with_context
+from services.club_service import ClubService, CLUB_MEMBER_FIELDS
+from utils.procedures import to_dict, to_dicts
+from utils.pagination import parse_limit, stream_json_array
+from utils.csv_export import stream_csv
+from utils.response_cache import response_cache
+from utils.etags import conditional
 from services.jwt_service import JWTService as jwts
-from emails.email_types import group_member_approved, group_member_rejected
-from controllers.images_controller import ImageUploader
-import pandas as pd
+from services.upload_service import UploadService, UploadBusyError, UploadForbiddenError
 
 MAX_GROUPS_PER_USER = 4
 
 @jwts.token_required('access')
+@conditional('group:{club_id}')
+@response_cache.cached('group:{club_id}')
 def get_club_details(club_id):
     """
     Obtiene los detalles de un club/grupo específico
@@ -22,7 +28,7 @@ def get_club_details(club_id):
         if not club:
             return jsonify({'error': 'Club no encontrado'}), 404
         
-        return jsonify(club), 200
+        return jsonify(to_dict(club)), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
@@ -39,7 +45,7 @@ def get_club_by_user():
         if not groups:
             return jsonify({'message': 'No se han encontrado grupos para el usuario.', 'Success': True}), 404
         
-        return jsonify({'groups_list':groups}), 200
+        return jsonify({'groups_list': to_dicts(groups)}), 200
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
@@ -72,6 +78,7 @@ def create_club():
         )
 
         if success:
+            response_cache.invalidate('groups')
             return jsonify({'message': message, 'success': success}), 201
         else:
             return jsonify({'message': message, 'success': success}), 400
@@ -83,16 +90,29 @@ def create_club():
         }), 500
 
 @jwts.token_required('access')
+@conditional('groups')
+@response_cache.cached('groups')
 def get_all_clubs():
     """
     Obtiene todos los clubes/grupos disponibles.
+    Con los parámetros `limit` y/o `after` devuelve una página y el cursor `next_cursor` de la siguiente;
+    sin ellos devuelve la lista completa en streaming.
     """
     try:
+        if 'limit' in request.args or 'after' in request.args:
+            limit = parse_limit(request.args.get('limit'))
+            clubs, next_cursor = ClubService.get_clubs_page(limit=limit, after=request.args.get('after'))
+            return jsonify({'clubs_list': to_dicts(clubs), 'next_cursor': next_cursor}), 200
+
         clubs = ClubService.get_all_clubs()
-        if not clubs:
+        first_club = next(clubs, None)
+        if first_club is None:
             return jsonify({'message': 'No hay clubes disponibles.', 'success': True}), 404
-        
-        return jsonify({'clubs_list': clubs}), 200
+
+        body = stream_json_array(itertools.chain((first_club,), clubs), prefix='{"clubs_list":', suffix='}')
+        return Response(stream_with_context(body), mimetype='application/json'), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Error interno del servidor'}), 500
 
@@ -132,27 +152,19 @@ def upload_group_pfp(club_id):
         payload = request.current_user
         user_id = payload['user_id']
 
-        response = ImageUploader(image).run()
-
-        print(response)
-
-        if response.get("status") == 200:
-            link = response["data"]["link"]
-
-            message, success = ClubService.update_group_photo_in_db(club_id, user_id, link)
+        try:
+            job_id = UploadService.submit_photo_upload(image.read(), user_id, 'group', club_id)
+        except UploadBusyError as e:
+            return jsonify({"error": str(e), "success": False}), 503, {'Retry-After': '5'}
+        except UploadForbiddenError as e:
+            return jsonify({"error": str(e), "success": False}), 403
 
-            if not success:
-                return jsonify({
-                        "message": message,
-                        "success": False
-                    }), 500
-        
-            return jsonify({
-                "profile_photo_url": link,
-                "success": True
-            }), 200
-
-        return jsonify({"error": "Error al subir la imagen.", "success": False}), 500
+        return jsonify({
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": f"/api/uploads/{job_id}",
+            "success": True
+        }), 202
     except Exception as e:
         return jsonify({"message":"ha ocurrido un error en proceso de subida.", "success":False}), 500
 
@@ -168,6 +180,7 @@ def delete_club(club_id):
 
         if not success:
             return jsonify({'message': message, 'success': success}), 400
+        response_cache.invalidate('groups', f'group:{club_id}')
         
         return jsonify({'message': message, 'success': success}), 200
 
@@ -185,6 +198,7 @@ def reactivate_club(club_id):
 
         if not success:
             return jsonify({'message': message, 'success': success}), 400
+        response_cache.invalidate('groups', f'group:{club_id}')
 
         return jsonify({'message': message, 'success': success}), 200
 
@@ -200,6 +214,8 @@ def update_club_settings(club_id):
         user_id = request.current_user.get('user_id')
         data = request.get_json()
         success = ClubService.update_club_settings(club_id, user_id, data)
+        if success[1]:
+            response_cache.invalidate('groups', f'group:{club_id}', 'activities', 'activity', f'group_activities:{club_id}')
         return jsonify({'message':success[0], 'success': success[1]}), 200
     
     except Exception as e:
@@ -244,13 +260,29 @@ def get_activity_enrollment_stats(club_id:int):
         return jsonify({'error': 'Error interno del servidor'}), 500
     
 @jwts.token_required('access')
+@conditional('group_members:{club_id}')
 def get_club_members(club_id:int):
     """
     Obtiene los miembros de un club
     """
     try:
         result = ClubService.get_club_members(club_id=club_id)
-        return jsonify({'members_data':result}), 200
+        return jsonify({'members_data': to_dicts(result)}), 200
+    except Exception as e:
+        print(e)
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+@jwts.token_required('access')
+def get_club_dashboard(club_id: int):
+    """
+    Obtiene en una sola petición los datos del panel de administración del club:
+    estadísticas de miembros, mapa de calor, inscripciones, miembros y solicitudes pendientes.
+    """
+    try:
+        result = ClubService.get_club_dashboard(club_id=club_id)
+        if result is None:
+            return jsonify({'error': 'Club no encontrado'}), 404
+        return jsonify(result), 200
     except Exception as e:
         print(e)
         return jsonify({'error': 'Error interno del servidor'}), 500
@@ -285,48 +317,35 @@ def update_pending_join_request(club_id: int, request_id: int):
         )
         status_code = 200 if result.get('success') else 400
 
-        user_data = result.get('user_data') or {}
-
+        # El correo al solicitante lo envía el dispatcher de la bandeja de salida
         if status_code == 200:
-            if result.get('was_approved'):
-                group_member_approved.send_group_member_approval_email(
-                    recipient=user_data.get('email', ''),
-                    fullname=user_data.get('fullname', ''),
-                    group_name=user_data.get('group_name', '')
-                )
-            else:
-                group_member_rejected.send_group_rejection_email(
-                    recipient=user_data.get('email', ''),
-                    fullname=user_data.get('fullname', ''),
-                    group_name=user_data.get('group_name', '')
-                )
+            response_cache.invalidate('groups', f'group:{club_id}')
 
         return jsonify({'message': result.get('message'), 'success': result.get('success')}), status_code
 
     except Exception as e:
-        return jsonify({'message': str(e), 'success': False}), 500
+        print(e)
+        return jsonify({'message': 'Error interno del servidor', 'success': False}), 500
     
 @jwts.token_required('access')
 def export_club_members(club_id):
     """
     Exporta los miembros del club en formato CSV
     Requiere autenticación
+    El archivo se genera en streaming a partir de un cursor del lado del servidor.
     """
     try:
-        members_data = ClubService.get_club_members(club_id=club_id)
+        members = ClubService.stream_club_members(club_id=club_id)
 
         # Validar que se obtuvo data
-        if not members_data:
+        first_member = next(members, None)
+        if first_member is None:
             return jsonify({"success": False, "message": "No hay datos de miembros para exportar."}), 404
 
-        # Convertir a DataFrame y a CSV
-        df = pd.DataFrame(members_data)
-        csv_data = df.to_csv(index=False, encoding='utf-8-sig')
-
         # Preparar respuesta HTTP con archivo CSV
-        response = make_response(csv_data)
+        body = stream_csv(itertools.chain((first_member,), members), CLUB_MEMBER_FIELDS)
+        response = Response(stream_with_context(body), mimetype="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=members.csv"
-        response.headers["Content-type"] = "text/csv"
         return response
 
     except Exception as e:
@@ -0,0 +1,28 @@
+"""
+Media Controller
+Sirve las imágenes del almacenamiento local (fotos de perfil de usuarios y grupos).
+"""
+import os
+import re
+from flask import jsonify, send_file
+from utils.image_storage import LocalImageStorage, VARIANT_SIZES, image_storage
+
+#Las imágenes están direccionadas por su contenido: una URL nunca cambia de contenido
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', 31536000))
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+def get_media(key: str, variant: str):
+    """
+    Devuelve una versión de una imagen guardada con caché inmutable.
+    No requiere autenticación porque las imágenes se usan en etiquetas <img>.
+    """
+    if not isinstance(image_storage, LocalImageStorage) or not KEY_PATTERN.match(key) or variant not in VARIANT_SIZES:
+        return jsonify({'error': 'Imagen no encontrada'}), 404
+    path = image_storage.path_for(key, variant)
+    if not os.path.isfile(path):
+        return jsonify({'error': 'Imagen no encontrada'}), 404
+
+    response = send_file(path, mimetype='image/jpeg', max_age=MEDIA_MAX_AGE, etag=f"{key}-{variant}")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,34 @@
+"""
+Monitoring Controller
+Expone métricas internas del proceso (pool de conexiones, caché de respuestas, etc.) para monitoreo
+"""
+import os
+from flask import request, jsonify
+from utils.db import pool_stats
+from utils.response_cache import response_cache
+from utils.imgur import imgur_client
+from utils.token_cache import refresh_tokens
+from utils.rate_limit import login_admission
+from utils.seats import full_activities
+
+
+def get_metrics():
+    """
+    Devuelve las métricas del proceso.
+    Si METRICS_TOKEN está configurado se exige en la cabecera X-Metrics-Token.
+    """
+    expected_token = os.getenv('METRICS_TOKEN')
+    if expected_token and request.headers.get('X-Metrics-Token') != expected_token:
+        return jsonify({'error': 'No autorizado'}), 401
+    try:
+        return jsonify({
+            'pid': os.getpid(),
+            'db_pool': pool_stats(),
+            'response_cache': response_cache.stats(),
+            'http_clients': {'imgur': imgur_client.stats()},
+            'refresh_tokens': refresh_tokens.stats(),
+            'login_rate_limit': login_admission.stats(),
+            'full_activities': full_activities.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': 'Error interno del servidor'}), 500
@@ -1,6 +1,6 @@
-from emails.email_types.activity_cancelled import send_activity_cancel_email
-from emails.email_types.activity_reminder import send_activity_reminder_email
-from emails.email_types.activity_created import send_activity_created_email
+from emails.email_types.activity_cancelled import send_activity_cancel_emails
+from emails.email_types.activity_reminder import send_activity_reminder_emails
+from emails.email_types.activity_created import send_activity_created_emails
 from emails.email_types.verification_code_email import send_verification_email
 from emails.email_types.welcome import send_welcome_email
 from app import app
@@ -37,21 +37,18 @@ class ProcessNotifications:
                     self._handle_reset_pass_code()
                 case 'welcome_user':
                     self._handle_welcome_user()
+                case 'entity_changed' | 'refresh_tokens_changed' | 'catalogs_changed':
+                    # Los consumen las cachés de los procesos web
+                    pass
                 case _:
                     print(f"Contexto desconocido: {self.context}")
 
     def _handle_activity_cancelled(self):
         """ Maneja el envío de correos electrónicos para actividades canceladas.
         Extrae los datos necesarios del contexto y envía correos electrónicos a los usuarios afectados."""
-        user_data = self.data.get('user_data')
+        user_data = self.data.get('user_data') or []
         activity_name = self.data.get('activity_name')
-        for user in user_data:
-            try:
-                email = user.get("email")
-                name = user.get("name")
-                send_activity_cancel_email(email, name, activity_name)
-            except Exception as e:
-                print("Error al enviar correo de cancelación:", e)
+        self._report('cancelación', send_activity_cancel_emails(user_data, activity_name))
  
     def _handle_activity_reminder(self):
         """ Maneja el envío de correos electrónicos de recordatorio para actividades.
@@ -59,35 +56,36 @@ class ProcessNotifications:
         activity_name = self.data.get('activity_name')
         location = self.data.get('location')
         activity_time = self.data.get('activity_time')
-        user_data = self.data.get('user_data')
-        for user in user_data:
-            email = user.get('email')
-            fullname = user.get('name')
-            if email and fullname:
-                send_activity_reminder_email(
-                    recipient=email,
-                    fullname=fullname,
-                    activity_name=activity_name,
-                    activity_time=activity_time,
-                    location=location
-                )
+        user_data = self.data.get('user_data') or []
+        self._report('recordatorio', send_activity_reminder_emails(
+            users=user_data,
+            activity_name=activity_name,
+            activity_time=activity_time,
+            location=location
+        ))
     
     def _handle_activity_created(self):
         """ Maneja el envío de correos electrónicos para actividades creadas.
         Extrae los datos necesarios del contexto y envía correos electrónicos a los usuarios relacionados con la actividad."""
         group_name = self.data.get('group_name')
         activity_name = self.data.get('activity_name')
-        user_data = self.data.get('user_data')
-        for user in user_data:
-            email = user.get('email')
-            fullname = user.get('name')
-            if email and fullname:
-                send_activity_created_email(
-                    recipient=email,
-                    fullname=fullname,
-                    activity_name=activity_name,
-                    group_name=group_name
-                )
+        user_data = self.data.get('user_data') or []
+        self._report('nueva actividad', send_activity_created_emails(
+            users=user_data,
+            activity_name=activity_name,
+            group_name=group_name
+        ))
+
+    @staticmethod
+    def _report(kind: str, result: tuple):
+        """ Informa el resultado de un envío masivo.
+        Args:
+            kind (str): Tipo de correo enviado.
+            result (tuple): (cantidad enviada, lista de (mensaje, error) fallidos)."""
+        sent, failed = result
+        print(f"Correos de {kind}: {sent} enviados, {len(failed)} fallidos")
+        for message, error in failed:
+            print(f"Error al enviar correo de {kind} a {message.recipients}: {error}")
     
     def _handle_reset_pass_code(self):
         """ Maneja el envío de correos electrónicos para el restablecimiento de contraseña.
@@ -0,0 +1,33 @@
+"""
+Search Controller
+Maneja la búsqueda por palabras clave de clubes y actividades
+"""
+from flask import request, jsonify
+from services.jwt_service import JWTService as jwts
+from services.search_service import SearchService, parse_search_filters
+from utils.pagination import parse_limit
+from utils.etags import conditional
+from utils.response_cache import response_cache
+
+
+@jwts.token_required('access')
+@conditional('groups', 'activities')
+@response_cache.cached('groups', 'activities')
+def search():
+    """
+    Busca clubes y actividades por nombre y descripción.
+    Parámetros: q (texto, obligatorio), type ('club' o 'activity'), category, activity_type,
+    status (requiere type), limit y after (cursor de la página siguiente).
+    Returns:
+        JSON con {total, fuzzy, facets: {type, category, activity_type, status}, results, next_cursor}.
+    """
+    try:
+        filters = parse_search_filters(request.args)
+        limit = parse_limit(request.args.get('limit'))
+        result = SearchService.search(limit=limit, after=request.args.get('after'), **filters)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(e)
+        return jsonify({'error': 'Error interno del servidor'}), 500
@@ -0,0 +1,38 @@
+"""
+Upload Controller
+Maneja las peticiones HTTP para consultar el estado de las subidas de fotos de perfil
+"""
+import uuid
+from flask import request, jsonify
+from services.upload_service import UploadService
+from services.jwt_service import JWTService as jwts
+from utils.procedures import to_dict
+from utils.image_storage import variant_urls
+
+
+@jwts.token_required('access')
+def get_upload_job(job_id: str):
+    """
+    Devuelve el estado de una subida del usuario autenticado ('pending', 'done' o 'failed').
+    Cuando termina incluye la URL de la foto y de cada una de sus versiones.
+    """
+    try:
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return jsonify({'error': 'Subida no encontrada', 'success': False}), 404
+
+        job = UploadService.get_job(job_id, request.current_user['user_id'])
+        if job is None:
+            return jsonify({'error': 'Subida no encontrada', 'success': False}), 404
+
+        result = to_dict(job)
+        result['profile_photo_url'] = result.pop('url')
+        if job.status == 'done':
+            result['variants'] = variant_urls(job.url)
+        response = jsonify({**result, 'success': True})
+        if job.status == 'pending':
+            response.headers['Retry-After'] = '1'
+        return response, 200
+    except Exception as e:
+        return jsonify({'error': 'Error interno del servidor', 'success': False}), 500
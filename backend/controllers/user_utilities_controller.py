@@ -2,9 +2,11 @@ from flask import request, jsonify
 import requests
 from services import user_utilities_service as uus
 from services.jwt_service import JWTService as jwts
-from controllers.images_controller import ImageUploader
-from emails.email_types.joined_activity import send_activity_join_email
-from emails.email_types.left_activity import send_activity_left_email
+from utils.procedures import to_dicts
+from utils.pagination import parse_limit
+from utils.etags import conditional
+from services.upload_service import UploadService, UploadBusyError
+from utils.security import PasswordHashBusyError
 
 
 @jwts.token_required("refresh")
@@ -28,11 +30,14 @@ def change_password():
     # Obtener contraseña actual desde la BD
     hashed_password, _ = uus.get_user_encrypted_password(user_id=user_id)
 
-    if not uus.validate_password(current_password, hashed_password):
-        return jsonify({"message": "La contraseña no coincide", "success": False}), 401
+    try:
+        if not uus.validate_password(current_password, hashed_password):
+            return jsonify({"message": "La contraseña no coincide", "success": False}), 401
 
-    # Actualizar contraseña
-    new_hashed = uus.hash_password(new_password)
+        # Actualizar contraseña
+        new_hashed = uus.hash_password(new_password)
+    except PasswordHashBusyError as e:
+        return jsonify({"message": str(e), "success": False}), 503, {'Retry-After': '1'}
     message, success = uus.update_user_password(user_id=user_id, hashed_password=new_hashed)
 
     if not success:
@@ -55,7 +60,7 @@ def get_activities_by_user():
     payload = request.current_user
     user_id = payload.get('user_id')
     try:
-        activities = uus.get_user_related_activities(user_id=user_id)
+        activities = to_dicts(uus.get_user_related_activities(user_id=user_id))
     except Exception as e:
         return jsonify({"error": "Error al consultar actividades"}), 500
     
@@ -94,15 +99,10 @@ def join_activity(activity_id):
     try:
         user_id = request.current_user.get('user_id')
 
-        success, message, data = uus.join_activity(activity_id, user_id)
+        success, message, _ = uus.join_activity(activity_id, user_id)
 
         status_code = 200 if success else 409
 
-        if success:
-            email = data.get('email')
-            
-            send_activity_join_email(recipient=email, data=data)
-
         return jsonify({'message': message, 'success':success}), status_code
 
     except Exception as e:
@@ -117,14 +117,10 @@ def leave_activity(activity_id):
     try:
         user_id = request.current_user.get('user_id')
 
-        success, message, data = uus.leave_activity(activity_id, user_id)
+        success, message, _ = uus.leave_activity(activity_id, user_id)
 
         status_code = 200 if success else 409
 
-        if success:
-            email = data.get('email')
-            send_activity_left_email(recipient=email, data=data)
-
         return jsonify({'message': message, 'success':success}), status_code
 
     except Exception as e:
@@ -190,41 +186,59 @@ def upload_user_pfp():
         payload = request.current_user
         user_id = payload['user_id']
 
-        response = ImageUploader(image).run()
-
-        if response.get("status") == 200:
-            link = response["data"]["link"]
-
-            message, success = uus.update_user_photo_in_db(user_id, link)
+        try:
+            job_id = UploadService.submit_photo_upload(image.read(), user_id, 'user', user_id)
+        except UploadBusyError as e:
+            return jsonify({"error": str(e), "success": False}), 503, {'Retry-After': '5'}
 
-            if not success:
-                return jsonify({
-                        "profile_photo_url": link,
-                        "message": message,
-                        "success": False
-                    }), 500
-
-            return jsonify({
-                "profile_photo_url": link,
-                "success": True
-            }), 200
-
-        return jsonify({"error": "Error al subir la imagen.", "success": False}), 500
+        return jsonify({
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": f"/api/uploads/{job_id}",
+            "success": True
+        }), 202
     
     except Exception as e:
         return jsonify({"message":"ha ocurrido un error en proceso de subida.", "success":False}), 500
 
-@jwts.token_required('access')  
+@jwts.token_required('access')
+@conditional('user_groups:{user_id}', 'activities', daily=True)
 def upcoming_user_events():
     """Obtiene los eventos próximos del usuario autenticado.
-     Utiliza el token JWT para identificar al usuario y devuelve los eventos almacenados en la base de datos."""
+     Utiliza el token JWT para identificar al usuario y devuelve los eventos almacenados en la base de datos.
+     Parámetros opcionales: `days` (ventana desde el inicio del día UTC, 30 por defecto), `limit` y `after` (cursor `next_cursor`)."""
     try:
         if request.method == 'OPTIONS':
             return jsonify({'message': 'OK'}), 200
         
         user_id = request.current_user.get('user_id')
-        result = uus.get_upcoming_events(user_id=user_id)
-        return jsonify({'upcoming_events':result}), 200
+        limit = parse_limit(request.args.get('limit'))
+        days = uus.parse_days(request.args.get('days'))
+        events, next_cursor = uus.get_upcoming_events(user_id=user_id, limit=limit,
+                                                      after=request.args.get('after'), days=days)
+        return jsonify({'upcoming_events': to_dicts(events), 'next_cursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(e)
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+@jwts.token_required('access')
+@conditional('user_groups:{user_id}', 'activities', daily=True)
+def user_events_calendar():
+    """
+    Feed compacto para el calendario: horarios de actividades de los clubes del usuario autenticado
+    entre `from` y `to` (fechas ISO 8601; por defecto el mes desde hoy).
+    Cada evento es un arreglo con las columnas de `fields`.
+    """
+    try:
+        user_id = request.current_user.get('user_id')
+        start, end = uus.parse_calendar_range(request.args.get('from'), request.args.get('to'))
+        events = uus.get_calendar_events(user_id=user_id, start=start, end=end)
+        return jsonify({'fields': uus.CALENDAR_FIELDS, 'events': events,
+                        'from': start.isoformat(), 'to': end.isoformat()}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(e)
         return jsonify({'error': 'Error interno del servidor'}), 500
@@ -3,25 +3,46 @@ Este módulo provee la funcionalidad para enviar una notificación por correo cu
 Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo.
 """
 from emails.renderer import EmailRenderer as er
-from emails.sender import EmailSender
+from emails.sender import EmailSender, BatchEmailSender
 from utils.emojis import emojis as em
 
+def _context(fullname: str, activity_name: str) -> dict:
+    return {
+        "fullname": fullname,
+        "activity_name": activity_name,
+        "HAND_WAVE": em.WELCOME,
+        "CANCEL": em.ERROR,
+        "SORRY": em.SAD,
+    }
+
 def send_activity_cancel_email(recipient: str, fullname: str, activity_name: str, subject="Actividad cancelada") -> bool:
     """
     Envía un correo electrónico notificando la cancelación de una actividad.
     """
     try:
-        context = {
-            "fullname": fullname,
-            "activity_name": activity_name,
-            "HAND_WAVE": em.WELCOME,
-            "CANCEL": em.ERROR,
-            "SORRY": em.SAD,
-        }
-        html = er.render("activity_cancelled.html", context)
+        html = er.render("activity_cancelled.html", _context(fullname, activity_name))
         subject = f"{em.ERROR} {subject}"
         EmailSender(subject, [recipient]).send_html(html)
         return True
     except Exception as e:
         print(f"Error al enviar correo: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def send_activity_cancel_emails(users: list, activity_name: str, subject="Actividad cancelada") -> tuple[int, list]:
+    """
+    Envía la notificación de cancelación a varios usuarios reutilizando conexiones SMTP.
+    Args:
+        users (list): Diccionarios con 'email' y 'name' de cada destinatario.
+    Returns:
+        tuple: (cantidad enviada, lista de (mensaje, error) fallidos)
+    """
+    subject = f"{em.ERROR} {subject}"
+
+    def messages():
+        recipients = [user for user in users if user.get("email")]
+        htmls = er.render_many("activity_cancelled.html", _context(None, activity_name), ("fullname",),
+                               ({"fullname": user.get("name")} for user in recipients))
+        for user, html in zip(recipients, htmls):
+            yield EmailSender(subject, [user.get("email")]).build_message(html)
+
+    return BatchEmailSender().send(messages())
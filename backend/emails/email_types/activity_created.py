@@ -2,25 +2,45 @@
 Este módulo provee la funcionalidad para enviar una notificación por correo cuando una actividad es creada
 Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo."""
 from emails.renderer import EmailRenderer as er
-from emails.sender import EmailSender
+from emails.sender import EmailSender, BatchEmailSender
 from utils.emojis import emojis as em
 
+def _context(fullname: str, activity_name: str, group_name: str) -> dict:
+    return {
+        "fullname": fullname,
+        "group_name": group_name,
+        "activity_name": activity_name,
+        "HAND_WAVE": em.WELCOME,
+        "MEGAPHONE": em.ANNOUNCE,
+        "CALENDAR": em.CALENDAR,
+        "LIGHTBULB": em.LIGHTBULB,
+    }
+
 def send_activity_created_email(recipient: str, fullname: str, activity_name: str, group_name:str,subject="Nueva actividad en tu grupo") -> bool:
     """Envía un correo electrónico notificando la creación de una actividad."""
     try:
-        context = {
-            "fullname": fullname,
-            "group_name": group_name,
-            "activity_name": activity_name,
-            "HAND_WAVE": em.WELCOME,
-            "MEGAPHONE": em.ANNOUNCE,
-            "CALENDAR": em.CALENDAR,
-            "LIGHTBULB": em.LIGHTBULB,
-        }
-        html = er.render("activity_created.html", context)
+        html = er.render("activity_created.html", _context(fullname, activity_name, group_name))
         subject = f"{em.ANNOUNCE} {subject}"
         EmailSender(subject, [recipient]).send_html(html)
         return True
     except Exception as e:
         print(f"Error al enviar correo: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def send_activity_created_emails(users: list, activity_name: str, group_name: str, subject="Nueva actividad en tu grupo") -> tuple[int, list]:
+    """Envía la notificación de creación a varios usuarios reutilizando conexiones SMTP.
+    Args:
+        users (list): Diccionarios con 'email' y 'name' de cada destinatario.
+    Returns:
+        tuple: (cantidad enviada, lista de (mensaje, error) fallidos)
+    """
+    subject = f"{em.ANNOUNCE} {subject}"
+
+    def messages():
+        recipients = [user for user in users if user.get('email') and user.get('name')]
+        htmls = er.render_many("activity_created.html", _context(None, activity_name, group_name), ("fullname",),
+                               ({"fullname": user.get('name')} for user in recipients))
+        for user, html in zip(recipients, htmls):
+            yield EmailSender(subject, [user.get('email')]).build_message(html)
+
+    return BatchEmailSender().send(messages())
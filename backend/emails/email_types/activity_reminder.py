@@ -3,27 +3,46 @@ Este módulo provee la funcionalidad para enviar un recordatorio por correo cuan
 Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo.
 """
 from emails.renderer import EmailRenderer as er
-from emails.sender import EmailSender
+from emails.sender import EmailSender, BatchEmailSender
 from utils.emojis import emojis as em
 
+SUBJECT = f"{em.TIME} Recordatorio de actividad"
+
+def _context(fullname: str, activity_name: str, activity_time: str, location: str) -> dict:
+    return {
+        "fullname": fullname,
+        "activity_name": activity_name,
+        "activity_time": activity_time,
+        "location": location,
+        "HAND_WAVE": em.WELCOME,
+        "CALENDAR": em.CALENDAR,
+        "TIME": em.TIME,
+        "PLACE": em.LOCATION,
+        "LIGHTBULB": em.LIGHTBULB
+    }
+
 def send_activity_reminder_email(recipient: str, fullname: str, activity_name: str, activity_time: str, location: str) -> bool:
     """Envía un correo electrónico recordando a un usuario sobre una actividad próxima."""
     try:
-        context = {
-            "fullname": fullname,
-            "activity_name": activity_name,
-            "activity_time": activity_time,
-            "location": location,
-            "HAND_WAVE": em.WELCOME,
-            "CALENDAR": em.CALENDAR,
-            "TIME": em.TIME,
-            "PLACE": em.LOCATION,
-            "LIGHTBULB": em.LIGHTBULB
-        }
-        html = er.render("activity_reminder.html", context)
-        subject = f"{em.TIME} Recordatorio de actividad"
-        EmailSender(subject, [recipient]).send_html(html)
+        html = er.render("activity_reminder.html", _context(fullname, activity_name, activity_time, location))
+        EmailSender(SUBJECT, [recipient]).send_html(html)
         return True
     except Exception as e:
         print(f"Error al enviar correo: {e}")
         return False
+
+def send_activity_reminder_emails(users: list, activity_name: str, activity_time: str, location: str) -> tuple[int, list]:
+    """Envía el recordatorio a varios usuarios reutilizando conexiones SMTP.
+    Args:
+        users (list): Diccionarios con 'email' y 'name' de cada destinatario.
+    Returns:
+        tuple: (cantidad enviada, lista de (mensaje, error) fallidos)
+    """
+    def messages():
+        recipients = [user for user in users if user.get('email') and user.get('name')]
+        htmls = er.render_many("activity_reminder.html", _context(None, activity_name, activity_time, location), ("fullname",),
+                               ({"fullname": user.get('name')} for user in recipients))
+        for user, html in zip(recipients, htmls):
+            yield EmailSender(SUBJECT, [user.get('email')]).build_message(html)
+
+    return BatchEmailSender().send(messages())
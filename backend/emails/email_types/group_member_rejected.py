@@ -2,21 +2,26 @@
 Este módulo provee la funcionalidad para enviar un correo cuando un miembro es rechazado en un grupo.
 Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo"""
 from emails.renderer import EmailRenderer as er
+from flask_mail import Message
+from emails.mail import mail
 from emails.sender import EmailSender
 from utils.emojis import emojis as em
 
+def build_group_rejection_message(recipient: str, fullname: str, group_name: str, subject="Tu solicitud no ha sido aprobada") -> Message:
+    """Construye el correo de rechazo sin enviarlo (lo usa el dispatcher de la bandeja de salida)."""
+    context = {
+        "fullname": fullname,
+        "group_name": group_name,
+        "ERROR": em.ERROR,
+        "RETRY": em.RETRY
+    }
+    html = er.render("group_member_rejected.html", context)
+    return EmailSender(f"{em.ERROR} {subject}", [recipient]).build_message(html)
+
 def send_group_rejection_email(recipient: str, fullname: str, group_name: str, subject="Tu solicitud no ha sido aprobada") -> bool:
     """Envía un correo electrónico notificando el rechazo de un miembro en un grupo."""
     try:
-        context = {
-            "fullname": fullname,
-            "group_name": group_name,
-            "ERROR": em.ERROR,      
-            "RETRY": em.RETRY       
-        }
-        html = er.render("group_member_rejected.html", context)
-        subject = f"{em.ERROR} {subject}"
-        EmailSender(subject, [recipient]).send_html(html)
+        mail.send(build_group_rejection_message(recipient, fullname, group_name, subject))
         return True
     except Exception as e:
         return False
@@ -3,26 +3,34 @@
     Este módulo provee la funcionalidad para enviar un correo cuando un usuario se inscribe en una actividad.
     Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo."""
 from emails.renderer import EmailRenderer as er
+from flask_mail import Message
 from emails.sender import EmailSender
 from utils.emojis import emojis as em
 
+SUBJECT = f"{em.ANNOUNCE} Confirmación de inscripción en actividad"
+
+def _render(data: dict) -> str:
+    context = {
+        **data,
+        "HAND_WAVE": em.WELCOME,
+        "CALENDAR": em.CALENDAR,
+        "WELCOME": em.WELCOME,
+        "PIN": em.PIN,
+        "NOTES": em.NOTE,
+        "TIME": em.TIME,
+        "PLACE": em.LOCATION,
+        "LIGHTBULB": em.LIGHTBULB
+    }
+    return er.render("joined_activity.html", context)
+
+def build_activity_join_message(recipient: str, data: dict) -> Message:
+    """Construye el correo de inscripción sin enviarlo (lo usa el dispatcher de la bandeja de salida)."""
+    return EmailSender(SUBJECT, [recipient]).build_message(_render(data))
+
 def send_activity_join_email(recipient: str, data: dict) -> bool:
     """Envía un correo electrónico notificando la inscripción de un usuario en una actividad."""
     try:
-        context = {
-            **data,
-            "HAND_WAVE": em.WELCOME,
-            "CALENDAR": em.CALENDAR,
-            "WELCOME": em.WELCOME,
-            "PIN": em.PIN,
-            "NOTES": em.NOTE,
-            "TIME": em.TIME,
-            "PLACE": em.LOCATION,
-            "LIGHTBULB": em.LIGHTBULB
-        }
-        html = er.render("joined_activity.html", context)
-        subject = f"{em.ANNOUNCE} Confirmación de inscripción en actividad"
-        EmailSender(subject, [recipient]).send_html(html)
+        EmailSender(SUBJECT, [recipient]).send_html(_render(data))
         return True
     except Exception as e:
         print(f"Error al enviar correo: {e}")
@@ -3,20 +3,28 @@ Este módulo provee la funcionalidad para enviar un correo cuando un usuario se
 Utiliza un renderizador para crear el contenido del correo y un remitente para enviar el correo."""
 
 from emails.renderer import EmailRenderer as er
+from flask_mail import Message
 from emails.sender import EmailSender
 from utils.emojis import emojis as em
 
+SUBJECT = f"{em.ANNOUNCE} Confirmación de salida de actividad"
+
+def _render(data: dict) -> str:
+    context = {
+        **data,
+        "WELCOME": em.WELCOME,
+        "ANNOUNCE": em.ANNOUNCE,
+    }
+    return er.render("left_activity.html", context)
+
+def build_activity_left_message(recipient: str, data: dict) -> Message:
+    """Construye el correo de salida sin enviarlo (lo usa el dispatcher de la bandeja de salida)."""
+    return EmailSender(SUBJECT, [recipient]).build_message(_render(data))
+
 def send_activity_left_email(recipient: str, data: dict) -> bool:
     """Envía un correo electrónico notificando la salida de un usuario de una actividad."""
     try:
-        context = {
-            **data,
-            "WELCOME": em.WELCOME,
-            "ANNOUNCE": em.ANNOUNCE,
-        }
-        html = er.render("left_activity.html", context)
-        subject = f"{em.ANNOUNCE} Confirmación de salida de actividad"
-        EmailSender(subject, [recipient]).send_html(html)
+        EmailSender(SUBJECT, [recipient]).send_html(_render(data))
         return True
     except Exception as e:
         print(f"Error al enviar correo: {e}")
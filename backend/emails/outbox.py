@@ -0,0 +1,68 @@
+"""
+Módulo dispatcher de la bandeja de salida de correos.
+Toma lotes de correos pendientes de la tabla emailoutbox, los construye según su tipo y los envía
+reutilizando conexiones SMTP. Lo ejecuta el servicio de listener al recibir 'outbox_email' y periódicamente.
+"""
+from emails.sender import BatchEmailSender
+from emails.email_types.joined_activity import build_activity_join_message
+from emails.email_types.left_activity import build_activity_left_message
+from emails.email_types.group_member_approved import build_group_member_approval_message
+from emails.email_types.group_member_rejected import build_group_rejection_message
+from services.outbox_service import OutboxService
+
+#Constructores de mensajes por tipo de correo: (destinatario, payload) -> Message
+OUTBOX_BUILDERS = {
+    'activity_joined': build_activity_join_message,
+    'activity_left': build_activity_left_message,
+    'group_member_approved': lambda recipient, payload: build_group_member_approval_message(
+        recipient, payload.get('fullname', ''), payload.get('group_name', '')),
+    'group_member_rejected': lambda recipient, payload: build_group_rejection_message(
+        recipient, payload.get('fullname', ''), payload.get('group_name', '')),
+}
+
+
+class OutboxDispatcher:
+    """Envía los correos pendientes de la bandeja de salida por lotes."""
+
+    def __init__(self, batch_size: int, lease_seconds: int, max_attempts: int):
+        """
+        Args:
+            batch_size (int): Correos reservados por lote.
+            lease_seconds (int): Segundos que dura la reserva de un lote antes de volver a estar disponible.
+            max_attempts (int): Intentos antes de marcar un correo como fallido definitivamente.
+        """
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def run_once(self) -> int:
+        """
+        Reserva y envía un lote. Requiere contexto de aplicación Flask.
+        Returns:
+            int: Cantidad de correos reservados (si es igual a batch_size probablemente quedan más).
+        """
+        emails = OutboxService.claim_emails(self.batch_size, self.lease_seconds)
+        if not emails:
+            return 0
+
+        failures = []
+        messages = {}
+        for email in emails:
+            builder = OUTBOX_BUILDERS.get(email.kind)
+            if builder is None:
+                failures.append((email.email_id, f"Tipo de correo desconocido: {email.kind}"))
+                continue
+            try:
+                messages[email.email_id] = builder(email.recipient, email.payload or {})
+            except Exception as e:
+                failures.append((email.email_id, f"Error al construir el correo: {e}"))
+
+        ids_by_message = {id(message): email_id for email_id, message in messages.items()}
+        _, failed = BatchEmailSender().send(messages.values())
+        failures += [(ids_by_message[id(message)], str(error)) for message, error in failed]
+
+        failed_ids = {email_id for email_id, _ in failures}
+        sent_ids = [email_id for email_id in messages if email_id not in failed_ids]
+        OutboxService.complete_emails(sent_ids, failures, self.max_attempts)
+        print(f"Bandeja de salida: {len(sent_ids)} enviados, {len(failures)} fallidos")
+        return len(emails)
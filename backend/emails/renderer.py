@@ -1,11 +1,15 @@
 """
 Módulo de renderizado de correos electrónicos.
-Este módulo provee la funcionalidad para renderizar plantillas de correos electrónicos utilizando Flask."""
+Este módulo provee la funcionalidad para renderizar plantillas de correos electrónicos utilizando Flask.
+Para envíos masivos la plantilla se renderiza una sola vez con marcadores en los campos que cambian por destinatario
+(p. ej. el nombre) y cada correo se arma concatenando el resultado con los valores escapados."""
 
-from flask import render_template
+from flask import render_template, current_app
+from markupsafe import escape
 
 class EmailRenderer:
     TEMPLATE_FOLDER = "mail_templates"
+    MARKER = "\x00EMAIL_FIELD_{}\x00"
 
     @classmethod
     def render(cls, template_name: str, context: dict) -> str:
@@ -18,3 +22,66 @@ class EmailRenderer:
         """
         file_to_render = f"{cls.TEMPLATE_FOLDER}/{template_name}"
         return render_template(file_to_render, **context)
+
+    @classmethod
+    def render_many(cls, template_name: str, context: dict, fields: tuple, recipients):
+        """Renderiza la misma plantilla para varios destinatarios haciendo el trabajo de plantilla una sola vez.
+        Args:
+            template_name (str): Nombre de la plantilla a renderizar.
+            context (dict): Contexto común a todos los destinatarios.
+            fields (tuple): Campos del contexto que cambian por destinatario.
+            recipients (iterable): Diccionarios con los valores de `fields` de cada destinatario.
+        Returns:
+            generator: Contenido HTML de cada destinatario, en el mismo orden.
+        """
+        recipients = iter(recipients)
+        first = next(recipients, None)
+        if first is None:
+            return
+        expected = cls.render(template_name, {**context, **first})
+        skeleton = cls._skeleton(template_name, context, fields)
+        # La plantilla puede usar los campos de formas que los marcadores no reproducen (filtros, condiciones);
+        # si el primer correo no coincide con el renderizado completo se renderiza cada uno por separado
+        if skeleton is None or cls._assemble(skeleton, first) != expected:
+            yield expected
+            for recipient in recipients:
+                yield cls.render(template_name, {**context, **recipient})
+            return
+
+        yield expected
+        for recipient in recipients:
+            yield cls._assemble(skeleton, recipient)
+
+    @classmethod
+    def _skeleton(cls, template_name: str, context: dict, fields: tuple):
+        """Renderiza la plantilla con marcadores y la separa en partes fijas y campos.
+        Devuelve (partes, escapar) o None si algún marcador no aparece tal cual en el resultado."""
+        markers = {cls.MARKER.format(field): field for field in fields}
+        html = cls.render(template_name, {**context, **{field: marker for marker, field in markers.items()}})
+        if any(marker not in html for marker in markers):
+            return None
+
+        parts = []
+        rest = html
+        while True:
+            positions = [(rest.find(marker), marker) for marker in markers if marker in rest]
+            if not positions:
+                parts.append(rest)
+                break
+            index, marker = min(positions)
+            parts.append(rest[:index])
+            parts.append(markers[marker])
+            rest = rest[index + len(marker):]
+        return tuple(parts), cls._autoescape(template_name)
+
+    @staticmethod
+    def _assemble(skeleton, recipient: dict) -> str:
+        """Arma el correo de un destinatario: partes fijas en posiciones pares, campos en impares."""
+        parts, autoescape = skeleton
+        convert = (lambda value: str(escape(value))) if autoescape else str
+        return ''.join(part if i % 2 == 0 else convert(recipient.get(part)) for i, part in enumerate(parts))
+
+    @classmethod
+    def _autoescape(cls, template_name: str) -> bool:
+        autoescape = current_app.jinja_env.autoescape
+        return autoescape(f"{cls.TEMPLATE_FOLDER}/{template_name}") if callable(autoescape) else bool(autoescape)
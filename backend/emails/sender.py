@@ -1,3 +1,7 @@
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask_mail import Message
 from flask import current_app
 from emails.mail import mail
@@ -16,15 +20,120 @@ class EmailSender():
        self._subject = subject
        self._recipients = recipients
 
-    def send_html(self, html_content:str):
-        """Envía un correo electrónico con contenido HTML.
+    def build_message(self, html_content:str) -> Message:
+        """Construye el mensaje con contenido HTML sin enviarlo.
         Args:
             html_content (str): Contenido HTML del correo electrónico.
         """
-        msg = Message(
+        return Message(
             subject=self._subject,
             recipients=self._recipients,
             html=html_content,
             sender=current_app.config['MAIL_DEFAULT_SENDER']
         )
-        mail.send(msg)
\ No newline at end of file
+
+    def send_html(self, html_content:str):
+        """Envía un correo electrónico con contenido HTML.
+        Args:
+            html_content (str): Contenido HTML del correo electrónico.
+        """
+        mail.send(self.build_message(html_content))
+
+
+class BatchEmailSender:
+    """ Envío masivo de correos reutilizando conexiones SMTP.
+    Cada conexión del pool se abre una sola vez (TLS y login incluidos) y envía mensajes hasta agotar el lote,
+    respetando un límite de mensajes por segundo. Si el servidor cierra la conexión o responde con un error
+    temporal, se reconecta y se reintenta el mensaje."""
+
+    #Errores atribuibles al mensaje o destinatario: reintentar no sirve
+    PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPNotSupportedError)
+
+    def __init__(self, connections: int = None, rate_per_connection: float = None, retries: int = None):
+        """
+        Args:
+            connections (int, optional): Conexiones SMTP simultáneas. Por defecto MAIL_BATCH_CONNECTIONS.
+            rate_per_connection (float, optional): Mensajes por segundo por conexión (0 sin límite). Por defecto MAIL_BATCH_RATE.
+            retries (int, optional): Reintentos por mensaje ante errores de conexión. Por defecto MAIL_BATCH_RETRIES.
+        """
+        config = current_app.config
+        self._connections = max(1, connections if connections is not None else int(config.get('MAIL_BATCH_CONNECTIONS', 3)))
+        rate = rate_per_connection if rate_per_connection is not None else float(config.get('MAIL_BATCH_RATE', 0))
+        self._interval = 1 / rate if rate > 0 else 0
+        self._retries = retries if retries is not None else int(config.get('MAIL_BATCH_RETRIES', 2))
+
+    def send(self, messages) -> tuple[int, list]:
+        """Envía los mensajes del lote.
+        Args:
+            messages (iterable): Mensajes (flask_mail.Message); puede ser un generador, se consume bajo demanda.
+        Returns:
+            tuple: (cantidad enviada, lista de (mensaje, error) que no se pudieron enviar)
+        """
+        app = current_app._get_current_object()
+        source = iter(messages)
+        source_lock = threading.Lock()
+
+        def next_message():
+            with source_lock:
+                return next(source, None)
+
+        with ThreadPoolExecutor(max_workers=self._connections, thread_name_prefix='smtp') as executor:
+            results = list(executor.map(lambda _: self._worker(app, next_message), range(self._connections)))
+
+        sent = sum(result[0] for result in results)
+        failed = [failure for result in results for failure in result[1]]
+        return sent, failed
+
+    def _worker(self, app, next_message) -> tuple[int, list]:
+        """Envía mensajes por una conexión propia hasta que no queden en el lote."""
+        sent = 0
+        failed = []
+        connection = None
+        next_send_at = 0
+        with app.app_context():
+            try:
+                while (message := next_message()) is not None:
+                    attempt = 0
+                    while True:
+                        try:
+                            if connection is None:
+                                connection = mail.connect()
+                                connection.__enter__()
+                            delay = next_send_at - time.monotonic()
+                            if delay > 0:
+                                time.sleep(delay)
+                            connection.send(message)
+                            next_send_at = time.monotonic() + self._interval
+                            sent += 1
+                            break
+                        except self.PERMANENT_ERRORS as e:
+                            failed.append((message, e))
+                            break
+                        except (smtplib.SMTPException, OSError) as e:
+                            self._close(connection)
+                            connection = None
+                            if attempt >= self._retries or self._is_permanent(e):
+                                failed.append((message, e))
+                                break
+                            attempt += 1
+                            time.sleep(min(0.5 * 2 ** attempt, 5))
+            finally:
+                self._close(connection)
+        return sent, failed
+
+    @staticmethod
+    def _is_permanent(error) -> bool:
+        """Las respuestas 5xx del servidor (salvo desconexión) no se reintentan."""
+        return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+    @staticmethod
+    def _close(connection):
+        if connection is None or connection.host is None:
+            return
+        try:
+            connection.host.quit()
+        except Exception:
+            try:
+                connection.host.close()
+            except Exception:
+                pass
@@ -0,0 +1,26 @@
+"""
+Este archivo recalcula los resúmenes de analítica de clubes (panel de administración) desde las tablas de origen.
+Los triggers de la base de datos los mantienen al día; este comando se usa para la carga inicial al instalarlos,
+después de cambiar app.analytics_timezone o para corregir diferencias.
+
+Uso (desde backend/):
+    python rebuild_club_analytics.py              # todos los clubes
+    python rebuild_club_analytics.py --club-id 5  # un club
+"""
+import argparse
+import time
+from services.club_service import ClubService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--club-id', type=int, default=None, help='Club a reconstruir (por defecto, todos)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    clubs = ClubService.rebuild_club_analytics(args.club_id)
+    print(f"Resúmenes de analítica reconstruidos: {clubs} club(es) en {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
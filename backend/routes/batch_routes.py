@@ -0,0 +1,11 @@
+"""
+Blueprint para las peticiones agrupadas en una aplicación Flask.
+Este módulo define la ruta que resuelve varias peticiones GET de la API en una sola petición.
+"""
+from flask import Blueprint
+from controllers.batch_controller import batch_requests
+
+# Crear blueprint
+batch_bp = Blueprint("batch_bp", __name__)
+
+batch_bp.route("/api/batch", methods=['POST'])(batch_requests)
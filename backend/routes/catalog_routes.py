@@ -0,0 +1,11 @@
+"""
+Blueprint para las rutas de catálogos en una aplicación Flask.
+Este módulo define la ruta que expone las tablas de catálogo (tipos, estados, categorías, roles, etc.).
+"""
+from flask import Blueprint
+from controllers.catalog_controller import get_catalogs
+
+# Crear blueprint
+catalog_bp = Blueprint("catalog_bp", __name__)
+
+catalog_bp.route("/api/catalogs", methods=['GET'])(get_catalogs)
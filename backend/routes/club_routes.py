@@ -11,6 +11,7 @@ from controllers.club_controller import (
     get_weekly_activity_heatmap,
     get_activity_enrollment_stats,
     get_club_members,
+    get_club_dashboard,
     request_join_group,
     club_pending_approval_request,
     update_pending_join_request,
@@ -33,6 +34,7 @@ club_bp.route("/api/groups", methods= ['POST'])(create_club)
 club_bp.route("/api/groups", methods=['GET'])(get_all_clubs)
 club_bp.route("/api/groups/<int:club_id>/photo", methods=['PUT'])(upload_group_pfp)
 #Administración
+club_bp.route("/api/admin/clubs/<int:club_id>/dashboard", methods=['GET'])(get_club_dashboard)
 club_bp.route("/api/admin/clubs/<int:club_id>/members/stats", methods=['GET'])(get_member_stats)
 club_bp.route("/api/admin/clubs/<int:club_id>/activities/weekly-heatmap", methods=['GET'])(get_weekly_activity_heatmap)
 club_bp.route("/api/admin/clubs/<int:club_id>/activities/enrollments", methods=['GET'])(get_activity_enrollment_stats)
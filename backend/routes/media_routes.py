@@ -0,0 +1,11 @@
+"""
+Blueprint para las rutas de imágenes en una aplicación Flask.
+Este módulo define la ruta que sirve las imágenes del almacenamiento local.
+"""
+from flask import Blueprint
+from controllers.media_controller import get_media
+
+# Crear blueprint
+media_bp = Blueprint("media_bp", __name__)
+
+media_bp.route("/media/<key>/<variant>.jpg", methods=['GET'])(get_media)
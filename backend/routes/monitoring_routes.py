@@ -0,0 +1,11 @@
+"""
+Blueprint para las rutas de monitoreo en una aplicación Flask.
+Este módulo define las rutas que exponen métricas internas del backend.
+"""
+from flask import Blueprint
+from controllers.monitoring_controller import get_metrics
+
+# Crear blueprint
+monitoring_bp = Blueprint("monitoring_bp", __name__)
+
+monitoring_bp.route("/api/metrics", methods=['GET'])(get_metrics)
@@ -0,0 +1,11 @@
+"""
+Blueprint para la búsqueda en una aplicación Flask.
+Este módulo define la ruta de búsqueda por palabras clave de clubes y actividades.
+"""
+from flask import Blueprint
+from controllers.search_controller import search
+
+# Crear blueprint
+search_bp = Blueprint("search_bp", __name__)
+
+search_bp.route("/api/search", methods=['GET'])(search)
@@ -0,0 +1,11 @@
+"""
+Blueprint para las rutas de subidas en una aplicación Flask.
+Este módulo define la ruta que informa el estado de las subidas de fotos de perfil en segundo plano.
+"""
+from flask import Blueprint
+from controllers.upload_controller import get_upload_job
+
+# Crear blueprint
+upload_bp = Blueprint("upload_bp", __name__)
+
+upload_bp.route("/api/uploads/<job_id>", methods=['GET'])(get_upload_job)
@@ -7,7 +7,8 @@ from controllers.user_utilities_controller import (change_password,
                                                    upload_user_pfp, 
                                                    update_user_information, get_user_notifications, 
                                                    update_user_notifications, get_activities_by_user,
-                                                   join_activity, leave_activity, upcoming_user_events)
+                                                   join_activity, leave_activity, upcoming_user_events,
+                                                   user_events_calendar)
 
 users_bp = Blueprint("users_bp", __name__)
 
@@ -21,3 +22,4 @@ users_bp.route("/api/user/me/activities", methods=['GET'])(get_activities_by_use
 users_bp.route("/api/user/me/activity/<int:activity_id>", methods=['POST'])(join_activity)
 users_bp.route("/api/user/me/activity/<int:activity_id>", methods=['PUT'])(leave_activity)
 users_bp.route("/api/user/me/events", methods=['GET'])(upcoming_user_events)
+users_bp.route("/api/user/me/events/calendar", methods=['GET'])(user_events_calendar)
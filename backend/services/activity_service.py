@@ -2,186 +2,187 @@
 Activity Service
 Maneja la lógica de negocio para las actividades
 """
-from utils.db import get_connection, null_parse
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from utils.db import null_parse
+from utils import procedures as sp
+from utils.pagination import decode_cursor, split_page
+from utils import catalogs
+from collections import namedtuple
+from typing import Iterator, List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+
+#Campos devueltos por los procedimientos, en orden de columna
+ACTIVITY_LIST_FIELDS = ('activity_id', 'activity_name', 'activity_description', 'max_participants', 'group_id',
+                        'creator_name', 'activity_datetime', 'location', 'participants_count',
+                        'activity_type_name', 'activity_status_name', 'group_name')
+ACTIVITY_DETAIL_FIELDS = ('activity_id', 'activity_name', 'activity_description', 'max_participants',
+                          'creator_name', 'activity_datetime', 'location', 'participants_count',
+                          'activity_type_name', 'activity_status_name', 'group_name')
+ACTIVITY_ADMIN_FIELDS = ('activity_id', 'activity_name', 'activity_description', 'max_participants',
+                         'schedules', 'location', 'participants_count',
+                         'activity_type_name', 'activity_status_name', 'group_name')
+#fn_query_activities devuelve IDs de tipo/estado que se resuelven con la caché de catálogos
+ACTIVITY_PAGE_CONVERTERS = {'activity_type_name': catalogs.activity_type_name,
+                            'activity_status_name': catalogs.activity_status_name}
+
+#Filtros y orden del listado de actividades (fn_query_activities). Es inmutable: se compone con `_replace`,
+#p. ej. ActivityQuery(sort='soonest')._replace(group_id=5)
+ActivityQuery = namedtuple('ActivityQuery', ('type_id', 'status_id', 'group_id', 'category_id', 'start', 'end',
+                                             'with_seats', 'sort'),
+                           defaults=(None, None, None, None, None, None, False, 'id'))
+ACTIVITY_SORTS = ('id', 'recent', 'soonest')
+#Ventanas predefinidas del parámetro `when` (RF3.2.2), en días completos desde hoy (UTC); None es sin fin
+ACTIVITY_WINDOWS = {'today': 1, 'week': 7, 'upcoming': None}
+#Parámetros de consulta que seleccionan el listado filtrado/paginado en lugar del listado completo
+ACTIVITY_QUERY_ARGS = ('limit', 'after', 'type', 'status', 'group', 'category', 'from', 'to', 'when',
+                       'available', 'sort')
+
+
+def _parse_int(value, name: str) -> Optional[int]:
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"El parámetro {name} debe ser un entero")
+
+def _parse_datetime(value, name: str) -> Optional[datetime]:
+    if value in (None, ''):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"El parámetro {name} debe ser una fecha ISO 8601")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def parse_activity_query(args) -> ActivityQuery:
+    """
+    Valida los parámetros del listado de actividades: type, status, group, category, from, to (fechas u horas
+    ISO 8601; sin zona horaria se toman en UTC), when (today, week o upcoming; excluye from/to),
+    available (true para solo actividades con cupos) y sort (id, recent o soonest).
+    'soonest' sin ventana muestra las próximas actividades, desde hoy.
+    Lanza ValueError si alguno no es válido.
+    """
+    sort = args.get('sort') or 'id'
+    if sort not in ACTIVITY_SORTS:
+        raise ValueError(f"El parámetro sort debe ser uno de: {', '.join(ACTIVITY_SORTS)}")
+
+    available = (args.get('available') or 'false').lower()
+    if available not in ('true', 'false'):
+        raise ValueError("El parámetro available debe ser true o false")
+
+    start = _parse_datetime(args.get('from'), 'from')
+    end = _parse_datetime(args.get('to'), 'to')
+    when = args.get('when')
+    if when:
+        if when not in ACTIVITY_WINDOWS:
+            raise ValueError(f"El parámetro when debe ser uno de: {', '.join(ACTIVITY_WINDOWS)}")
+        if start or end:
+            raise ValueError("El parámetro when no se puede combinar con from/to")
+    if when or (sort == 'soonest' and not start and not end):
+        #Ventanas alineadas al día, para que el resultado (y su ETag) solo cambie de un día a otro
+        start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        days = ACTIVITY_WINDOWS[when] if when else None
+        end = start + timedelta(days=days) if days else None
+    if start and end and end <= start:
+        raise ValueError("El parámetro to debe ser posterior a from")
+
+    return ActivityQuery(type_id=_parse_int(args.get('type'), 'type'),
+                         status_id=_parse_int(args.get('status'), 'status'),
+                         group_id=_parse_int(args.get('group'), 'group'),
+                         category_id=_parse_int(args.get('category'), 'category'),
+                         start=start, end=end, with_seats=available == 'true', sort=sort)
 
 class ActivityService:
     @staticmethod
-    def get_all_activities() -> List[Dict[str, Any]]:
+    def get_all_activities() -> Iterator[tuple]:
         """
         Obtiene todas las actividades disponibles en la base de datos.
+        Las filas se leen con un cursor del lado del servidor a medida que se consumen.
         """
-        try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
-            cursor.execute("SELECT * FROM public.fn_get_all_activities()")
-            activities = cursor.fetchall()
-
-            # Convertir a lista de diccionarios
-            result = []
-            for activity in activities:
-                result.append({
-                    'activity_id': activity[0],
-                    'activity_name': activity[1],
-                    'activity_description': activity[2],
-                    'max_participants': activity[3],
-                    'group_id': activity[4],
-                    'creator_name': activity[5],
-                    'activity_datetime': activity[6] if activity[6] else None,
-                    'location': activity[7],
-                    'participants_count': activity[8],
-                    'activity_type_name': activity[9],
-                    'activity_status_name': activity[10],
-                    'group_name': activity[11]
-                })
-
-            cursor.close()
-            connection.close()
-            return result
+        return sp.stream('public.fn_get_all_activities', fields=ACTIVITY_LIST_FIELDS)
 
-        except Exception as e:
-            print(f"Error getting all activities: {e}")
-            return []
-        finally:
+    @staticmethod
+    def query_activities(query: ActivityQuery, limit: int, after: str = None) -> tuple[List[tuple], Optional[str]]:
+        """
+        Obtiene una página de actividades con los filtros y el orden de `query` (paginación keyset).
+        El cursor incluye el orden con el que se generó ('soonest' también la fecha de inicio de la última fila).
+        Retorna las actividades y el cursor de la página siguiente (None si no hay más).
+        Lanza ValueError si el cursor no es válido o no corresponde al orden pedido.
+        """
+        after_start = after_id = None
+        if query.sort == 'id':
+            cursor = decode_cursor(after)
+            if cursor:
+                after_id = int(cursor[0])
+            cursor_key = lambda activity: (activity.activity_id,)
+        elif query.sort == 'recent':
+            cursor = decode_cursor(after, 2)
             if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+                if cursor[0] != 'recent':
+                    raise ValueError("Cursor inválido")
+                after_id = int(cursor[1])
+            cursor_key = lambda activity: ('recent', activity.activity_id)
+        else:
+            cursor = decode_cursor(after, 3)
+            if cursor:
+                if cursor[0] != 'soonest' or not isinstance(cursor[1], str):
+                    raise ValueError("Cursor inválido")
+                try:
+                    after_start = datetime.fromisoformat(cursor[1]) if cursor[1] else None
+                except ValueError:
+                    raise ValueError("Cursor inválido")
+                after_id = int(cursor[2])
+            cursor_key = lambda activity: ('soonest', activity.activity_datetime.isoformat()
+                                           if activity.activity_datetime else '', activity.activity_id)
+
+        catalogs.refresh()
+        activities = sp.fetch_page('public.fn_query_activities',
+                                   (query.type_id, query.status_id, query.group_id, query.category_id,
+                                    query.start, query.end, query.with_seats, query.sort,
+                                    after_start, after_id, limit + 1), limit + 1,
+                                   fields=ACTIVITY_LIST_FIELDS, converters=ACTIVITY_PAGE_CONVERTERS)
+        return split_page(activities, limit, cursor_key)
+
     @staticmethod
-    def get_activity_by_id(activity_id: int) -> Optional[Dict[str, Any]]:
+    def get_activity_by_id(activity_id: int) -> Optional[tuple]:
         """
         Obtiene los detalles de una actividad específica por su ID
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
-            cursor.callproc("public.fn_get_activity_by_id", (activity_id,))
-            activity = cursor.fetchone()
-            
-            if not activity:
-                cursor.close()
-                connection.close()
-                return None
-            
-            result = {
-                'activity_id': activity[0],
-                'activity_name': activity[1],
-                'activity_description': activity[2],
-                'max_participants': activity[3],
-                'creator_name': activity[4],
-                'activity_datetime': activity[5] if activity[5] else None,
-                'location': activity[6],
-                'participants_count': activity[7],
-                'activity_type_name': activity[8],
-                'activity_status_name': activity[9],
-                'group_name': activity[10]
-            }
-
-            cursor.close()
-            connection.close()
-            return result
-            
+            return sp.fetch_one("public.fn_get_activity_by_id", (activity_id,), fields=ACTIVITY_DETAIL_FIELDS)
         except Exception as e:
             print(f"Error getting activity by id: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
-    def get_activities_by_group(group_id: int) -> List[Dict[str, Any]]:
+    def get_activities_by_group(group_id: int) -> List[tuple]:
         """
         Obtiene todas las actividades de un grupo específico
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
-            cursor.callproc("public.fn_get_activities_by_group", (group_id,))          
-            activities = cursor.fetchall()
-            
-            result = []
-            for activity in activities:
-                result.append({
-                    'activity_id': activity[0],
-                    'activity_name': activity[1],
-                    'activity_description': activity[2],
-                    'max_participants': activity[3],
-                    'creator_name': activity[4],
-                    'activity_datetime': activity[5] if activity[5] else None,
-                    'location': activity[6],
-                    'participants_count': activity[7],
-                    'activity_type_name': activity[8],
-                    'activity_status_name': activity[9],
-                    'group_name': activity[10]
-                })
-
-            cursor.close()
-            connection.close()
-            return result
+            return sp.fetch_all("public.fn_get_activities_by_group", (group_id,), fields=ACTIVITY_DETAIL_FIELDS)
         except Exception as e:
             print(f"Error getting activities by group: {e}")
             return []
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
-    def get_activities_by_club_admin(club_id: int) -> List[Dict[str, Any]]:
+    def get_activities_by_club_admin(club_id: int) -> List[tuple]:
         """
         Obtiene todas las actividades de un club específico para los panales de administración
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
-            cursor.callproc("public.fn_get_activities_by_club_admin", (club_id,))
-            activities = cursor.fetchall()
-            
-            result = []
-            for activity in activities:
-                result.append({
-                'activity_id': activity[0],
-                'activity_name': activity[1],
-                'activity_description': activity[2],
-                'max_participants': activity[3],
-                'schedules': activity[4],
-                'location': activity[5],
-                'participants_count': activity[6],
-                'activity_type_name': activity[7],
-                'activity_status_name': activity[8],
-                'group_name': activity[9]})
-            
-            cursor.close()
-            connection.close()
-            return result
-            
+            return sp.fetch_all("public.fn_get_activities_by_club_admin", (club_id,), fields=ACTIVITY_ADMIN_FIELDS)
         except Exception as e:
             print(f"Error getting activities by club admin: {e}")
             return []
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
     def create_activity(club_id: int, activity_data: Dict[str, Any], creator_id: int) -> Optional[Dict[str, Any]]:
         """
         Crea una nueva actividad
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()      
-            cursor.callproc('public.fn_create_activity', (
+            success, message = sp.fetch_row('public.fn_create_activity', (
                 club_id,
                 creator_id,
                 activity_data.get('activity_name'),
@@ -191,34 +192,20 @@ class ActivityService:
                 activity_data.get('start_date'),
                 activity_data.get('end_time'),
                 activity_data.get('location')
-            ))
-            
-            success, message = cursor.fetchone()
-            connection.commit()
-            
-            cursor.close()
-            connection.close()
+            ), commit=True)
 
             # Retornar la actividad creada
             return (message,  success)
-            
+
         except Exception as e:
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
     def update_activity(activity_id: int, user_id:int, activity_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Actualiza los detalles de una actividad existente
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
             name = null_parse(activity_data.get('name'))
             description = null_parse(activity_data.get('description'))
             max_participants = null_parse(activity_data.get('max_participants'))
@@ -227,57 +214,33 @@ class ActivityService:
             end_datetime = null_parse(activity_data.get('end_datetime'))
             location = null_parse(activity_data.get('location'))
 
-            cursor.callproc('public.fn_update_activity',(activity_id, 
-                                                        user_id,
-                                                        name,
-                                                        description,
-                                                        max_participants,
-                                                        activity_type,
-                                                        start_datetime,
-                                                        end_datetime,
-                                                        location))
-              
-            connection.commit()
-            success, message = cursor.fetchone()
-            cursor.close()
-            connection.close()
+            success, message = sp.fetch_row('public.fn_update_activity',(activity_id,
+                                                                        user_id,
+                                                                        name,
+                                                                        description,
+                                                                        max_participants,
+                                                                        activity_type,
+                                                                        start_datetime,
+                                                                        end_datetime,
+                                                                        location), commit=True)
 
             return success, message
 
         except Exception as e:
             return (False, 'Se ha producido un error en la actualizacion.')
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
     def delete_activity(activity_id: int, user_id: int) -> tuple[bool, str]:
         """
         Elimina una actividad existente
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
-            cursor.callproc('public.fn_delete_activity',(
+            success, message = sp.fetch_row('public.fn_delete_activity',(
                 activity_id,
                 user_id
-            ))
+            ), commit=True)
 
-            connection.commit()
-            success, message = cursor.fetchone()
-            
-            cursor.close()
-            connection.close()
-            
             return (success, message)
-            
+
         except Exception as e:
             return (False, 'Se ha producido un error al eliminar la actividad.')
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
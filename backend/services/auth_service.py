@@ -1,82 +1,64 @@
-from utils.db import get_connection, null_parse
-from utils.security import hash_password, validate_password, gen_random_fp_code, cookies_config, auth_token_ttl, refresh_token_ttl, reset_token_ttl
+from utils.db import null_parse
+from utils import procedures as sp
+from utils.token_cache import refresh_tokens
+from utils.security import hash_password, needs_rehash, submit_rehash, PasswordHashBusyError, gen_random_fp_code, cookies_config, auth_token_ttl, refresh_token_ttl, reset_token_ttl
 
 def login_user_db(username:str = None, email:str = None) -> tuple:
     """Autentica un usuario en la base de datos usando nombre de usuario o email."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        return sp.fetch_row("public.fn_user_login", (null_parse(username), null_parse(email)))
+    except Exception as e:
+        return (str(e), False)
 
-        cursor.callproc("public.fn_user_login", (null_parse(username), null_parse(email)))
-        result = cursor.fetchone()
+def rehash_password_if_needed(user_id: int, password: str, hashed_password: str) -> bool:
+    """Tras un inicio de sesión correcto, recalcula en segundo plano el hash si se generó con otro costo de bcrypt.
+    El reemplazo es condicional (compare-and-set) para no pisar un cambio de contraseña concurrente."""
+    if not needs_rehash(hashed_password):
+        return False
 
-        cursor.close()
-        conn.close()
+    def store(new_hash: str):
+        sp.fetch_value("public.fn_rehash_user_password", (user_id, hashed_password, new_hash), commit=True)
 
-        return result
-    
-    except Exception as e:
-        conn.rollback()
-        return (str(e), False)
-    finally:
-        cursor.close()
-        conn.close()
+    return submit_rehash(password, store)
 
 def revoke_user_sessions(user_id:int) -> tuple:
     """Revoca el refresh token del usuario a nivel de 
     Base de datos."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.fn_revoke_user_session", (user_id, ))
-
-        result = cursor.fetchone()
-        conn.commit()
-
-        cursor.close()
-        conn.close()
-
+        with sp.transaction() as conn:
+            result = sp.fetch_row("public.fn_revoke_user_session", (user_id, ), conn=conn)
+            if result and result[1]:
+                sp.fetch_row("public.fn_notify_refresh_tokens", (user_id, 'revoked'), conn=conn)
+        if result and result[1]:
+            refresh_tokens.user_revoked(user_id)
         return result
-    
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
-    finally:
-        cursor.close()
-        conn.close()
 
 def verify_auth_refresh(auth_jti:dict) -> bool:
-    """Verificar la autenticidad del token"""
+    """Verificar la autenticidad del token.
+    El resultado de cada jti se guarda en la caché de refresh tokens; solo la primera verificación
+    (o la siguiente a una revocación) consulta la base de datos."""
+    user_id, jti = auth_jti['user_id'], auth_jti['jti']
+    cached = refresh_tokens.lookup(user_id, jti)
+    if cached is not None:
+        return cached
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.callproc("public.verify_auth_refresh", (auth_jti['user_id'], auth_jti['jti']))
-
-        result = cursor.fetchone()
-
-        cursor.close()
-        conn.close()
-
+        generation = refresh_tokens.generation()
+        result = sp.fetch_row("public.verify_auth_refresh", (user_id, jti))
+        if result is not None:
+            refresh_tokens.remember(user_id, jti, result, generation)
         return result
-    
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
-    finally:
-        cursor.close()
-        conn.close()
 
 def create_user_db(enroll_data: dict) -> tuple[str, bool]:
-    """Registro del usuario a nivel de Base de Datos."""
+    """Registro del usuario a nivel de Base de Datos.
+    Lanza PasswordHashBusyError si el pool de hashing está saturado (el controlador responde 503)."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
         hashed_password = hash_password(enroll_data.get('password'))
 
-        cursor.callproc('public.fn_insert_user', (
+        message, success = sp.fetch_row('public.fn_insert_user', (
             enroll_data.get("firstName"),
             enroll_data.get("lastName"),
             enroll_data.get("username"),
@@ -86,164 +68,89 @@ def create_user_db(enroll_data: dict) -> tuple[str, bool]:
             enroll_data.get("birthDate"),
             enroll_data.get("docNumber"),
             enroll_data.get("docType"),
-            enroll_data.get("gender")))
-
-        message, success = cursor.fetchone()
-        conn.commit()
+            enroll_data.get("gender")), commit=True)
 
         return (message, success)
 
+    except PasswordHashBusyError:
+        raise
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
 
-    finally:
-        cursor.close()
-        conn.close()
-
 def create_user_refresh_token_db(user_data:dict) -> tuple[str, bool]:
     """Registrar un nuevo Refresh token asociado 
     al usuario a nivel de base de datos"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
         success:bool = True
         message:str = ''
-        
-        cursor.execute("""
-            CALL public.sp_create_user_refresh_token(%s, %s, %s, %s)
-        """, (
-            user_data.get('user_id'),
-            user_data.get('jti'),
-            message,
-            success
-        ))     
-        message, success = cursor.fetchone()
-
-        conn.commit()
+
+        with sp.transaction() as conn:
+            message, success = sp.call("CALL public.sp_create_user_refresh_token(%s, %s, %s, %s)", (
+                user_data.get('user_id'),
+                user_data.get('jti'),
+                message,
+                success
+            ), conn=conn)
+            if success:
+                sp.fetch_row("public.fn_notify_refresh_tokens",
+                             (user_data.get('user_id'), 'created', user_data.get('jti')), conn=conn)
+        if success:
+            refresh_tokens.token_created(user_data.get('user_id'), user_data.get('jti'))
 
         return (message, success)
-    
+
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
 
-    finally:
-        cursor.close()
-        conn.close()
-
 def verify_email_db(email: str) -> bool:
     """verifica si hay un usuario registrado con el correo en la base de datos"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.vw_verifiy_mail_existance", (email,))
-        success = cursor.fetchone()[0]
-        conn.commit()
-
-        return success
-
+        return sp.fetch_value("public.vw_verifiy_mail_existance", (email,), commit=True)
     except Exception as e:
         print(f"Error en verify_email_db: {e}")
-        conn.rollback()
         return False
 
-    finally:
-        cursor.close()
-        conn.close()
-
 
 def email_code_insert_db(email: str, code: int, expires_in=10) -> bool:
     """insertar el codigo generado en base de datos"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.sp_insert_verification_code", (email, code, expires_in))
-        success = cursor.fetchone()[0]
-        conn.commit()
-
-        return success
-
+        return sp.fetch_value("public.sp_insert_verification_code", (email, code, expires_in), commit=True)
     except Exception as e:
-        conn.rollback()
         return False
 
-    finally:
-        cursor.close()
-        conn.close()
-
 
 def verify_code_db(email: str, code: int) -> bool:
     """Verificar si el codigo es correcto"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.sp_verify_mail_code", (email, code))
-        success = cursor.fetchone()[0]
-        conn.commit()
-
-        return success
-
+        return sp.fetch_value("public.sp_verify_mail_code", (email, code), commit=True)
     except Exception as e:
-        conn.rollback()
         return False
 
-    finally:
-        cursor.close()
-        conn.close()
-
 def reset_password(email, new_password)->tuple:
     """
     Metodo para reiniciar contraseña con correo.
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.fn_update_user_password_by_email", (email, new_password))
-        result = cursor.fetchone()
-        conn.commit()
+        user_id = None
+        with sp.transaction() as conn:
+            result = sp.fetch_row("public.fn_update_user_password_by_email", (email, new_password), conn=conn)
+            # El procedimiento revoca los refresh tokens del usuario: se avisa a las cachés de los procesos web
+            if result and result[1]:
+                user_id = sp.fetch_value("public.fn_get_user_id_by_email", (email,), conn=conn)
+                if user_id is not None:
+                    sp.fetch_row("public.fn_notify_refresh_tokens", (user_id, 'revoked'), conn=conn)
+        if user_id is not None:
+            refresh_tokens.user_revoked(user_id)
 
         if result:
             return{'message': result[0], "success": result[1]}
 
     except Exception as e:
-        conn.rollback()
         return {"message": f"Error: {str(e)}", "success": False}
 
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_user_info_db(user_id: int) -> dict | None:
+def get_user_info_db(user_id: int) -> tuple | None:
     """Obtiene la información del usuario por user_id."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.fn_get_user_information", (user_id, ))
-
-        row = cursor.fetchone()
-        if row is None:
-            return None
-
-        columns = [desc[0] for desc in cursor.description]
-
-        user_info = dict(zip(columns, row))
-
-        return user_info
-
+        return sp.fetch_one("public.fn_get_user_information", (user_id, ))
     except Exception as e:
-        if conn:
-            conn.rollback()
         return None
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
- 
@@ -2,233 +2,133 @@
 Club Service
 Maneja la lógica de negocio para los clubs/grupos
 """
-from utils.db import get_connection, null_parse
-from typing import Dict, Any, Optional
+from utils.db import null_parse
+from utils import procedures as sp
+from utils.pagination import decode_cursor, split_page
+from services.outbox_service import OutboxService
+from utils import catalogs
+from utils.image_storage import card_url
+from typing import Iterator, Dict, Any, Optional
+
+#Campos devueltos por los procedimientos, en orden de columna
+CLUB_DETAIL_FIELDS = ('group_id', 'group_name', 'group_description', 'owner_name', 'creation_date',
+                      'logo_url', 'group_contact', 'group_type_name', 'group_status_name', 'members_count')
+CLUB_LIST_FIELDS = ('group_id', 'group_name', 'group_description', 'owner_name', 'creation_date',
+                    'logo_url', 'group_type_name', 'group_status_name', 'members_count')
+CLUB_MEMBER_FIELDS = ('username', 'first_name', 'last_name', 'role_name', 'status_name')
+CLUB_CONVERTERS = {'creation_date': sp.isoformat}
+#Los listados devuelven la versión 'card' del logo en lugar de la imagen completa
+CLUB_LIST_CONVERTERS = {**CLUB_CONVERTERS, 'logo_url': card_url}
+#fn_get_clubs_page devuelve IDs de categoría/estado que se resuelven con la caché de catálogos
+CLUB_PAGE_CONVERTERS = {**CLUB_LIST_CONVERTERS,
+                        'group_type_name': catalogs.group_category_name,
+                        'group_status_name': catalogs.group_status_name}
+
 class ClubService:
-    
+
     @staticmethod
-    def get_club_details(club_id: int) -> Optional[Dict[str, Any]]:
+    def get_club_details(club_id: int) -> Optional[tuple]:
         """
         Obtiene los detalles de un club/grupo específico por su ID
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
-            cursor.callproc('public.fn_get_club_details', (club_id,))
-            club = cursor.fetchone()
-            
-            if not club:
-                cursor.close()
-                connection.close()
-                return None
-
-            result = {
-                'group_id': club[0],
-                'group_name': club[1],
-                'group_description': club[2],
-                'owner_name': club[3],
-                'creation_date': club[4].isoformat() if club[4] else None,
-                'logo_url': club[5],
-                'group_contact': club[6],
-                'group_type_name': club[7],
-                'group_status_name': club[8],
-                'members_count': club[9]
-            }
-            
-            cursor.close()
-            connection.close()
-            return result
-            
+            return sp.fetch_one('public.fn_get_club_details', (club_id,),
+                                fields=CLUB_DETAIL_FIELDS, converters=CLUB_CONVERTERS)
         except Exception as e:
             print(f"Error getting club details: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-    
+
     @staticmethod
     def update_club_settings(club_id: int, user_id:int, settings_data: Dict[str, Any]) -> tuple[str, bool]:
         """
         Actualiza los ajustes generales de un club
         """
         try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
             name = null_parse(settings_data.get('name'))
             description = null_parse(settings_data.get('description'))
             status_id = null_parse(settings_data.get('status'))
             category = null_parse(settings_data.get('category'))
             logo_url = null_parse(settings_data.get('logo_url'))
 
-            # Llamar a la función
-            cursor.callproc(
+            message, success = sp.fetch_row(
                 'public.fn_update_club_settings',
                 (user_id,
-                club_id, 
+                club_id,
                 name,
                 description,
-                status_id, 
-                category, 
-                logo_url))
+                status_id,
+                category,
+                logo_url),
+                commit=True)
 
-            connection.commit()
-            message, success = cursor.fetchall()[0]
-            cursor.close()
-            connection.close()
-            
             return (message, success)
-            
+
         except Exception as e:
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     @staticmethod
-    def get_all_clubs():
+    def get_all_clubs() -> Iterator[tuple]:
         """
         Obtiene todos los clubes/grupos disponibles
+        Las filas se leen con un cursor del lado del servidor a medida que se consumen.
         """
-        try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
-            cursor.callproc('public.fn_get_all_clubs')
-            clubs = cursor.fetchall()
+        return sp.stream('public.fn_get_all_clubs', fields=CLUB_LIST_FIELDS, converters=CLUB_LIST_CONVERTERS)
 
-            result = []
-            for club in clubs:
-                result.append({
-                    'group_id': club[0],
-                    'group_name': club[1],
-                    'group_description': club[2],
-                    'owner_name': club[3],
-                    'creation_date': club[4].isoformat() if club[4] else None,
-                    'logo_url': club[5],
-                    'group_type_name': club[6],
-                    'group_status_name': club[7],
-                    'members_count': club[8]
-                })
-            
-            cursor.close()
-            connection.close()
-            return result
-            
-        except Exception as e:
-            print(f"Error getting all clubs: {e}")
-            return []
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+    @staticmethod
+    def get_clubs_page(limit: int, after: str = None) -> tuple[list[tuple], Optional[str]]:
+        """
+        Obtiene una página de clubes ordenada por group_id (paginación keyset).
+        Retorna los clubes y el cursor de la página siguiente (None si no hay más).
+        Lanza ValueError si el cursor no es válido.
+        """
+        cursor = decode_cursor(after)
+        after_id = int(cursor[0]) if cursor else None
+        catalogs.refresh()
+        clubs = sp.fetch_page('public.fn_get_clubs_page', (after_id, limit + 1), limit + 1,
+                              fields=CLUB_LIST_FIELDS, converters=CLUB_PAGE_CONVERTERS)
+        return split_page(clubs, limit, lambda club: (club.group_id,))
 
-    @staticmethod   
-    def get_user_related_groups(user_id:int) -> Optional[list[Dict[str, Any]]]:
+    @staticmethod
+    def get_user_related_groups(user_id:int) -> Optional[list[tuple]]:
         """Obtiene los grupos relacionados al usuario por user_id"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_get_user_related_groups", (user_id, ))
-
-            result = cursor.fetchall()
-
-            columns = [desc[0] for desc in cursor.description]
-            groups = [dict(zip(columns, row)) for row in result]
-
-            return groups
-        
+            return sp.fetch_all("public.fn_get_user_related_groups", (user_id, ))
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-    
+
     @staticmethod
     def request_group_join_db(user_id: int, club_id:int) -> tuple[str, bool]:
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_request_group_join", (user_id, club_id))
-
-            conn.commit()
-            message, success = cursor.fetchone()
-
+            message, success = sp.fetch_row("public.fn_request_group_join", (user_id, club_id), commit=True)
             return (message, success)
-        
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-            
+
     @staticmethod
     def create_club_db (group_name:str, group_desc:str, owner_id:int, group_category: str, max_group_per_user:int, contact_info:list) -> tuple[str, bool]:
         """
         Crea un nuevo club/grupo en la base de datos
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_create_group", (group_name, group_desc, owner_id, group_category, max_group_per_user, null_parse(contact_info)))
-
-            conn.commit()
-            message, success = cursor.fetchone()
-
+            message, success = sp.fetch_row(
+                "public.fn_create_group",
+                (group_name, group_desc, owner_id, group_category, max_group_per_user, null_parse(contact_info)),
+                commit=True)
             return (message, success)
-        
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-    
+
     @staticmethod
-    def update_group_photo_in_db(group_id: int, user_id:int, pfp_url: str) -> tuple[str, bool]:
+    def update_group_photo_in_db(group_id: int, user_id:int, pfp_url: str, conn=None) -> tuple[str, bool]:
         """
-        Actualiza la foto de perfil del grupo en la base de datos
+        Actualiza la foto de perfil del grupo en la base de datos.
+        Si se recibe `conn` se ejecuta dentro de esa transacción sin confirmarla.
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_update_group_profile_photo", (user_id, group_id, pfp_url))
-
-            conn.commit()
-            message, success = cursor.fetchone()
-
+            message, success = sp.fetch_row("public.fn_update_group_profile_photo", (user_id, group_id, pfp_url), commit=True, conn=conn)
             return (message, success)
-        
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
 
 #Administracion
@@ -238,173 +138,107 @@ class ClubService:
         Reactiva un club/grupo eliminado
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_adm_activate_group", (user_id, club_id))
-
-            conn.commit()
-            message, success = cursor.fetchone()
-
+            message, success = sp.fetch_row("public.fn_adm_activate_group", (user_id, club_id), commit=True)
             return (message, success)
-        
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
     @staticmethod
     def get_administration_member_status(club_id: int) -> tuple[str, bool]:
         """
         Obtiene el estado de los miembros de un club para la administración
+        (leído de los resúmenes que mantienen los triggers de analítica)
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_adm_get_member_status', (club_id, ))
-
-            result = cursor.fetchone()[0]
-
-            return result
-
+            return sp.fetch_value('public.fn_adm_get_member_status', (club_id, ))
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-    
+
     @staticmethod
     def get_adm_weekly_activity_heatmap(club_id: int) -> tuple[str, bool]:
         """
         Obtiene un mapa de calor semanal de actividades del club para la administración
+        (leído de los resúmenes que mantienen los triggers de analítica)
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_adm_weekly_activity_heatmap', (club_id, ))
-
-            result = cursor.fetchone()[0]
-
-            return result
-
+            return sp.fetch_value('public.fn_adm_weekly_activity_heatmap', (club_id, ))
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
     @staticmethod
     def get_adm_activity_enrollment_stats(club_id: int) -> tuple[str, bool]:
         """
         Obtiene estadísticas de inscripción en actividades del club para la administración
+        (leído de los resúmenes que mantienen los triggers de analítica)
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_adm_activity_enrollment_stats', (club_id, ))
-
-            result = cursor.fetchone()[0]
-
-            return result
-
+            return sp.fetch_value('public.fn_adm_activity_enrollment_stats', (club_id, ))
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
     @staticmethod
-    def get_club_members(club_id: int) -> tuple[str, bool]:
+    def rebuild_club_analytics(club_id: int = None) -> int:
         """
-        Obtiene la lista de miembros de un club por su ID
+        Recalcula los resúmenes de analítica de un club, o de todos si `club_id` es None (fn_rebuild_club_analytics).
+        Bloquea las escrituras en miembros, actividades, horarios e inscripciones mientras dura.
+        Returns:
+            int: Cantidad de clubes reconstruidos.
         """
-        try:
-            connection = get_connection()
-            cursor = connection.cursor()
-            
-            cursor.callproc('public.fn_adm_get_club_members', (club_id,))
-            members = cursor.fetchall()
+        return sp.fetch_value('public.fn_rebuild_club_analytics', (club_id, ), commit=True)
 
-            result = []
-            for member in members:
-                result.append({
-                    'username': member[0],
-                    'first_name': member[1],
-                    'last_name': member[2],
-                    'role_name': member[3],
-                    'status_name': member[4]
-                })
-            
-            cursor.close()
-            connection.close()
-            return result
+    @staticmethod
+    def get_club_members(club_id: int) -> list[tuple]:
+        """
+        Obtiene la lista de miembros de un club por su ID.
+        Los errores de la base de datos se propagan (el controlador responde 500).
+        """
+        return sp.fetch_all('public.fn_adm_get_club_members', (club_id,), fields=CLUB_MEMBER_FIELDS)
 
-        except Exception as e:
-            if connection:
-                connection.rollback()
-            return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+    @staticmethod
+    def stream_club_members(club_id: int) -> Iterator[tuple]:
+        """
+        Obtiene los miembros de un club leyendo las filas con un cursor del lado del servidor.
+        Se usa para exportaciones grandes.
+        """
+        return sp.stream('public.fn_adm_get_club_members', (club_id,), fields=CLUB_MEMBER_FIELDS)
+
+    @staticmethod
+    def get_club_dashboard(club_id: int) -> dict | None:
+        """
+        Obtiene todos los datos del panel de administración del club en una sola llamada
+        (fn_adm_club_dashboard), dentro de una transacción de solo lectura con una única foto de la base de datos.
+        """
+        with sp.snapshot() as conn:
+            dashboard = sp.fetch_value('public.fn_adm_club_dashboard', (club_id, ), conn=conn)
+        if dashboard is None:
+            return None
+        # Los miembros llegan con los nombres de columna de la base; se usan los mismos campos que el endpoint de miembros
+        dashboard['members_data'] = [dict(zip(CLUB_MEMBER_FIELDS, member.values()))
+                                     for member in dashboard.get('members_data') or ()]
+        return dashboard
 
     @staticmethod
     def get_club_pending_approvals(club_id: int) -> tuple[str, bool]:
         """Obtiene las solicitudes de aprobación pendientes para un club específico"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_adm_pending_approval_requests', (club_id, ))
-
-            result = cursor.fetchone()[0]
-
-            return result
-
+            return sp.fetch_value('public.fn_adm_pending_approval_requests', (club_id, ))
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
 
     @staticmethod
     def update_pending_request(club_id: int, request_id:int, approval_user_id: int, action: str) -> dict[str, Any]:
         """
         Actualiza el estado de una solicitud de unión pendiente a un club.
+        El correo de aprobación o rechazo se agrega a la bandeja de salida en la misma transacción.
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_adm_update_pending_request', (club_id, request_id, approval_user_id, action))
-            conn.commit()
-
-            message, success, was_approved, approved_user_data = cursor.fetchone()
+            with sp.transaction() as conn:
+                message, success, was_approved, approved_user_data = sp.fetch_row(
+                    'public.fn_adm_update_pending_request', (club_id, request_id, approval_user_id, action), conn=conn)
+                user_data = approved_user_data or {}
+                if success and user_data.get('email'):
+                    kind = 'group_member_approved' if was_approved else 'group_member_rejected'
+                    OutboxService.enqueue_email(conn, kind, user_data.get('email'), user_data)
 
             return {
             'message': message,
@@ -413,41 +247,19 @@ class ClubService:
             'user_data': approved_user_data}
 
         except Exception as e:
-            if conn:
-                conn.rollback()
             return {
                 'message': str(e),
                 'success': False,
                 'was_approved': None,
                 'approved_user_data': None}
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-    
+
     @staticmethod
     def delete_club_db(club_id: int, user_id: int) -> tuple[str, bool]:
         """
         Elimina un club/grupo de la base de datos
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_adm_delete_group", (user_id, club_id))
-
-            conn.commit()
-            message, success = cursor.fetchone()
-
+            message, success = sp.fetch_row("public.fn_adm_delete_group", (user_id, club_id), commit=True)
             return (message, success)
-        
         except Exception as e:
-            if conn:
-                conn.rollback()
             return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
\ No newline at end of file
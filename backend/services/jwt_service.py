@@ -82,6 +82,11 @@ class JWTService:
                     **kwargs: Argumentos nombrados.
                     Returns:
                         function: La función original con los datos del usuario añadidos a la solicitud."""
+                # Sub-petición de /api/batch: el token ya se verificó una vez en la petición agrupada
+                batch_user = request.environ.get('batch.current_user')
+                if batch_user is not None and batch_user.get("type") == expected_type:
+                    request.current_user = batch_user
+                    return f(*args, **kwargs)
                 token = None              
                 auth_header = request.headers.get('Authorization')
                 if auth_header and auth_header.startswith('Bearer ') and expected_type != 'refresh':
@@ -0,0 +1,41 @@
+"""
+Outbox Service
+Maneja la bandeja de salida de correos (outbox transaccional)
+"""
+from psycopg2.extras import Json
+from utils import procedures as sp
+
+#Campos devueltos por fn_claim_outbox_emails, en orden de columna
+OUTBOX_FIELDS = ('email_id', 'kind', 'recipient', 'payload', 'attempts')
+
+class OutboxService:
+
+    @staticmethod
+    def enqueue_email(conn, kind: str, recipient: str, payload: dict = None) -> int:
+        """
+        Agrega un correo a la bandeja de salida dentro de la transacción de `conn`,
+        de modo que solo se envía si el cambio que lo origina se confirma.
+        """
+        return sp.fetch_value('public.fn_enqueue_email', (kind, recipient, Json(payload or {})), conn=conn)
+
+    @staticmethod
+    def claim_emails(limit: int, lease_seconds: int) -> list[tuple]:
+        """
+        Reserva hasta `limit` correos pendientes (FOR UPDATE SKIP LOCKED) y confirma la reserva de inmediato,
+        para no mantener la transacción abierta durante el envío.
+        """
+        with sp.transaction() as conn:
+            return sp.fetch_all('public.fn_claim_outbox_emails', (limit, lease_seconds), fields=OUTBOX_FIELDS, conn=conn)
+
+    @staticmethod
+    def complete_emails(sent_ids: list[int], failures: list[tuple[int, str]], max_attempts: int):
+        """
+        Registra el resultado de un lote: los enviados se marcan como tales y los fallidos se reprograman
+        con espera exponencial hasta `max_attempts`.
+        """
+        sp.fetch_row('public.fn_complete_outbox_emails', (
+            sent_ids,
+            [email_id for email_id, _ in failures],
+            [error for _, error in failures],
+            max_attempts
+        ), commit=True)
@@ -0,0 +1,98 @@
+"""
+Search Service
+Maneja la búsqueda por palabras clave de clubes y actividades
+"""
+from utils import procedures as sp
+from utils.pagination import encode_cursor, decode_cursor
+from utils import catalogs
+from typing import Optional
+
+SEARCH_TYPES = ('club', 'activity')
+SEARCH_MIN_QUERY = 2
+SEARCH_MAX_QUERY = 200
+#Los resultados se ordenan por relevancia: más allá de este desplazamiento no se pagina
+SEARCH_MAX_OFFSET = 1000
+#Los estados de clubes y de actividades son catálogos distintos
+STATUS_NAMES = {'club': catalogs.group_status_name, 'activity': catalogs.activity_status_name}
+
+
+def _parse_id(value, name: str) -> Optional[int]:
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"El parámetro {name} debe ser un entero")
+
+def parse_search_filters(args) -> dict:
+    """
+    Valida los parámetros de búsqueda (q, type, category, activity_type, status).
+    Lanza ValueError si alguno no es válido.
+    """
+    query = ' '.join((args.get('q') or '').split())
+    if len(query) < SEARCH_MIN_QUERY:
+        raise ValueError(f"El parámetro q debe tener al menos {SEARCH_MIN_QUERY} caracteres")
+    if len(query) > SEARCH_MAX_QUERY:
+        raise ValueError(f"El parámetro q admite como máximo {SEARCH_MAX_QUERY} caracteres")
+
+    result_type = args.get('type') or None
+    if result_type is not None and result_type not in SEARCH_TYPES:
+        raise ValueError("El parámetro type debe ser 'club' o 'activity'")
+
+    filters = {
+        'query': query,
+        'result_type': result_type,
+        'category_id': _parse_id(args.get('category'), 'category'),
+        'activity_type_id': _parse_id(args.get('activity_type'), 'activity_type'),
+        'status_id': _parse_id(args.get('status'), 'status')
+    }
+    if filters['status_id'] is not None and result_type is None:
+        raise ValueError("El parámetro status requiere type")
+    return filters
+
+def _resolve_result(result: dict) -> dict:
+    result['category_name'] = catalogs.group_category_name(result['category_id'])
+    result['activity_type_name'] = (catalogs.activity_type_name(result['activity_type_id'])
+                                    if result['activity_type_id'] is not None else None)
+    result['status_name'] = STATUS_NAMES[result['type']](result['status_id'])
+    return result
+
+def _resolve_facets(facets: dict) -> dict:
+    for item in facets['category']:
+        item['name'] = catalogs.group_category_name(item['id'])
+    for item in facets['activity_type']:
+        item['name'] = catalogs.activity_type_name(item['id'])
+    for item in facets['status']:
+        item['name'] = STATUS_NAMES[item['type']](item['id'])
+    return facets
+
+
+class SearchService:
+
+    @staticmethod
+    def search(query: str, limit: int, after: str = None, result_type: str = None, category_id: int = None,
+               activity_type_id: int = None, status_id: int = None) -> dict:
+        """
+        Busca clubes y actividades por nombre y descripción, ordenados por relevancia.
+        Si la búsqueda de texto completo no encuentra nada se usa la similitud de nombres (errores de tipeo)
+        y el resultado lo indica con "fuzzy".
+        Retorna {total, fuzzy, facets, results, next_cursor}; los IDs de catálogo se acompañan de su nombre.
+        Lanza ValueError si el cursor no es válido.
+        """
+        cursor = decode_cursor(after)
+        offset = cursor[0] if cursor else 0
+        if not isinstance(offset, int) or not 0 <= offset <= SEARCH_MAX_OFFSET:
+            raise ValueError("Cursor inválido")
+
+        result = sp.fetch_value('public.fn_search', (query, result_type, category_id, activity_type_id,
+                                                      status_id, limit, offset))
+        catalogs.refresh()
+        next_offset = offset + limit
+        has_more = next_offset < result['total'] and next_offset <= SEARCH_MAX_OFFSET
+        return {
+            'total': result['total'],
+            'fuzzy': result['fuzzy'],
+            'facets': _resolve_facets(result['facets']),
+            'results': [_resolve_result(item) for item in result['results']],
+            'next_cursor': encode_cursor(next_offset) if has_more else None
+        }
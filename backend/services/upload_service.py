@@ -0,0 +1,95 @@
+"""
+Upload Service
+Maneja las subidas de fotos de perfil (usuarios y grupos) en segundo plano.
+La petición registra el trabajo y responde de inmediato con su ID; un pool acotado de hilos guarda la imagen
+en el almacenamiento configurado y actualiza la foto y el estado del trabajo en una misma transacción.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils import procedures as sp
+from utils.image_storage import image_storage
+from utils.response_cache import response_cache
+from services.club_service import ClubService
+from services import user_utilities_service as uus
+
+#Campos devueltos por fn_get_upload_job, en orden de columna
+UPLOAD_JOB_FIELDS = ('job_id', 'status', 'url', 'error', 'target', 'target_id', 'created_at', 'finished_at')
+UPLOAD_JOB_CONVERTERS = {'job_id': str, 'created_at': sp.isoformat, 'finished_at': sp.isoformat}
+
+UPLOAD_STALE_SECONDS = int(os.getenv('UPLOAD_STALE_SECONDS', 300))
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv('UPLOAD_WORKERS', 4)), thread_name_prefix='uploads')
+#Subidas aceptadas a la vez (en curso o en espera) por proceso
+_slots = threading.BoundedSemaphore(int(os.getenv('UPLOAD_MAX_PENDING', 32)))
+
+
+class UploadBusyError(Exception):
+    """Hay demasiadas subidas en curso en el proceso."""
+    pass
+
+
+class UploadForbiddenError(Exception):
+    """El usuario no puede cambiar la foto del destino (p. ej. un grupo del que no es dueño)."""
+    pass
+
+
+class UploadService:
+
+    @staticmethod
+    def submit_photo_upload(data: bytes, user_id: int, target: str, target_id: int) -> str:
+        """
+        Registra la subida y la ejecuta en segundo plano.
+        Args:
+            data (bytes): Contenido del archivo subido.
+            user_id (int): Usuario que sube la foto.
+            target (str): 'user' o 'group'.
+            target_id (int): ID del usuario o grupo cuya foto se actualiza.
+        Returns:
+            str: ID del trabajo.
+        Raises:
+            UploadBusyError: Si el proceso no acepta más subidas por ahora.
+            UploadForbiddenError: Si el usuario no es dueño del grupo; la imagen no se guarda.
+        """
+        if not _slots.acquire(blocking=False):
+            raise UploadBusyError("Hay demasiadas subidas en curso, intente nuevamente")
+        try:
+            job_id = sp.fetch_value('public.fn_create_upload_job', (user_id, target, target_id), commit=True)
+            if job_id is None:
+                raise UploadForbiddenError("Solo el dueño del club puede cambiar su foto")
+            job_id = str(job_id)
+            _executor.submit(UploadService._run, job_id, data, user_id, target, target_id)
+        except BaseException:
+            _slots.release()
+            raise
+        return job_id
+
+    @staticmethod
+    def get_job(job_id: str, user_id: int) -> tuple | None:
+        """Estado de una subida del usuario; None si no existe o es de otro usuario."""
+        return sp.fetch_one('public.fn_get_upload_job', (job_id, user_id, UPLOAD_STALE_SECONDS),
+                            fields=UPLOAD_JOB_FIELDS, converters=UPLOAD_JOB_CONVERTERS)
+
+    @staticmethod
+    def _run(job_id: str, data: bytes, user_id: int, target: str, target_id: int):
+        """Guarda la imagen y registra el resultado; nunca lanza excepciones."""
+        try:
+            try:
+                url = image_storage.save(data)
+            except Exception as e:
+                print(f"[ERROR] Subida de imagen {job_id}: {e}")
+                sp.fetch_row('public.fn_finish_upload_job', (job_id, None, 'Error al subir la imagen.'), commit=True)
+                return
+
+            with sp.transaction() as conn:
+                if target == 'group':
+                    message, success = ClubService.update_group_photo_in_db(target_id, user_id, url, conn=conn)
+                else:
+                    message, success = uus.update_user_photo_in_db(user_id, url, conn=conn)
+                sp.fetch_row('public.fn_finish_upload_job',
+                             (job_id, url if success else None, None if success else message), conn=conn)
+            if success and target == 'group':
+                response_cache.invalidate('groups', f'group:{target_id}')
+        except Exception as e:
+            print(f"[ERROR] Registro de la subida {job_id}: {e}")
+        finally:
+            _slots.release()
@@ -1,106 +1,89 @@
-from utils.db import get_connection, null_parse
+from datetime import datetime, timedelta, timezone
+from utils.db import null_parse
+from utils import procedures as sp
+from utils import catalogs
+from utils.pagination import decode_cursor, split_page
+from utils.token_cache import refresh_tokens
+from utils.seats import full_activities, is_full_error, is_full_message, FULL_MESSAGE
 from utils.security import hash_password, validate_password
 from .auth_service import verify_auth_refresh
+from .outbox_service import OutboxService
+
+#Campos devueltos por fn_user_upcoming_activities_page, en orden de columna
+UPCOMING_EVENT_FIELDS = ('schedule_id', 'activity_id', 'activity_name', 'group_id', 'group_name',
+                         'start_date', 'end_date', 'location', 'activity_status_name')
+UPCOMING_EVENT_CONVERTERS = {'start_date': sp.isoformat, 'end_date': sp.isoformat,
+                             'activity_status_name': catalogs.activity_status_name}
+#Ventana de próximos eventos (días desde el inicio del día UTC) y rango máximo del calendario
+UPCOMING_DEFAULT_DAYS = 30
+UPCOMING_MAX_DAYS = 365
+CALENDAR_DEFAULT_DAYS = 31
+CALENDAR_MAX_DAYS = 62
+CALENDAR_MAX_EVENTS = 500
+#Columnas del feed compacto del calendario
+CALENDAR_FIELDS = ('id', 'activity_id', 'title', 'start', 'end', 'group_id')
 
 def get_user_encrypted_password(user_id:int) -> tuple[str | None, bool]:
     """Obtener la contraseña para comparar si es correcta antes de actualizar"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.vw_get_user_password", (user_id,)) 
-        result = cursor.fetchone()
-
-        return result
+        return sp.fetch_row("public.vw_get_user_password", (user_id,))
 
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
-    finally:
-        cursor.close()
-        conn.close()
 
-def update_user_photo_in_db(user_id: int, pfp_url: str) -> tuple[str, bool]:
-    """Actualizar la foto de perfil de usuario en la base de datos."""
+def update_user_photo_in_db(user_id: int, pfp_url: str, conn=None) -> tuple[str, bool]:
+    """Actualizar la foto de perfil de usuario en la base de datos.
+    Si se recibe `conn` se ejecuta dentro de esa transacción sin confirmarla."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.callproc("public.fn_update_user_profile_photo", (user_id, pfp_url))
-        conn.commit()
-        result = cursor.fetchone()
-        return result
+        return sp.fetch_row("public.fn_update_user_profile_photo", (user_id, pfp_url), commit=True, conn=conn)
 
     except Exception as e:
-        conn.rollback()
         return (str(e), False)
-    finally:
-        cursor.close()
-        conn.close()
 
 def update_user_password(user_id: int, hashed_password: str) -> tuple[str, bool]:
     """
     Actualizar la contraseña del usuario.
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
         success:bool = True
         message:str = ''
 
-        cursor.execute("CALL public.sp_update_user_password_by_userid(%s,%s, %s, %s)", (user_id, hashed_password, message, success))
-
-        conn.commit()
+        result = sp.call("CALL public.sp_update_user_password_by_userid(%s,%s, %s, %s)", (user_id, hashed_password, message, success))
+        if result:
+            message, success = result
 
         return (message, success)
 
     except Exception as e:
-        if conn:
-            conn.rollback()
-            print(str(e))
+        print(str(e))
         return (str(e), False)
 
-    finally:
-            cursor.close()
-            conn.close()
-
 def deactivate_user_tokens(user_id: int) -> tuple[str, bool]:
     """
     Desactivar los refresh tokens activos
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
         success:bool = True
         message:str = ''
 
-        cursor.execute("CALL public.sp_deactivate_user_tokens(%s, %s, %s)", (user_id, message, success))
-
-        conn.commit()
-
-        message, success = cursor.fetchone()
+        with sp.transaction() as conn:
+            message, success = sp.call("CALL public.sp_deactivate_user_tokens(%s, %s, %s)", (user_id, message, success), conn=conn)
+            if success:
+                sp.fetch_row("public.fn_notify_refresh_tokens", (user_id, 'revoked'), conn=conn)
+        if success:
+            refresh_tokens.user_revoked(user_id)
 
         return (message, success)
 
     except Exception as e:
-        if conn:
-            conn.rollback()
         print(str(e))
         return (str(e), False)
 
-    finally:
-        cursor.close()
-        conn.close()
-
 def update_user_personal_info(user_id: int, user_data: dict) -> tuple[str, bool]:
     """
     Actualizar la informacion personal del usuario
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
         p_name = null_parse(user_data.get('name'))
         p_last_name = null_parse(user_data.get('last_name'))
         p_email = null_parse(user_data.get('email'))
@@ -108,7 +91,7 @@ def update_user_personal_info(user_id: int, user_data: dict) -> tuple[str, bool]
         p_about_me = null_parse(user_data.get('about_me'))
         career = null_parse(user_data.get('career'))
 
-        cursor.callproc("public.fn_update_user_personal_info", (
+        success = sp.fetch_value("public.fn_update_user_personal_info", (
             user_id,
             p_name,
             p_last_name,
@@ -116,165 +99,147 @@ def update_user_personal_info(user_id: int, user_data: dict) -> tuple[str, bool]
             p_phone,
             p_about_me,
             career
-        ))
-        conn.commit()
-        success = cursor.fetchone()[0]
+        ), commit=True)
         message = 'Datos actualizados correctamente.' if success else 'No se han podido actualizar los datos.'
 
         return (message, success)
 
     except Exception as e:
-        if conn:
-            conn.rollback()
         print(str(e))
         return (str(e), False)
 
-    finally:
-        cursor.close()
-        conn.close()
-
 def get_user_notifications_db(user_id: int) -> dict[list[str]] | tuple[str | None, bool]:
-        """Obtiene las notificaciones del usuario por user_id."""
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_sys_get_notifications', (user_id, ))
-
-            result = cursor.fetchone()[0]
-
-            return result
+    """Obtiene las notificaciones del usuario por user_id."""
+    try:
+        return sp.fetch_value('public.fn_sys_get_notifications', (user_id, ))
 
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+    except Exception as e:
+        return (str(e), False)
 
 def update_user_notifications_bd(user_id: int, notification_ids:list) -> tuple[str | None, bool]:
-        """Actualiza las notificaciones del usuario por user_id."""
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_sys_update_notifications', (user_id, notification_ids))
-            conn.commit()
-            result = cursor.fetchone()[0]
-
-            return result
-
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-
-def get_user_related_activities(user_id:int) -> dict[list[str]] | tuple[str | None, bool]:
-        """Obtiene las actividades relacionadas al usuario por user_id"""
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc("public.fn_get_user_related_activities", (user_id, ))
+    """Actualiza las notificaciones del usuario por user_id."""
+    try:
+        return sp.fetch_value('public.fn_sys_update_notifications', (user_id, notification_ids), commit=True)
 
-            result = cursor.fetchall()
+    except Exception as e:
+        return (str(e), False)
 
-            columns = [desc[0] for desc in cursor.description]
-            activities = [dict(zip(columns, row)) for row in result]
+def get_user_related_activities(user_id:int) -> list[tuple] | tuple[str | None, bool]:
+    """Obtiene las actividades relacionadas al usuario por user_id"""
+    try:
+        return sp.fetch_all("public.fn_get_user_related_activities", (user_id, ))
 
-            return activities
-        
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            return (str(e), False)
-        
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+    except Exception as e:
+        return (str(e), False)
 
 def join_activity(activity_id:int, user_id: int) -> tuple[bool, str, str]:
-        """ Permite a un usuario unirse a una actividad específica."""
-        try:
-            connection = get_connection()
-            cursor = connection.cursor()
-
-            cursor.callproc('public.fn_join_activity',(
+    """ Permite a un usuario unirse a una actividad específica.
+    El correo de confirmación se agrega a la bandeja de salida en la misma transacción.
+    El cupo lo reserva el trigger de activityseats; si la actividad ya se sabe llena se rechaza sin consultar."""
+    if full_activities.is_full(activity_id):
+        return (False, FULL_MESSAGE, '')
+    generation = full_activities.generation(activity_id)
+    try:
+        with sp.transaction() as conn:
+            success, message, data = sp.fetch_row('public.fn_join_activity',(
                 activity_id,
                 user_id
-            ))
-
-            connection.commit()
-            success, message, data = cursor.fetchone()
-            
-            cursor.close()
-            connection.close()
-            
-            return (success, message, data)
-            
-        except Exception as e:
-            return (False, 'Error al unirse a la actividad', '')
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close() 
-    
+            ), conn=conn)
+            if success and data and data.get('email'):
+                OutboxService.enqueue_email(conn, 'activity_joined', data.get('email'), data)
+
+        if not success and is_full_message(message):
+            full_activities.mark_full(activity_id, generation)
+            return (False, FULL_MESSAGE, '')
+        return (success, message, data)
+
+    except Exception as e:
+        if is_full_error(e):
+            full_activities.mark_full(activity_id, generation)
+            return (False, FULL_MESSAGE, '')
+        return (False, 'Error al unirse a la actividad', '')
+
 def leave_activity(activity_id:int, user_id: int) -> tuple[bool, str, str]:
-            """ Permite a un usuario abandonar una actividad específica."""
-            try:
-                connection = get_connection()
-                cursor = connection.cursor()
-
-                cursor.callproc('public.fn_leave_activity',(
-                    activity_id,
-                    user_id
-                ))
-
-                connection.commit()
-                success, message, data = cursor.fetchone()
-                
-                cursor.close()
-                connection.close()
-                
-                return (success, message, data)
-                
-            except Exception as e:
-                return (False, 'Error al abandonar la actividad', '')
-            finally:
-                if cursor:
-                    cursor.close()
-                if connection:
-                    connection.close()
-            
-def get_upcoming_events(user_id: int) -> dict[list[str]] | tuple[str | None, bool]:
-        """Obtiene los eventos próximos del usuario por user_id."""
+    """ Permite a un usuario abandonar una actividad específica.
+    El correo de confirmación se agrega a la bandeja de salida en la misma transacción."""
+    try:
+        with sp.transaction() as conn:
+            success, message, data = sp.fetch_row('public.fn_leave_activity',(
+                activity_id,
+                user_id
+            ), conn=conn)
+            if success and data and data.get('email'):
+                OutboxService.enqueue_email(conn, 'activity_left', data.get('email'), data)
+
+        if success:
+            full_activities.release(activity_id)
+        return (success, message, data)
+
+    except Exception as e:
+        return (False, 'Error al abandonar la actividad', '')
+
+def parse_days(value, default: int = UPCOMING_DEFAULT_DAYS, maximum: int = UPCOMING_MAX_DAYS) -> int:
+    """Valida el parámetro `days` (tamaño de la ventana). Lanza ValueError si no es un entero positivo."""
+    if value in (None, ''):
+        return default
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro days debe ser un entero")
+    if days < 1:
+        raise ValueError("El parámetro days debe ser mayor que cero")
+    return min(days, maximum)
+
+def get_upcoming_events(user_id: int, limit: int, after: str = None,
+                        days: int = UPCOMING_DEFAULT_DAYS) -> tuple[list[tuple], str | None]:
+    """
+    Obtiene una página de los próximos horarios de actividades de los clubes del usuario,
+    desde el inicio del día (UTC) y durante `days` días, ordenados por inicio (paginación keyset sobre
+    (inicio, schedule_id)). La ventana se alinea al día, como el ETag diario del endpoint, para que una
+    respuesta 304 nunca siga mostrando eventos que ya no corresponden a la ventana.
+    Retorna los eventos y el cursor de la página siguiente (None si no hay más).
+    Lanza ValueError si el cursor no es válido.
+    """
+    cursor = decode_cursor(after, 2)
+    after_start, after_id = (cursor[0], int(cursor[1])) if cursor else (None, None)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    catalogs.refresh()
+    events = sp.fetch_page('public.fn_user_upcoming_activities_page',
+                           (user_id, today, today + timedelta(days=days), after_start, after_id, limit + 1), limit + 1,
+                           fields=UPCOMING_EVENT_FIELDS, converters=UPCOMING_EVENT_CONVERTERS)
+    return split_page(events, limit, lambda event: (event.start_date, event.schedule_id))
+
+def parse_calendar_range(start: str | None, end: str | None) -> tuple[datetime, datetime]:
+    """
+    Valida el rango `from`/`to` del calendario (fechas u horas ISO 8601; sin zona horaria se toman en UTC).
+    Por defecto va desde hoy y dura CALENDAR_DEFAULT_DAYS días. Lanza ValueError si no es válido.
+    """
+    def parse(value: str, name: str) -> datetime:
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            cursor.callproc('public.fn_user_upcoming_events', (user_id, ))
-            conn.commit()
-            result = cursor.fetchone()[0]
-
-            return result
-
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            return (str(e), False)
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
\ No newline at end of file
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"El parámetro {name} debe ser una fecha ISO 8601")
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    if start:
+        range_start = parse(start, 'from')
+    else:
+        range_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    range_end = parse(end, 'to') if end else range_start + timedelta(days=CALENDAR_DEFAULT_DAYS)
+    if range_end <= range_start:
+        raise ValueError("El parámetro to debe ser posterior a from")
+    if range_end - range_start > timedelta(days=CALENDAR_MAX_DAYS):
+        raise ValueError(f"El rango del calendario no puede superar {CALENDAR_MAX_DAYS} días")
+    return range_start, range_end
+
+def get_calendar_events(user_id: int, start: datetime, end: datetime) -> list[list]:
+    """
+    Obtiene los horarios de actividades de los clubes del usuario entre `start` y `end` como filas compactas
+    con las columnas de CALENDAR_FIELDS (como máximo CALENDAR_MAX_EVENTS).
+    """
+    catalogs.refresh()
+    events = sp.fetch_all('public.fn_user_upcoming_activities_page',
+                          (user_id, start, end, None, None, CALENDAR_MAX_EVENTS),
+                          fields=UPCOMING_EVENT_FIELDS, converters=UPCOMING_EVENT_CONVERTERS)
+    return [[event.schedule_id, event.activity_id, event.activity_name, event.start_date, event.end_date,
+             event.group_id] for event in events]
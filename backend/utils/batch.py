@@ -0,0 +1,116 @@
+"""
+Módulo de peticiones agrupadas (/api/batch).
+Ejecuta dentro del proceso varias peticiones GET a rutas internas de la API y devuelve sus respuestas juntas,
+para que una página que necesita varios recursos al cargar haga un solo viaje de red.
+El token se verifica una sola vez en la petición agrupada: cada sub-petición recibe el usuario ya verificado en
+su entorno WSGI (clave BATCH_USER_ENVIRON, que un cliente no puede enviar porque las cabeceras llegan como HTTP_*)
+y `token_required` lo usa en lugar de volver a decodificar el token.
+Las sub-peticiones son independientes entre sí, por lo que se ejecutan a la vez en un pool acotado de hilos;
+cada una toma su propia conexión del pool de base de datos mientras dura.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from werkzeug.test import EnvironBuilder
+
+BATCH_USER_ENVIRON = 'batch.current_user'
+BATCH_PATH = '/api/batch'
+#Cabeceras de cada sub-petición que se reenvían (el resto se ignora)
+FORWARDED_HEADERS = ('If-None-Match', 'Accept-Language')
+
+
+class BatchRequestError(ValueError):
+    """La lista de sub-peticiones no es válida."""
+    pass
+
+
+class BatchDispatcher:
+    """Despachador de sub-peticiones GET sobre la aplicación Flask actual."""
+
+    def __init__(self, workers: int, max_requests: int):
+        """
+        Args:
+            workers (int): Sub-peticiones ejecutadas a la vez por proceso (entre todas las peticiones agrupadas).
+            max_requests (int): Sub-peticiones permitidas en una petición agrupada.
+        """
+        self.workers = workers
+        self.max_requests = max_requests
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch')
+
+    def parse(self, items) -> list[dict]:
+        """
+        Valida la lista de sub-peticiones. Cada una puede ser una ruta ('/api/auth/me?x=1') o un objeto
+        {"path": ..., "headers": {"If-None-Match": ...}}.
+        Raises:
+            BatchRequestError: Si la lista o alguna sub-petición no es válida.
+        """
+        if not isinstance(items, list) or not items:
+            raise BatchRequestError("Se requiere una lista 'requests' con al menos una ruta")
+        if len(items) > self.max_requests:
+            raise BatchRequestError(f"Se permiten como máximo {self.max_requests} rutas por petición")
+        parsed = []
+        for item in items:
+            if isinstance(item, str):
+                item = {'path': item}
+            path = item.get('path') if isinstance(item, dict) else None
+            if not isinstance(path, str) or not path.startswith('/api/'):
+                raise BatchRequestError("Cada ruta debe ser una cadena que comience con /api/")
+            if urlsplit(path).path.rstrip('/') == BATCH_PATH:
+                raise BatchRequestError("No se puede anidar /api/batch")
+            headers = item.get('headers') or {}
+            if not isinstance(headers, dict):
+                raise BatchRequestError("'headers' debe ser un objeto")
+            parsed.append({
+                'path': path,
+                'headers': {name: str(headers[name]) for name in FORWARDED_HEADERS if name in headers}
+            })
+        return parsed
+
+    def dispatch(self, app, items: list[dict], current_user: dict, remote_addr: str = None) -> list[dict]:
+        """
+        Ejecuta las sub-peticiones ya validadas y devuelve sus respuestas en el mismo orden.
+        Args:
+            app (Flask): Aplicación que atiende las sub-peticiones.
+            items (list[dict]): Resultado de `parse`.
+            current_user (dict): Datos del token verificado en la petición agrupada.
+            remote_addr (str): IP del cliente, para que las sub-peticiones la vean igual.
+        """
+        if len(items) == 1:
+            return [self._run(app, items[0], current_user, remote_addr)]
+        futures = [self._executor.submit(self._run, app, item, current_user, remote_addr) for item in items]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _run(app, item: dict, current_user: dict, remote_addr: str) -> dict:
+        url = urlsplit(item['path'])
+        builder = EnvironBuilder(path=url.path, query_string=url.query, method='GET', headers=item['headers'],
+                                 environ_base={'REMOTE_ADDR': remote_addr or '', BATCH_USER_ENVIRON: current_user})
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+        with app.request_context(environ):
+            try:
+                response = app.full_dispatch_request()
+            except Exception as e:
+                print(f"Error en sub-petición de /api/batch ({item['path']}): {e}")
+                return {'path': item['path'], 'status': 500, 'body': {'error': 'Error interno del servidor'}}
+        try:
+            if response.status_code == 304:
+                body = None
+            elif response.is_json:
+                body = response.get_json(silent=True)
+            else:
+                body = response.get_data(as_text=True)
+        finally:
+            response.close()
+        result = {'path': item['path'], 'status': response.status_code, 'body': body}
+        if response.headers.get('ETag'):
+            result['etag'] = response.headers['ETag']
+        return result
+
+
+batch_dispatcher = BatchDispatcher(
+    workers=int(os.getenv('BATCH_WORKERS', 4)),
+    max_requests=int(os.getenv('BATCH_MAX_REQUESTS', 10))
+)
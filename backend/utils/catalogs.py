@@ -0,0 +1,144 @@
+"""
+Módulo de caché en memoria para las tablas de catálogo.
+Las tablas de catálogo (tipos de usuario, estados, géneros, categorías, roles, tipos y estados de actividad)
+casi nunca cambian, por lo que se cargan una vez por proceso en una estructura inmutable y se refrescan
+al vencer el TTL o al recibir el evento 'catalogs_changed' (trigger fn_notify_catalogs_changed).
+Los conversores del ejecutor de procedimientos se llaman mientras un cursor del lado del servidor tiene
+una conexión del pool, por lo que nunca recargan: usan el contenido ya cargado. Los servicios que los usan
+llaman a `catalogs.snapshot()` antes de abrir el cursor para que la recarga, si hace falta, ocurra ahí.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from utils import db_events
+from utils import procedures as sp
+from utils.db import get_connection
+
+CATALOG_FIELDS = ('catalog', 'item_id', 'item_name', 'item_description')
+CatalogItem = namedtuple('CatalogItem', ('id', 'name', 'description'))
+
+
+class CatalogSnapshot:
+    """Contenido inmutable de los catálogos en un momento dado."""
+    __slots__ = ('items', 'by_id', 'version', 'loaded_at')
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): Filas (catalog, item_id, item_name, item_description).
+        """
+        grouped = {}
+        for catalog, item_id, item_name, item_description in rows:
+            grouped.setdefault(catalog, []).append(CatalogItem(item_id, item_name, item_description))
+        self.items = MappingProxyType({name: tuple(items) for name, items in grouped.items()})
+        self.by_id = MappingProxyType({name: MappingProxyType({item.id: item for item in items})
+                                       for name, items in self.items.items()})
+        payload = json.dumps(self.as_dict(), sort_keys=True, ensure_ascii=False).encode()
+        self.version = hashlib.sha1(payload).hexdigest()
+        self.loaded_at = time.monotonic()
+
+    def as_dict(self) -> dict:
+        """Representación serializable de los catálogos."""
+        return {name: [item._asdict() for item in items] for name, items in self.items.items()}
+
+
+class CatalogCache:
+    """Caché de catálogos con TTL e invalidación por eventos. Las lecturas no toman locks."""
+
+    def __init__(self, ttl: float):
+        """
+        Args:
+            ttl (float): Segundos que se considera vigente el contenido cargado.
+        """
+        self._ttl = ttl
+        self._snapshot = None
+        self._valid_until = 0
+        # Se incrementa en cada invalidación; una carga iniciada antes de una invalidación no se considera vigente
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def preload(self):
+        """Carga los catálogos usando una conexión dedicada (fuera del pool), pensado para el arranque del proceso."""
+        generation = self._generation
+        conn = get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.callproc('public.fn_get_catalogs')
+                self._store(CatalogSnapshot(cursor.fetchall()), generation)
+        finally:
+            conn.close()
+
+    def _store(self, snapshot: CatalogSnapshot, generation: int):
+        self._snapshot = snapshot
+        if generation == self._generation:
+            self._valid_until = snapshot.loaded_at + self._ttl
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Devuelve el contenido vigente, recargándolo si no existe, si venció el TTL o si fue invalidado."""
+        db_events.ensure_started()
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._valid_until:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() >= self._valid_until:
+                generation = self._generation
+                try:
+                    snapshot = CatalogSnapshot(sp.fetch_all('public.fn_get_catalogs', fields=CATALOG_FIELDS))
+                except Exception:
+                    # Si la recarga falla se sigue usando el contenido anterior, si existe
+                    if snapshot is None:
+                        raise
+                    print("Error recargando catálogos, se usa la versión anterior")
+                    return snapshot
+                self._store(snapshot, generation)
+        return snapshot
+
+    def loaded(self) -> CatalogSnapshot:
+        """Devuelve el contenido cargado aunque esté vencido; solo consulta la base de datos si nunca se cargó."""
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.snapshot()
+
+    def invalidate(self):
+        """Marca el contenido como vencido; la siguiente llamada a `snapshot()` lo vuelve a consultar."""
+        with self._lock:
+            self._generation += 1
+            self._valid_until = 0
+
+    def get(self, catalog: str) -> tuple:
+        """Devuelve los elementos de un catálogo."""
+        return self.loaded().items.get(catalog, ())
+
+    def name_of(self, catalog: str, item_id: int, default=None):
+        """Resuelve el nombre de un elemento de catálogo a partir de su ID."""
+        item = self.loaded().by_id.get(catalog, {}).get(item_id)
+        return item.name if item is not None else default
+
+
+catalogs = CatalogCache(ttl=float(os.getenv('CATALOG_CACHE_TTL', 3600)))
+db_events.subscribe('catalogs_changed', lambda data: catalogs.invalidate())
+# Los cambios emitidos sin conexión al canal se perdieron
+db_events.on_reset(catalogs.invalidate)
+
+
+def refresh():
+    """Recarga los catálogos si vencieron; se llama antes de abrir un cursor que use los conversores."""
+    catalogs.snapshot()
+
+
+# Conversores para el ejecutor de procedimientos: reciben el ID y devuelven el nombre
+def activity_type_name(type_id):
+    return catalogs.name_of('activitytypes', type_id)
+
+def activity_status_name(status_id):
+    return catalogs.name_of('activitystatus', status_id)
+
+def group_category_name(category_id):
+    return catalogs.name_of('groupcategories', category_id)
+
+def group_status_name(status_id):
+    return catalogs.name_of('groupstatus', status_id)
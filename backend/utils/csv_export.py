@@ -0,0 +1,31 @@
+"""
+Módulo de utilidades para exportar registros a CSV en streaming.
+Genera el archivo por fragmentos a medida que se leen las filas, sin construirlo completo en memoria.
+"""
+import csv
+
+
+class _Echo:
+    """Objeto tipo archivo que devuelve lo escrito en lugar de almacenarlo."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(records, header: tuple, chunk_size: int = 500, bom: bool = True):
+    """
+    Genera un CSV fragmento a fragmento.
+    Args:
+        records (iterable): Filas (tuplas o namedtuple) en el orden de `header`.
+        header (tuple): Nombres de las columnas.
+        chunk_size (int): Filas por fragmento enviado al socket.
+        bom (bool): Antepone el BOM de UTF-8 para que Excel detecte la codificación.
+    """
+    writer = csv.writer(_Echo())
+    chunk = [('\ufeff' if bom else '') + writer.writerow(header)]
+    for record in records:
+        chunk.append(writer.writerow(record))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
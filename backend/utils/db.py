@@ -1,16 +1,23 @@
 """
 Módulo de utilidades para la conexión a la base de datos.
 Este módulo provee la funcionalidad para conectarse a una base de datos PostgreSQL utilizando psycopg2.
-Incluye la carga de variables de entorno desde un archivo .env para obtener las credenciales de la base de datos."""
+Incluye la carga de variables de entorno desde un archivo .env para obtener las credenciales de la base de datos
+y un pool de conexiones compartido por todo el proceso para que los servicios reutilicen conexiones."""
 import psycopg2
-import os 
+import psycopg2.extensions
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
 #Se carga la conexion a la base de datos
 def get_connection():
-    """Establece una conexión a la base de datos PostgreSQL utilizando las credenciales del entorno."""
+    """Establece una conexión nueva (fuera del pool) a la base de datos PostgreSQL utilizando las credenciales del entorno.
+    Se usa para conexiones dedicadas de larga duración, como el listener de notificaciones."""
     conn = {
             'host': os.getenv('DB_HOST'),
             'dbname': os.getenv('DB_NAME'),
@@ -20,6 +27,215 @@ def get_connection():
             'port':os.getenv('DB_PORT')}
     return psycopg2.connect(**conn)
 
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay una conexión disponible en el pool dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe con tamaño mínimo/máximo, tiempo máximo de espera al pedir
+    una conexión y verificación de salud al entregarla.
+    Las conexiones se devuelven al pool en lugar de cerrarse.
+    """
+    def __init__(self, min_size: int = 1, max_size: int = 10, timeout: float = 10.0,
+                 health_check_interval: float = 30.0, connect=get_connection):
+        """
+        Args:
+            min_size (int): Conexiones que se abren al crear el pool y se mantienen abiertas.
+            max_size (int): Número máximo de conexiones abiertas a la vez.
+            timeout (float): Segundos que se espera por una conexión libre antes de fallar.
+            health_check_interval (float): Segundos de inactividad tras los cuales se ejecuta un `SELECT 1` antes de entregar la conexión.
+            connect (callable): Función que abre una conexión nueva.
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamaño de pool inválido")
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._connect = connect
+        self._cond = threading.Condition()
+        self._idle = deque()            # (conexion, momento en que quedó libre)
+        self._size = 0                  # conexiones abiertas (libres + en uso)
+        self._in_use = 0
+        self._closed = False
+        self._stats = {'checkouts': 0, 'timeouts': 0, 'discarded': 0, 'wait_time_total': 0.0, 'wait_time_max': 0.0}
+        for _ in range(min_size):
+            conn = self._connect()
+            self._size += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def getconn(self):
+        """Toma una conexión del pool, esperando como máximo `timeout` segundos."""
+        start = time.monotonic()
+        deadline = start + self._timeout
+        while True:
+            conn, idle_since = None, None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("El pool de conexiones está cerrado")
+                    if self._idle:
+                        conn, idle_since = self._idle.pop()
+                        break
+                    if self._size < self._max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(f"No hay conexiones disponibles tras {self._timeout}s")
+                    self._cond.wait(remaining)
+                self._in_use += 1
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif not self._is_healthy(conn, idle_since):
+                self._discard(conn)
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._stats['checkouts'] += 1
+                self._stats['wait_time_total'] += waited
+                self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+            return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Devuelve una conexión al pool. Si tiene una transacción abierta se revierte;
+        si está rota o `discard` es True se cierra."""
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Cierra las conexiones libres y evita que se entreguen nuevas."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """Estadísticas del pool para monitoreo."""
+        with self._cond:
+            checkouts = self._stats['checkouts']
+            return {
+                'min_size': self._min_size,
+                'max_size': self._max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'discarded': self._stats['discarded'],
+                'wait_time_avg_ms': round(self._stats['wait_time_total'] / checkouts * 1000, 3) if checkouts else 0.0,
+                'wait_time_max_ms': round(self._stats['wait_time_max'] * 1000, 3),
+            }
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        """Verifica que la conexión siga viva. Solo se consulta al servidor si estuvo inactiva más del intervalo configurado."""
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self._health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        """Cierra una conexión defectuosa y libera su lugar en el pool."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['discarded'] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Devuelve el pool del proceso, creándolo la primera vez.
+    Se vuelve a crear si el proceso cambió (por ejemplo, tras el fork de un worker de Gunicorn)."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(
+                min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+                max_size=int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                health_check_interval=float(os.getenv('DB_POOL_HEALTHCHECK_SECONDS', 30)))
+            _pool_pid = os.getpid()
+    return _pool
+
+@contextmanager
+def db_connection():
+    """
+    Toma una conexión del pool y la devuelve al salir del bloque.
+    Si ocurre una excepción la transacción se revierte antes de devolverla.
+
+    Uso:
+        with db_connection() as conn, conn.cursor() as cursor:
+            cursor.callproc(...)
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    try:
+        yield conn
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+def pool_stats() -> dict:
+    """Estadísticas del pool de conexiones del proceso."""
+    return get_pool().stats()
+
 import json
 
 def null_parse(value):
@@ -46,5 +262,3 @@ def null_parse(value):
             pass
 
     return value
-
-
@@ -0,0 +1,103 @@
+"""
+Módulo de suscripción a eventos de la base de datos dentro de los procesos web.
+Un único hilo por proceso escucha el canal 'database_events' y entrega cada evento a las funciones suscritas
+a su tipo. Es independiente de `run_listener.py`, que procesa las notificaciones de correo.
+Si la conexión se pierde se avisa a las funciones registradas con `on_reset`, porque los eventos
+emitidos mientras no había conexión no se pueden recuperar.
+"""
+import json
+import os
+import select
+import threading
+import time
+import psycopg2
+from utils.db import get_connection
+
+CHANNEL = 'database_events'
+
+_subscribers = {}
+_reset_callbacks = []
+_lock = threading.Lock()
+_listener_pid = None
+_connected = threading.Event()
+
+
+def subscribe(event: str, callback):
+    """Registra `callback(data)` para los eventos cuyo campo 'event' coincide con `event`."""
+    with _lock:
+        _subscribers.setdefault(event, []).append(callback)
+
+def on_reset(callback):
+    """Registra `callback()` para cuando se (re)establece la conexión y pudieron perderse eventos."""
+    with _lock:
+        _reset_callbacks.append(callback)
+
+def is_listening() -> bool:
+    """Indica si el hilo de este proceso está conectado y escuchando."""
+    return _listener_pid == os.getpid() and _connected.is_set()
+
+def ensure_started():
+    """Inicia el hilo de escucha en este proceso si aún no existe (se reinicia tras un fork)."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        _connected.clear()
+    threading.Thread(target=_listen, name='db-events-listener', daemon=True).start()
+
+
+def _reset():
+    _connected.clear()
+    for callback in tuple(_reset_callbacks):
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error reiniciando suscriptor de eventos: {e}")
+
+def _dispatch(payload: str):
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return
+    if not isinstance(data, dict):
+        return
+    for callback in tuple(_subscribers.get(data.get('event'), ())):
+        try:
+            callback(data)
+        except Exception as e:
+            print(f"Error procesando evento {data.get('event')}: {e}")
+
+def _listen():
+    """Escucha el canal de eventos y reconecta con espera exponencial si se pierde la conexión."""
+    delay = 1
+    while True:
+        conn = None
+        try:
+            conn = get_connection()
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL};")
+            _reset()
+            _connected.set()
+            delay = 1
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _dispatch(conn.notifies.pop(0).payload)
+        except Exception as e:
+            print(f"Error en el listener de eventos del proceso web: {e}")
+            _reset()
+            time.sleep(delay)
+            delay = min(delay * 2, 60)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
@@ -0,0 +1,112 @@
+"""
+Módulo de GET condicional (ETag / If-None-Match).
+Cada etiqueta de entidad ('group:5', 'activity:12', ...) tiene una versión en la tabla entityversions,
+que fn_notify_entity_changed incrementa en la misma transacción que el cambio y publica en 'database_events';
+las de listas y familias ('groups', 'activity', ...) se derivan de ellas (fn_get_entity_versions).
+El ETag de una respuesta se calcula a partir de la ruta, los parámetros y las versiones de sus etiquetas,
+por lo que una petición con If-None-Match vigente recibe 304 sin ejecutar el procedimiento ni serializar datos.
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, make_response
+from utils import db_events
+from utils import procedures as sp
+from utils.response_cache import expand_tags
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+class EntityVersions:
+    """Versiones de las etiquetas de entidad conocidas por el proceso."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, tags: tuple) -> tuple:
+        """
+        Devuelve las versiones de `tags` en el mismo orden.
+        Las que no se conocen se consultan a la base de datos; solo se recuerdan mientras el listener
+        del proceso está conectado, porque sin él no se recibirían los incrementos.
+        """
+        listening = db_events.is_listening()
+        versions = self._versions
+        missing = [tag for tag in tags if tag not in versions] if listening else list(tags)
+        if missing:
+            loaded = dict.fromkeys(missing, 0)
+            loaded.update(sp.fetch_all('public.fn_get_entity_versions', (missing,)))
+            if not listening:
+                return tuple(loaded[tag] for tag in tags)
+            self.update(loaded)
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def update(self, versions: dict):
+        """Aplica versiones nuevas; nunca retrocede una versión ya conocida."""
+        with self._lock:
+            current = self._versions
+            for tag, version in versions.items():
+                if version > current.get(tag, -1):
+                    current[tag] = version
+
+    def forget(self, families):
+        """Descarta las versiones conocidas de las etiquetas de `families` ('activity' descarta 'activity:12', ...)."""
+        prefixes = tuple(f'{family}:' for family in families)
+        if prefixes:
+            with self._lock:
+                self._versions = {tag: version for tag, version in self._versions.items()
+                                  if not tag.startswith(prefixes)}
+
+    def handle_event(self, data: dict):
+        """Aplica un evento 'entity_changed'; 'reset' lista familias cuyas versiones cambiaron sin publicarse."""
+        self.forget(data.get('reset') or ())
+        self.update(data.get('versions') or {})
+
+    def clear(self):
+        with self._lock:
+            self._versions = {}
+
+
+entity_versions = EntityVersions()
+db_events.subscribe('entity_changed', entity_versions.handle_event)
+db_events.on_reset(entity_versions.clear)
+
+
+def conditional(*tag_templates, daily: bool = False):
+    """
+    Decorador para vistas GET que agrega un ETag fuerte y responde 304 si coincide con If-None-Match.
+    Se aplica debajo de `token_required`; las etiquetas pueden usar los argumentos de la ruta y `{user_id}`.
+    Args:
+        *tag_templates (str): Etiquetas de las entidades que forman la respuesta.
+        daily (bool): Incluir la fecha (UTC, como las ventanas when=today|week) en el ETag, para respuestas que dependen del día (p. ej. próximos eventos).
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            db_events.ensure_started()
+            current_user = getattr(request, 'current_user', None) or {}
+            tags = tuple(sorted(expand_tags(tag_templates, {'user_id': current_user.get('user_id'), **kwargs})))
+            try:
+                versions = entity_versions.get(tags)
+            except Exception as e:
+                # Sin versiones no se puede validar; se responde normalmente sin ETag
+                print(f"Error obteniendo versiones de entidades: {e}")
+                return f(*args, **kwargs)
+
+            parts = [request.path, repr(sorted(request.args.items(multi=True))), repr(tags), repr(versions)]
+            if daily:
+                parts.append(datetime.now(timezone.utc).date().isoformat())
+            etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
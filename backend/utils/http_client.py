@@ -0,0 +1,211 @@
+"""
+Módulo de cliente HTTP para servicios externos.
+Cada HttpClient mantiene una sesión de requests por proceso con conexiones keep-alive reutilizables,
+aplica tiempos máximos de conexión y de lectura, reintenta un número acotado de veces con espera exponencial
+y jitter (las peticiones no idempotentes, como la subida de una imagen, solo se reintentan si el servicio no
+pudo haberlas procesado: fallas al conectar y respuestas 429/503), y protege al backend con un circuit breaker: tras varias fallas seguidas deja de llamar al servicio
+durante un tiempo y falla de inmediato, en lugar de ocupar workers esperando a un servicio caído.
+"""
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+#Respuestas que indican una falla temporal del servicio
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+#Respuestas que indican que el servicio no procesó la petición, reintentables aunque no sea idempotente
+UNPROCESSED_STATUSES = frozenset({429, 503})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """El circuit breaker está abierto: el servicio falló recientemente y no se intenta la petición."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de tres estados:
+    - closed: las peticiones pasan; `failure_threshold` fallas seguidas lo abren.
+    - open: las peticiones fallan de inmediato durante `reset_timeout` segundos.
+    - half_open: se deja pasar una sola petición de prueba; si funciona se cierra y si falla se vuelve a abrir.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Indica si se puede intentar una petición."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class HttpClient:
+    """Cliente HTTP compartido con timeouts, reintentos con jitter y circuit breaker."""
+
+    def __init__(self, name: str, connect_timeout: float = 3.05, read_timeout: float = 20, retries: int = 2,
+                 backoff: float = 0.5, backoff_max: float = 4, pool_size: int = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Args:
+            name (str): Nombre del servicio (para métricas y mensajes).
+            connect_timeout (float): Segundos máximos para establecer la conexión.
+            read_timeout (float): Segundos máximos sin recibir datos del servidor.
+            retries (int): Reintentos ante errores de conexión, timeouts y respuestas 429/5xx.
+            backoff (float): Espera base entre reintentos; se duplica en cada intento y se aplica con jitter.
+            backoff_max (float): Espera máxima entre reintentos.
+            pool_size (int): Conexiones keep-alive por host.
+            failure_threshold (int): Fallas seguidas que abren el circuit breaker.
+            reset_timeout (float): Segundos que el circuit breaker permanece abierto.
+        """
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+        self._rejected = 0
+
+    @property
+    def session(self) -> requests.Session:
+        """Sesión del proceso actual; tras un fork se crea una nueva para no compartir sockets."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._pid = pid
+        return self._session
+
+    def request(self, method: str, url: str, idempotent: bool = None, **kwargs) -> requests.Response:
+        """
+        Ejecuta la petición con reintentos. Los cuerpos deben ser reutilizables (bytes, no archivos abiertos).
+        Args:
+            idempotent (bool): Si repetir la petición es seguro; por defecto según el método. Una petición no
+                idempotente solo se reintenta si falló al conectar (el cuerpo no se envió) o con 429/503: tras
+                un timeout de lectura el servicio pudo haberla procesado (p. ej. guardado la imagen).
+        Returns:
+            requests.Response: La respuesta (la última, si todos los intentos respondieron 429/5xx).
+        Raises:
+            CircuitOpenError: Si el circuit breaker está abierto.
+            requests.exceptions.RequestException: Si todos los intentos fallaron por conexión o timeout.
+        """
+        if not self.breaker.allow():
+            self._rejected += 1
+            raise CircuitOpenError(f"El servicio {self.name} no está disponible temporalmente")
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES
+        kwargs.setdefault('timeout', self.timeout)
+        self._requests += 1
+        response = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._retries += 1
+                time.sleep(self._delay(attempt, response))
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not (idempotent or self._before_send(e)):
+                    self._failures += 1
+                    self.breaker.record_failure()
+                    raise
+                error = e
+                response = None
+                continue
+            except requests.exceptions.RequestException:
+                self._failures += 1
+                self.breaker.record_failure()
+                raise
+            if response.status_code not in RETRY_STATUSES:
+                # Las respuestas 4xx son del cliente: el servicio está disponible
+                self.breaker.record_success()
+                return response
+            if response.status_code not in retry_statuses:
+                break
+
+        self._failures += 1
+        self.breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    @staticmethod
+    def _before_send(error: requests.exceptions.RequestException) -> bool:
+        """Indica si la petición falló antes de enviarse (no se pudo conectar), por lo que el servicio no la recibió."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and not isinstance(error, requests.exceptions.Timeout):
+            reason = getattr(error.args[0], 'reason', None) if error.args else None
+            return isinstance(reason, NewConnectionError)
+        return False
+
+    def _delay(self, attempt: int, response) -> float:
+        """Espera antes del reintento: Retry-After si el servidor lo indica, si no backoff exponencial con jitter."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+
+    def stats(self) -> dict:
+        return {
+            'circuit': self.breaker.state,
+            'requests': self._requests,
+            'retries': self._retries,
+            'failures': self._failures,
+            'rejected': self._rejected
+        }
@@ -0,0 +1,155 @@
+"""
+Módulo de almacenamiento de imágenes.
+Define la interfaz de almacenamiento de fotos de perfil (usuarios y grupos) y sus implementaciones:
+- LocalImageStorage: guarda las imágenes en disco direccionadas por el SHA-256 del archivo subido, de modo que
+  subir la misma imagen dos veces no la procesa ni la guarda de nuevo. Cada imagen se guarda en varias versiones
+  (thumb, card, full) generadas con una sola decodificación, y se sirven desde /media con caché inmutable.
+- ImgurImageStorage: sube la versión completa a Imgur con ImageUploader; las versiones se obtienen con los
+  sufijos de tamaño de Imgur.
+La base de datos guarda la URL de la versión completa; `variant_url` deriva de ella la URL de otra versión.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from functools import partial
+from dotenv import load_dotenv
+from utils.imgur import ImageUploader
+from utils.images import image_pool, process_variants
+
+load_dotenv()
+
+#Lado en píxeles de cada versión; thumb y card coinciden con los sufijos 'b' y 'm' de Imgur
+VARIANT_SIZES = {
+    'thumb': 160,
+    'card': 320,
+    'full': int(os.getenv('IMGUR_IMAGE_SQUARE_SIZE', 1024)),
+}
+
+LOCAL_URL_PATTERN = re.compile(r'^(?P<prefix>.*/)(?P<key>[0-9a-f]{64})/(?P<variant>[a-z]+)\.jpg$')
+IMGUR_URL_PATTERN = re.compile(r'^(?P<prefix>https?://i\.imgur\.com/)(?P<id>[A-Za-z0-9]+)(?P<ext>\.[a-z]+)$')
+
+
+class ImageStorageError(Exception):
+    """No se pudo procesar o guardar la imagen."""
+    pass
+
+
+class ImageStorage(ABC):
+    """Interfaz de los almacenamientos de imágenes."""
+
+    @abstractmethod
+    def save(self, data: bytes) -> str:
+        """
+        Procesa y guarda la imagen subida.
+        Args:
+            data (bytes): Contenido del archivo subido.
+        Returns:
+            str: URL de la versión completa.
+        Raises:
+            ImageStorageError: Si la imagen no se pudo procesar o guardar.
+        """
+
+
+class LocalImageStorage(ImageStorage):
+    """Almacenamiento en disco direccionado por contenido: <root>/<ab>/<sha256>/<versión>.jpg"""
+
+    def __init__(self, root: str, base_url: str, sizes: dict = VARIANT_SIZES):
+        """
+        Args:
+            root (str): Directorio donde se guardan las imágenes.
+            base_url (str): URL pública del directorio (p. ej. '/media' o la URL de un CDN).
+            sizes (dict): Lado en píxeles de cada versión, por nombre.
+        """
+        self.root = root
+        self.base_url = base_url.rstrip('/')
+        self.sizes = sizes
+
+    def path_for(self, key: str, variant: str) -> str:
+        return os.path.join(self.root, key[:2], key, f"{variant}.jpg")
+
+    def url_for(self, key: str, variant: str = 'full') -> str:
+        return f"{self.base_url}/{key}/{variant}.jpg"
+
+    def save(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        # 'full' se escribe al final: si existe, la imagen ya está completa
+        if os.path.exists(self.path_for(key, 'full')):
+            return self.url_for(key)
+        try:
+            variants = image_pool.submit(process_variants, data, self.sizes)
+        except Exception as e:
+            raise ImageStorageError(f"No se pudo procesar la imagen: {e}") from e
+
+        try:
+            directory = os.path.dirname(self.path_for(key, 'full'))
+            os.makedirs(directory, exist_ok=True)
+            for variant in sorted(variants, key=lambda name: name == 'full'):
+                self._write(directory, self.path_for(key, variant), variants[variant])
+        except OSError as e:
+            raise ImageStorageError(f"No se pudo guardar la imagen: {e}") from e
+        return self.url_for(key)
+
+    @staticmethod
+    def _write(directory: str, path: str, content: bytes):
+        """Escribe el archivo de forma atómica para no servir nunca una imagen a medio escribir."""
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class ImgurImageStorage(ImageStorage):
+    """Almacenamiento en Imgur; solo se sube la versión completa."""
+
+    def save(self, data: bytes) -> str:
+        response = ImageUploader(io.BytesIO(data)).run()
+        if response.get("status") != 200:
+            raise ImageStorageError(response.get("error") or "Error al subir la imagen a Imgur")
+        return response["data"]["link"]
+
+
+#Sufijos de tamaño de Imgur para cada versión
+IMGUR_SUFFIXES = {'thumb': 'b', 'card': 'm', 'full': ''}
+
+def variant_url(url: str, variant: str) -> str:
+    """
+    Devuelve la URL de una versión de la imagen a partir de la URL guardada en la base de datos.
+    Las URL que no corresponden a ningún almacenamiento conocido se devuelven sin cambios.
+    """
+    if not url or variant not in VARIANT_SIZES:
+        return url
+    match = LOCAL_URL_PATTERN.match(url)
+    if match:
+        return f"{match['prefix']}{match['key']}/{variant}.jpg"
+    match = IMGUR_URL_PATTERN.match(url)
+    if match:
+        return f"{match['prefix']}{match['id']}{IMGUR_SUFFIXES[variant]}{match['ext']}"
+    return url
+
+def variant_urls(url: str) -> dict:
+    """URL de todas las versiones de la imagen."""
+    return {variant: variant_url(url, variant) for variant in VARIANT_SIZES}
+
+#Conversores para los mapeos de los procedimientos
+thumb_url = partial(variant_url, variant='thumb')
+card_url = partial(variant_url, variant='card')
+
+
+def _create_storage() -> ImageStorage:
+    backend = os.getenv('IMAGE_STORAGE', 'imgur').lower()
+    if backend == 'local':
+        return LocalImageStorage(root=os.path.abspath(os.getenv('MEDIA_ROOT', 'media')),
+                                 base_url=os.getenv('MEDIA_BASE_URL', '/media'))
+    if backend == 'imgur':
+        return ImgurImageStorage()
+    raise ValueError(f"IMAGE_STORAGE no soportado: {backend}")
+
+image_storage = _create_storage()
@@ -0,0 +1,136 @@
+"""
+Módulo de procesamiento de imágenes.
+Convierte las imágenes subidas en un JPEG cuadrado del tamaño requerido reduciendo la resolución durante la
+decodificación (modo draft de JPEG y `reducing_gap`), de modo que una foto de 24 MP no se decodifica completa.
+El trabajo de CPU se ejecuta en un pool acotado de procesos para no bloquear los hilos que atienden peticiones.
+Las funciones de procesamiento no dependen de Flask porque se ejecutan en los procesos del pool.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+#Factor a partir del cual se reduce con `Image.reduce` antes del remuestreo LANCZOS
+REDUCING_GAP = 3.0
+
+
+class ImagePoolBusyError(Exception):
+    """El pool de procesamiento no tiene capacidad para aceptar otra imagen."""
+    pass
+
+
+def square_box(width: int, height: int) -> tuple:
+    """Caja del recorte cuadrado centrado de una imagen."""
+    min_dim = min(width, height)
+    left = (width - min_dim) / 2
+    top = (height - min_dim) / 2
+    return (left, top, left + min_dim, top + min_dim)
+
+def open_scaled(data: bytes, size: int) -> Image.Image:
+    """
+    Abre la imagen pidiendo al decodificador una versión reducida cuyo lado menor sea al menos `size`.
+    En JPEG el decodificador escala por 1/2, 1/4 o 1/8 sin decodificar la resolución completa.
+    """
+    img = Image.open(io.BytesIO(data))
+    width, height = img.size
+    min_dim = min(width, height)
+    if img.format == 'JPEG' and min_dim > size:
+        scale = size / min_dim
+        img.draft('RGB', (max(1, int(width * scale)), max(1, int(height * scale))))
+    return img
+
+def render_square(img: Image.Image, size: int) -> Image.Image:
+    """Recorta al cuadrado central y redimensiona a `size` en una sola operación."""
+    width, height = img.size
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return img.resize((size, size), Image.Resampling.LANCZOS, box=square_box(width, height), reducing_gap=REDUCING_GAP)
+
+def encode_jpeg(img: Image.Image) -> bytes:
+    output = io.BytesIO()
+    img.save(output, format='JPEG')
+    return output.getvalue()
+
+def process_square(data: bytes, size: int) -> bytes:
+    """Convierte la imagen en un JPEG cuadrado de `size` x `size`. Se ejecuta dentro del pool de procesos."""
+    with open_scaled(data, size) as img:
+        return encode_jpeg(render_square(img, size))
+
+def process_variants(data: bytes, sizes: dict) -> dict:
+    """
+    Genera varias versiones cuadradas de la imagen con una sola decodificación.
+    La imagen se decodifica reducida para la versión más grande y las demás se obtienen de esa.
+    Args:
+        data (bytes): Imagen original.
+        sizes (dict): Lado en píxeles de cada versión, por nombre.
+    Returns:
+        dict: JPEG de cada versión, por nombre.
+    """
+    largest = max(sizes.values())
+    with open_scaled(data, largest) as img:
+        base = render_square(img, largest)
+    return {name: encode_jpeg(base if size == largest else
+                              base.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP))
+            for name, size in sizes.items()}
+
+
+class ImageProcessPool:
+    """Pool de procesos acotado para el procesamiento de imágenes, creado bajo demanda en cada proceso."""
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        """
+        Args:
+            workers (int): Procesos del pool.
+            max_pending (int): Imágenes aceptadas a la vez (en proceso o en espera); las demás se rechazan.
+            timeout (float): Segundos máximos de espera por una imagen.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    # spawn: los procesos del pool no heredan hilos ni conexiones del proceso web
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                    self._pid = pid
+        return self._executor
+
+    def submit(self, fn, *args):
+        """Ejecuta `fn(*args)` en el pool y espera el resultado. Lanza ImagePoolBusyError si no hay capacidad."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ImagePoolBusyError("El procesamiento de imágenes está saturado")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # El cupo se libera cuando el proceso termina la imagen, no cuando se deja de esperarla: una imagen que
+        # excede el tiempo sigue ocupando un proceso y cuenta para max_pending hasta que termina
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # Un proceso del pool murió (p. ej. por falta de memoria): se crea un pool nuevo en la siguiente imagen
+            with self._lock:
+                self._pid = None
+            raise
+
+
+image_pool = ImageProcessPool(
+    workers=int(os.getenv('IMAGE_PROCESS_WORKERS', 2)),
+    max_pending=int(os.getenv('IMAGE_PROCESS_MAX_PENDING', 8)),
+    timeout=float(os.getenv('IMAGE_PROCESS_TIMEOUT', 20))
+)
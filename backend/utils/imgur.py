@@ -1,8 +1,25 @@
+"""
+Módulo del cliente de Imgur.
+Contiene el cliente HTTP compartido con la API de Imgur y ImageUploader, que procesa una imagen y la sube.
+Lo usan ImgurImageStorage (utils/image_storage.py) y el endpoint de monitoreo.
+"""
 import requests
 import os
 from dotenv import load_dotenv
-import io
-from PIL import Image
+from utils.images import image_pool, process_square
+from utils.http_client import HttpClient
+
+load_dotenv()
+
+#Cliente compartido por todas las subidas del proceso (conexiones keep-alive, timeouts y circuit breaker)
+imgur_client = HttpClient(
+    'imgur',
+    connect_timeout=float(os.getenv('IMGUR_CONNECT_TIMEOUT', 3.05)),
+    read_timeout=float(os.getenv('IMGUR_READ_TIMEOUT', 20)),
+    retries=int(os.getenv('IMGUR_RETRIES', 2)),
+    failure_threshold=int(os.getenv('IMGUR_CIRCUIT_FAILURES', 5)),
+    reset_timeout=float(os.getenv('IMGUR_CIRCUIT_RESET', 30))
+)
 
 class ImageUploader:
     '''
@@ -33,30 +50,12 @@ class ImageUploader:
 
     def __process_image(self):
         """ Procesa la imagen para que sea cuadrada y del tamaño adecuado.
-        Retorna un objeto BytesIO con la imagen procesada."""
+        El procesamiento se ejecuta en el pool de procesos de imágenes; la imagen se reduce al decodificarla.
+        Retorna el contenido JPEG de la imagen procesada."""
         try:
-            img = Image.open(self.__files)
-            width, height = img.size
-
-            if width != height:
-                min_dim = min(width, height)
-                left = (width - min_dim) / 2
-                top = (height - min_dim) / 2
-                right = (width + min_dim) / 2
-                bottom = (height + min_dim) / 2
-                img = img.crop((left, top, right, bottom))
+            data = self.__files.read()
+            return image_pool.submit(process_square, data, self.__size)
 
-            img = img.resize((self.__size, self.__size), Image.Resampling.LANCZOS)
-            # Convertir la imagen a RGB si tiene canal alfa
-            if img.mode in ("RGBA", "LA", "P"):
-                img = img.convert("RGB")
-
-            img_byte_arr = io.BytesIO()
-            img.save(img_byte_arr, format='JPEG')
-            img_byte_arr.seek(0)
-            img.close()
-            return img_byte_arr
-        
         except Exception as e:
             print(f"[ERROR] Procesamiento de imagen: {e}")
             return None
@@ -66,7 +65,7 @@ class ImageUploader:
        Args:
             files (dict): Diccionario con la imagen a subir."""
         try:
-            response = requests.post(self.__endpoint, headers=self.__headers, files=files)
+            response = imgur_client.post(self.__endpoint, headers=self.__headers, files=files)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
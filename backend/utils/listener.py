@@ -1,42 +1,237 @@
 '''
 Este módulo se encarga de escuchar eventos en la base de datos y procesar notificaciones.
-Utiliza psycopg2 para conectarse a la base de datos y escuchar eventos en un canal específico.
-Cuando se recibe una notificación, se procesa el evento y se ejecuta la lógica correspondiente.
+Utiliza asyncio para leer continuamente el canal 'database_events' y encolar cada notificación,
+mientras un grupo acotado de workers ejecuta los manejadores (envío de correos) en hilos.
+Las notificaciones urgentes (códigos de restablecimiento, bienvenida) tienen su propia cola y sus propios workers,
+por lo que un envío masivo no retrasa un código de verificación.
+Si la conexión se pierde se reconecta con espera exponencial y se vuelve a ejecutar LISTEN.
+También ejecuta el dispatcher de la bandeja de salida de correos, que se despierta con el evento 'outbox_email'
+y revisa periódicamente los correos pendientes o por reintentar.
 '''
-import psycopg2
-import os
+import asyncio
 import json
-import select
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
 from utils.db import get_connection
 from controllers.notifications_controller import ProcessNotifications
+from emails.outbox import OutboxDispatcher
+from app import app
+
+CHANNEL = 'database_events'
+#Eventos que se atienden en la cola urgente
+URGENT_EVENTS = frozenset({'reset_pass_code', 'welcome_user'})
+#Eventos del canal que consumen otros componentes (cachés de respuestas, refresh tokens y catálogos del proceso web)
+IGNORED_EVENTS = frozenset({'entity_changed', 'refresh_tokens_changed', 'catalogs_changed'})
+#Evento que despierta al dispatcher de la bandeja de salida
+OUTBOX_EVENT = 'outbox_email'
+
+
+class NotificationListener:
+    """
+    Listener asíncrono de notificaciones de la base de datos.
+    La lectura del canal nunca ejecuta manejadores: solo decodifica y encola. Cuando la cola masiva
+    está llena la lectura se detiene (contrapresión) y las notificaciones esperan en PostgreSQL.
+    """
+
+    def __init__(self, workers: int, urgent_workers: int, queue_size: int,
+                 shutdown_timeout: float, keepalive: float = 30,
+                 outbox: OutboxDispatcher = None, outbox_poll: float = 30):
+        """
+        Args:
+            workers (int): Workers para las notificaciones masivas.
+            urgent_workers (int): Workers reservados para las notificaciones urgentes.
+            queue_size (int): Tamaño máximo de cada cola.
+            shutdown_timeout (float): Segundos que se espera a que se vacíen las colas al detenerse.
+            keepalive (float): Segundos sin actividad tras los que se verifica la conexión.
+            outbox (OutboxDispatcher, optional): Dispatcher de la bandeja de salida de correos.
+            outbox_poll (float): Segundos entre revisiones de la bandeja de salida sin notificaciones.
+        """
+        self.workers = workers
+        self.urgent_workers = urgent_workers
+        self.queue_size = queue_size
+        self.shutdown_timeout = shutdown_timeout
+        self.keepalive = keepalive
+        self.outbox = outbox
+        self.outbox_poll = outbox_poll
+        self._outbox_wakeup = None
+        self._stopping = None
+        self._urgent = None
+        self._bulk = None
+        self._executor = None
+
+    async def run(self):
+        """Ejecuta el listener hasta recibir SIGTERM/SIGINT."""
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._outbox_wakeup = asyncio.Event()
+        self._urgent = asyncio.Queue(self.queue_size)
+        self._bulk = asyncio.Queue(self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers + self.urgent_workers + 1,
+                                            thread_name_prefix='notifications')
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        tasks = [asyncio.create_task(self._worker(self._urgent)) for _ in range(self.urgent_workers)]
+        tasks += [asyncio.create_task(self._worker(self._bulk)) for _ in range(self.workers)]
+        if self.outbox is not None:
+            tasks.append(asyncio.create_task(self._outbox_loop()))
+        try:
+            await self._listen_forever()
+        finally:
+            await self._shutdown(tasks)
+
+    async def _listen_forever(self):
+        """Mantiene la conexión de escucha, reconectando con espera exponencial."""
+        delay = 1
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = get_connection()
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL};")
+                print(f"Escuchando canal: '{CHANNEL}'")
+                delay = 1
+                await self._drain(conn)
+            except Exception as e:
+                print(f"Conexión del listener perdida: {e}. Reintentando en {delay}s")
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, 60)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    async def _drain(self, conn):
+        """Lee las notificaciones de la conexión y las encola hasta que se solicite detener el listener."""
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(conn.fileno(), readable.set)
+        try:
+            while not self._stopping.is_set():
+                stop = asyncio.ensure_future(self._stopping.wait())
+                ready = asyncio.ensure_future(readable.wait())
+                done, _ = await asyncio.wait({stop, ready}, timeout=self.keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                stop.cancel()
+                ready.cancel()
+                if self._stopping.is_set():
+                    return
+                if not done:
+                    # Sin actividad: verificar que la conexión sigue viva
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1;")
+                readable.clear()
+                conn.poll()
+                notifies = conn.notifies[:]
+                conn.notifies.clear()
+                # Las urgentes del mismo lote se encolan antes que las masivas
+                items = sorted(filter(None, map(self._parse, notifies)), key=lambda item: item[0] not in URGENT_EVENTS)
+                for item in items:
+                    if item[0] == OUTBOX_EVENT:
+                        self._outbox_wakeup.set()
+                        continue
+                    queue = self._urgent if item[0] in URGENT_EVENTS else self._bulk
+                    if queue.full():
+                        # Contrapresión: dejar de leer el socket hasta que haya espacio
+                        loop.remove_reader(conn.fileno())
+                        await queue.put(item)
+                        loop.add_reader(conn.fileno(), readable.set)
+                        readable.set()
+                    else:
+                        queue.put_nowait(item)
+        finally:
+            loop.remove_reader(conn.fileno())
+
+    @staticmethod
+    def _parse(notify):
+        """Decodifica una notificación; devuelve (contexto, datos) o None si se descarta."""
+        try:
+            data = json.loads(notify.payload)
+        except ValueError as e:
+            print(f"Notificación con formato inválido: {e}")
+            return None
+        context = data.get('event') if isinstance(data, dict) else None
+        if context is None or context in IGNORED_EVENTS:
+            return None
+        return (context, data)
+
+    async def _worker(self, queue: asyncio.Queue):
+        """Toma notificaciones de la cola y ejecuta su manejador en el pool de hilos."""
+        loop = asyncio.get_running_loop()
+        while True:
+            context, data = await queue.get()
+            try:
+                await loop.run_in_executor(self._executor, ProcessNotifications(context, data).run)
+            except Exception as e:
+                print(f"Error procesando notificación: {e}")
+            finally:
+                queue.task_done()
+
+    async def _outbox_loop(self):
+        """Envía la bandeja de salida al recibir 'outbox_email' o cada `outbox_poll` segundos, lote tras lote."""
+        loop = asyncio.get_running_loop()
+        # Al iniciar se revisan los correos que quedaron pendientes
+        self._outbox_wakeup.set()
+        while True:
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), timeout=self.outbox_poll)
+            except asyncio.TimeoutError:
+                pass
+            self._outbox_wakeup.clear()
+            try:
+                while not self._stopping.is_set():
+                    claimed = await loop.run_in_executor(self._executor, self._dispatch_outbox)
+                    if claimed < self.outbox.batch_size:
+                        break
+            except Exception as e:
+                print(f"Error enviando la bandeja de salida: {e}")
+
+    def _dispatch_outbox(self) -> int:
+        with app.app_context():
+            return self.outbox.run_once()
+
+    async def _shutdown(self, tasks):
+        """Espera a que se procesen las notificaciones encoladas (con límite de tiempo) y libera los workers."""
+        print("Deteniendo listener, procesando notificaciones pendientes...")
+        try:
+            await asyncio.wait_for(asyncio.gather(self._urgent.join(), self._bulk.join()), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            print(f"Quedaron {self._urgent.qsize() + self._bulk.qsize()} notificaciones sin procesar")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
 
 def start_listener():
     """
     Inicia el listener para escuchar eventos en la base de datos.
-    Este método se conecta a la base de datos y escucha notificaciones en un canal específico.
-    Cuando se recibe una notificación, se procesa el evento y se ejecuta la lógica correspondiente
+    Se ejecuta hasta recibir SIGTERM/SIGINT; al detenerse termina de procesar lo encolado.
     """
+    listener = NotificationListener(
+        workers=int(os.getenv('LISTENER_WORKERS', 4)),
+        urgent_workers=int(os.getenv('LISTENER_URGENT_WORKERS', 1)),
+        queue_size=int(os.getenv('LISTENER_QUEUE_SIZE', 100)),
+        shutdown_timeout=float(os.getenv('LISTENER_SHUTDOWN_TIMEOUT', 30)),
+        outbox=OutboxDispatcher(
+            batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', 50)),
+            lease_seconds=int(os.getenv('OUTBOX_LEASE_SECONDS', 300)),
+            max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+        ),
+        outbox_poll=float(os.getenv('OUTBOX_POLL_SECONDS', 30))
+    )
     try:
-        conn = get_connection()
-        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-        cursor = conn.cursor()
-
-        channel = 'database_events'
-        cursor.execute(f"LISTEN {channel};")
-        print(f"Escuchando canal: '{channel}'")
-        while True:
-            if select.select([conn], [], [], 5) == ([], [], []):
-                continue
-            conn.poll()
-            while conn.notifies:
-                notify = conn.notifies.pop(0)
-                try:
-                    data = json.loads(notify.payload)
-                    print(data)
-                    context = data.get('event')
-                    ProcessNotifications(context, data).run()
-                except Exception as e:
-                    print(f"Error procesando notificación: {e}")
+        asyncio.run(listener.run())
     except Exception as e:
         print(f"Error al iniciar listener: {e}")
-    
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Módulo de utilidades para paginación por cursor (keyset) y respuestas JSON en streaming.
+Los cursores son tokens opacos (base64 url-safe) con los valores de la clave de ordenamiento de la última fila entregada.
+"""
+import base64
+import json
+from flask import current_app
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(*values) -> str:
+    """Genera el token de cursor a partir de los valores de la clave de ordenamiento."""
+    raw = json.dumps(list(values), separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token: str | None, size: int = 1) -> list | None:
+    """Decodifica un token de cursor con `size` valores. Lanza ValueError si el token no es válido."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if (not isinstance(values, list) or len(values) != size
+            or not all(isinstance(value, (int, float, str)) for value in values)):
+        raise ValueError("Cursor inválido")
+    return values
+
+def parse_limit(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Valida el parámetro `limit`. Lanza ValueError si no es un entero positivo."""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro limit debe ser un entero")
+    if limit < 1:
+        raise ValueError("El parámetro limit debe ser mayor que cero")
+    return min(limit, maximum)
+
+def split_page(records: list, limit: int, cursor_key) -> tuple[list, str | None]:
+    """
+    Separa la fila extra pedida para saber si hay más resultados y genera el siguiente cursor.
+    Args:
+        records (list): Registros obtenidos con `limit + 1`.
+        limit (int): Tamaño de la página.
+        cursor_key (callable): Devuelve la tupla de la clave de ordenamiento de un registro.
+    """
+    if len(records) <= limit:
+        return records, None
+    page = records[:limit]
+    return page, encode_cursor(*cursor_key(page[-1]))
+
+def stream_json_array(records, prefix: str = '', suffix: str = '', chunk_size: int = 100):
+    """
+    Genera un arreglo JSON fragmento a fragmento a partir de un iterable de registros,
+    sin construir la respuesta completa en memoria.
+    Args:
+        records (iterable): Registros (namedtuple) a serializar.
+        prefix (str): Texto antes del arreglo, por ejemplo '{"clubs_list":'.
+        suffix (str): Texto después del arreglo, por ejemplo '}'.
+        chunk_size (int): Registros por fragmento enviado al socket.
+    """
+    dumps = current_app.json.dumps
+    chunk = [prefix + '[']
+    separator = ''
+    for record in records:
+        chunk.append(separator + dumps(record._asdict()))
+        separator = ','
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(']' + suffix)
+    yield ''.join(chunk)
@@ -0,0 +1,191 @@
+"""
+Módulo ejecutor de procedimientos almacenados.
+Centraliza la llamada a funciones/procedimientos de PostgreSQL usando el pool de conexiones
+y convierte las filas en registros compactos (namedtuple) en lugar de diccionarios por fila.
+El mapeo de columnas se construye una sola vez por procedimiento a partir de `cursor.description` y se reutiliza.
+"""
+import itertools
+import threading
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from utils.db import db_connection
+
+
+def isoformat(value):
+    """Convierte fechas a texto ISO 8601."""
+    return value.isoformat()
+
+
+class RowMapper:
+    """Convierte filas de psycopg2 en registros del tipo asociado a un procedimiento."""
+    __slots__ = ('record_type', 'width', '_converters', '_truncate')
+
+    def __init__(self, record_type, width: int, converters: tuple, truncate: bool):
+        """
+        Args:
+            record_type (type): namedtuple con los campos del registro.
+            width (int): Número de columnas que se conservan de cada fila.
+            converters (tuple): Pares (índice, función) que se aplican a valores no nulos.
+            truncate (bool): Si las filas traen más columnas que el registro y deben recortarse.
+        """
+        self.record_type = record_type
+        self.width = width
+        self._converters = converters
+        self._truncate = truncate
+
+    def __call__(self, row):
+        if self._truncate:
+            row = row[:self.width]
+        if self._converters:
+            row = list(row)
+            for index, convert in self._converters:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+        return self.record_type._make(row)
+
+
+_mappers = {}
+_mappers_lock = threading.Lock()
+_cursor_ids = itertools.count()
+
+def _record_name(procedure: str) -> str:
+    """Nombre de la clase del registro a partir del nombre del procedimiento."""
+    name = procedure.rsplit('.', 1)[-1]
+    return ''.join(ch if ch.isalnum() else '_' for ch in name) or 'Record'
+
+def get_mapper(procedure: str, description, fields: tuple = None, converters: dict = None) -> RowMapper:
+    """
+    Devuelve el mapeador de filas del procedimiento, creándolo la primera vez.
+    Args:
+        procedure (str): Nombre del procedimiento.
+        description: `cursor.description` de la consulta.
+        fields (tuple, optional): Nombres de campo a usar en lugar de los nombres de columna, por posición.
+        converters (dict, optional): Funciones de conversión por nombre de campo.
+    """
+    key = (procedure, fields, tuple(converters.items()) if converters else ())
+    mapper = _mappers.get(key)
+    if mapper is not None and (fields is not None or mapper.width == len(description)):
+        return mapper
+
+    columns = len(description)
+    names = tuple(fields) if fields is not None else tuple(desc[0] for desc in description)
+    if len(names) > columns:
+        raise ValueError(f"{procedure} devuelve {columns} columnas pero se esperaban {len(names)}")
+    record_type = namedtuple(_record_name(procedure), names, rename=True)
+    index_of = {name: i for i, name in enumerate(record_type._fields)}
+    converter_pairs = tuple((index_of[name], fn) for name, fn in (converters or {}).items() if name in index_of)
+    mapper = RowMapper(record_type, len(names), converter_pairs, truncate=len(names) < columns)
+    with _mappers_lock:
+        _mappers[key] = mapper
+    return mapper
+
+
+@contextmanager
+def transaction():
+    """
+    Abre una transacción sobre una conexión del pool para ejecutar varios procedimientos de forma atómica.
+    Se confirma al salir del bloque sin errores y se revierte si ocurre una excepción.
+    Uso:
+        with sp.transaction() as conn:
+            sp.fetch_row('public.fn_...', (...), conn=conn)
+    """
+    with db_connection() as conn:
+        yield conn
+        conn.commit()
+
+@contextmanager
+def snapshot():
+    """
+    Abre una transacción de solo lectura REPEATABLE READ: todos los procedimientos ejecutados con la conexión
+    ven la misma foto de la base de datos, aunque sean funciones VOLATILE (que en READ COMMITTED toman una foto
+    nueva en cada consulta). Al salir se revierte; no hay nada que confirmar.
+    Uso:
+        with sp.snapshot() as conn:
+            sp.fetch_value('public.fn_...', (...), conn=conn)
+    """
+    with db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+def _connection(conn):
+    """Usa la conexión de una transacción en curso o toma una del pool."""
+    return nullcontext(conn) if conn is not None else db_connection()
+
+def fetch_all(procedure: str, params: tuple = (), fields: tuple = None, converters: dict = None, conn=None) -> list:
+    """Ejecuta el procedimiento y devuelve todas las filas como registros.
+    Si se pasa `conn` (de `transaction()`), se ejecuta dentro de esa transacción."""
+    with _connection(conn) as connection, connection.cursor() as cursor:
+        cursor.callproc(procedure, params)
+        rows = cursor.fetchall()
+        mapper = get_mapper(procedure, cursor.description, fields, converters)
+    return [mapper(row) for row in rows]
+
+def stream(procedure: str, params: tuple = (), fields: tuple = None, converters: dict = None, itersize: int = 500):
+    """
+    Ejecuta el procedimiento con un cursor con nombre (del lado del servidor) y entrega los registros
+    a medida que se leen, en bloques de `itersize` filas. La conexión vuelve al pool al agotar o cerrar el generador.
+    """
+    placeholders = ', '.join(['%s'] * len(params))
+    with db_connection() as conn, conn.cursor(name=f"cur_{_record_name(procedure)}_{next(_cursor_ids)}") as cursor:
+        cursor.itersize = itersize
+        cursor.execute(f"SELECT * FROM {procedure}({placeholders})", params)
+        mapper = None
+        for row in cursor:
+            if mapper is None:
+                mapper = get_mapper(procedure, cursor.description, fields, converters)
+            yield mapper(row)
+
+def fetch_page(procedure: str, params: tuple, size: int, fields: tuple = None, converters: dict = None) -> list:
+    """Lee como máximo `size` registros del procedimiento mediante un cursor con nombre y libera la conexión."""
+    records = stream(procedure, params, fields, converters, itersize=size)
+    try:
+        return list(itertools.islice(records, size))
+    finally:
+        records.close()
+
+def fetch_one(procedure: str, params: tuple = (), fields: tuple = None, converters: dict = None):
+    """Ejecuta el procedimiento y devuelve la primera fila como registro, o None si no hay filas."""
+    with db_connection() as conn, conn.cursor() as cursor:
+        cursor.callproc(procedure, params)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return get_mapper(procedure, cursor.description, fields, converters)(row)
+
+def fetch_row(procedure: str, params: tuple = (), commit: bool = False, conn=None) -> tuple | None:
+    """Ejecuta el procedimiento y devuelve la primera fila sin mapear.
+    Se usa para los procedimientos que devuelven (mensaje, éxito) o similares.
+    Si se pasa `conn` (de `transaction()`), se ejecuta dentro de esa transacción y no se confirma aquí."""
+    with _connection(conn) as connection, connection.cursor() as cursor:
+        cursor.callproc(procedure, params)
+        row = cursor.fetchone()
+        if commit and conn is None:
+            connection.commit()
+    return row
+
+def fetch_value(procedure: str, params: tuple = (), commit: bool = False, conn=None):
+    """Ejecuta el procedimiento y devuelve la primera columna de la primera fila (por ejemplo un JSON)."""
+    row = fetch_row(procedure, params, commit, conn)
+    return row[0] if row else None
+
+def call(statement: str, params: tuple = (), commit: bool = True, conn=None) -> tuple | None:
+    """Ejecuta una sentencia (por ejemplo `CALL public.sp_...`) y devuelve la primera fila, si existe."""
+    with _connection(conn) as connection, connection.cursor() as cursor:
+        cursor.execute(statement, params)
+        row = cursor.fetchone() if cursor.description else None
+        if commit and conn is None:
+            connection.commit()
+    return row
+
+
+def to_dict(record) -> dict | None:
+    """Convierte un registro en diccionario para serializarlo."""
+    return record._asdict() if record is not None else None
+
+def to_dicts(records) -> list:
+    """Convierte una lista de registros en una lista de diccionarios para serializarla."""
+    return [record._asdict() for record in records]
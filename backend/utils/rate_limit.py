@@ -0,0 +1,213 @@
+"""
+Módulo de limitación de peticiones (token bucket).
+Cada clave (IP, usuario) tiene un balde con `capacity` fichas que se recarga a `rate` fichas por segundo;
+cada intento consume una ficha y, sin fichas, se rechaza sin hacer trabajo (consultas ni hashing).
+Los baldes (y los pocos valores que acompañan al límite, como la IP de confianza de cada usuario) se guardan en
+un BucketBackend intercambiable: LocalBucketBackend los mantiene en la memoria del proceso; para compartirlos
+entre workers basta con otra implementación de la misma interfaz (p. ej. sobre Redis).
+"""
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class BucketBackend(ABC):
+    """Interfaz de almacenamiento de los baldes."""
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, rate: float) -> float:
+        """
+        Consume una ficha del balde `key`.
+        Returns:
+            float: 0 si se consumió; si no había fichas, segundos hasta que haya una.
+        """
+
+    @abstractmethod
+    def refund(self, key: str, capacity: float):
+        """Devuelve al balde `key` una ficha consumida (sin superar `capacity`)."""
+
+    @abstractmethod
+    def reset(self, key: str):
+        """Vuelve a llenar el balde `key`."""
+
+    @abstractmethod
+    def get_value(self, key: str) -> str | None:
+        """Valor guardado en `key`, o None si no hay."""
+
+    @abstractmethod
+    def set_value(self, key: str, value: str):
+        """Guarda `value` en `key`."""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Cantidad de baldes guardados."""
+
+
+class LocalBucketBackend(BucketBackend):
+    """Baldes en memoria del proceso, con un máximo de claves (se descartan las menos usadas, que equivale a llenarlas)."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def refund(self, key: str, capacity: float):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets[key] = (min(capacity, bucket[0] + 1), bucket[1])
+
+    def get_value(self, key: str) -> str | None:
+        with self._lock:
+            return self._values.get(key)
+
+    def set_value(self, key: str, value: str):
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = value
+            while len(self._values) > self.max_keys:
+                self._values.popitem(last=False)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class TokenBucketLimiter:
+    """Limitador de un tipo de clave (p. ej. IP) con su capacidad y velocidad de recarga."""
+
+    def __init__(self, name: str, capacity: int, per_minute: float, backend: BucketBackend):
+        """
+        Args:
+            name (str): Prefijo de las claves y nombre en las métricas.
+            capacity (int): Intentos seguidos permitidos (ráfaga).
+            per_minute (float): Intentos por minuto que se recuperan.
+            backend (BucketBackend): Almacenamiento de los baldes.
+        Lanza ValueError si `capacity` o `per_minute` no son positivos.
+        """
+        if capacity <= 0 or per_minute <= 0:
+            raise ValueError(f"Límite {name}: la capacidad y los intentos por minuto deben ser mayores que cero")
+        self.name = name
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.backend = backend
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str) -> float:
+        """Registra un intento; devuelve 0 si se permite o los segundos a esperar si se rechaza."""
+        wait = self.backend.consume(f"{self.name}:{key}", self.capacity, self.rate)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def refund(self, key: str):
+        """Devuelve la ficha de un intento admitido que no debe contar (p. ej. un inicio de sesión correcto)."""
+        self.backend.refund(f"{self.name}:{key}", self.capacity)
+
+    def reset(self, key: str):
+        self.backend.reset(f"{self.name}:{key}")
+
+    def stats(self) -> dict:
+        return {'capacity': self.capacity, 'per_minute': self.rate * 60,
+                'allowed': self.allowed, 'rejected': self.rejected}
+
+
+class LoginAdmission:
+    """
+    Control de admisión de inicios de sesión por IP y por usuario/correo.
+    El límite por IP frena a un atacante que prueba muchas cuentas; el límite por usuario frena los intentos
+    distribuidos sobre una misma cuenta. Ambos se cobran al admitir el intento (antes de verificar, para que
+    los intentos simultáneos no superen el límite) y un inicio de sesión correcto devuelve la ficha del usuario.
+    Para que un atacante que vacía el balde de una cuenta no le impida entrar a su dueño, los intentos desde la
+    IP del último inicio de sesión correcto del usuario se cobran a un balde propio (usuario, IP) con el mismo
+    límite, en lugar del balde compartido: quien comparta esa IP (p. ej. la NAT de la universidad) sigue
+    limitado, solo que en un balde distinto del de los intentos desde el resto de las IP.
+    La IP de confianza se guarda en el BucketBackend, por lo que todos los workers que lo comparten la conocen.
+    """
+
+    def __init__(self, by_ip: TokenBucketLimiter, by_user: TokenBucketLimiter, enabled: bool = True):
+        self.by_ip = by_ip
+        self.by_user = by_user
+        self.enabled = enabled
+
+    @staticmethod
+    def _user_key(identifier: str) -> str:
+        return identifier.strip().lower()
+
+    def _trusted_key(self, user: str) -> str:
+        return f"{self.by_user.name}:trusted:{user}"
+
+    def _user_bucket(self, ip: str, user: str) -> str:
+        """Balde del usuario al que se cobra un intento desde `ip`."""
+        if ip is not None and self.by_user.backend.get_value(self._trusted_key(user)) == ip:
+            return f"{user}@{ip}"
+        return user
+
+    def check(self, ip: str, identifier: str = None) -> int:
+        """Cobra el intento y devuelve 0 si se admite o los segundos (enteros) a indicar en Retry-After."""
+        if not self.enabled:
+            return 0
+        wait = self.by_ip.hit(ip or 'unknown')
+        if not wait and identifier:
+            user = self._user_key(identifier)
+            wait = self.by_user.hit(self._user_bucket(ip, user))
+        return math.ceil(wait)
+
+    def succeeded(self, ip: str, identifier: str):
+        """Devuelve la ficha cobrada al usuario y hace de `ip` su IP de confianza."""
+        if not (self.enabled and identifier):
+            return
+        user = self._user_key(identifier)
+        self.by_user.refund(self._user_bucket(ip, user))
+        if ip is not None:
+            self.by_user.backend.set_value(self._trusted_key(user), ip)
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'keys': self.by_ip.backend.size(),
+            'ip': self.by_ip.stats(),
+            'user': self.by_user.stats()
+        }
+
+
+def _create_backend() -> BucketBackend:
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'local').lower()
+    if backend == 'local':
+        return LocalBucketBackend(max_keys=int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000)))
+    raise ValueError(f"RATE_LIMIT_BACKEND no soportado: {backend}")
+
+_backend = _create_backend()
+
+login_admission = LoginAdmission(
+    by_ip=TokenBucketLimiter('login_ip', int(os.getenv('LOGIN_IP_BURST', 20)),
+                             float(os.getenv('LOGIN_IP_PER_MINUTE', 10)), _backend),
+    by_user=TokenBucketLimiter('login_user', int(os.getenv('LOGIN_USER_BURST', 5)),
+                               float(os.getenv('LOGIN_USER_PER_MINUTE', 2)), _backend),
+    enabled=os.getenv('LOGIN_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+)
@@ -0,0 +1,210 @@
+"""
+Módulo de caché de respuestas para los endpoints públicos de lectura.
+Las respuestas se guardan en memoria por proceso (LRU con límite de bytes), indexadas por ruta y parámetros,
+y se etiquetan con las entidades que contienen ('groups', 'group:5', 'activity:12', ...).
+El hilo de `utils.db_events` escucha el canal 'database_events' y, ante un evento 'entity_changed'
+publicado por fn_notify_entity_changed, descarta solo las entradas con las etiquetas afectadas.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, Response, make_response
+from utils import db_events
+
+
+class _Entry:
+    """Respuesta almacenada."""
+    __slots__ = ('body', 'status', 'mimetype', 'tags', 'size')
+
+    def __init__(self, body: bytes, status: int, mimetype: str, tags: tuple):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.tags = tags
+        self.size = len(body)
+
+
+class ResponseCache:
+    """Caché LRU de respuestas con invalidación por etiquetas."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, enabled: bool = True):
+        """
+        Args:
+            max_bytes (int): Memoria máxima ocupada por los cuerpos almacenados.
+            max_entry_bytes (int): Tamaño máximo de una respuesta para ser almacenada.
+            enabled (bool): Si es False el decorador no almacena ni sirve respuestas.
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._by_tag = {}
+        self._size = 0
+        # Se incrementa en cada invalidación; una respuesta calculada antes de una invalidación no se guarda
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    # --- Almacenamiento ---
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, key, entry: _Entry, generation: int) -> bool:
+        """Guarda la entrada si no hubo invalidaciones desde `generation`. Devuelve si se guardó."""
+        if entry.size > self.max_entry_bytes:
+            return False
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, *tags):
+        """Descarta las entradas etiquetadas con cualquiera de `tags`."""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            for tag in tags:
+                for key in tuple(self._by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        """Descarta todas las entradas."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'listening': db_events.is_listening()
+            }
+
+    # --- Decorador ---
+
+    def cached(self, *tag_templates, daily: bool = False):
+        """
+        Decorador para vistas GET cuya respuesta no depende del usuario.
+        Se aplica debajo de `token_required` para que la autenticación se siga validando en cada petición.
+        Args:
+            *tag_templates (str): Etiquetas de la respuesta; pueden usar los argumentos de la ruta, p. ej. 'group:{club_id}'.
+                La familia de cada etiqueta (texto antes de ':') se agrega automáticamente.
+            daily (bool): Incluir la fecha (UTC, como las ventanas when=today|week) en la clave, para respuestas que dependen del día (p. ej. actividades de hoy).
+        """
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                db_events.ensure_started()
+
+                key = (request.path, tuple(sorted(request.args.items(multi=True))))
+                if daily:
+                    key += (datetime.now(timezone.utc).date().isoformat(),)
+                entry = self.get(key)
+                if entry is not None:
+                    response = Response(entry.body, status=entry.status, mimetype=entry.mimetype)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                generation = self.generation()
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+                tags = expand_tags(tag_templates, kwargs)
+                if response.is_streamed:
+                    response.response = self._tee(response.response, key, response.status_code,
+                                                  response.mimetype, tags, generation)
+                else:
+                    self.put(key, _Entry(response.get_data(), response.status_code, response.mimetype, tags), generation)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def _tee(self, chunks, key, status, mimetype, tags, generation):
+        """Reenvía los fragmentos de una respuesta en streaming y la guarda al terminar si no supera el límite."""
+        body = []
+        size = 0
+        try:
+            for chunk in chunks:
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                if body is not None:
+                    size += len(data)
+                    if size > self.max_entry_bytes:
+                        body = None
+                    else:
+                        body.append(data)
+                yield data
+        finally:
+            # Cerrar el generador original para devolver la conexión al pool si el cliente se desconecta
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+        if body is not None:
+            self.put(key, _Entry(b''.join(body), status, mimetype, tags), generation)
+
+
+def expand_tags(templates, kwargs) -> tuple:
+    """Formatea las etiquetas con los argumentos de la ruta y agrega la familia de cada una."""
+    tags = set()
+    for template in templates:
+        tag = template.format(**kwargs)
+        tags.add(tag)
+        tags.add(tag.split(':', 1)[0])
+    return tuple(tags)
+
+
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+    max_entry_bytes=int(os.getenv('RESPONSE_CACHE_MAX_ENTRY_BYTES', 4 * 1024 * 1024)),
+    enabled=os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+)
+db_events.subscribe('entity_changed', lambda data: response_cache.invalidate(*data.get('tags') or ()))
+db_events.on_reset(response_cache.clear)
@@ -0,0 +1,127 @@
+"""
+Módulo de cupos de actividades.
+La reserva de cupos la hace la base de datos (trigger fn_activity_seats_changed sobre activityparticipants):
+cada inscripción incrementa el contador de activityseats con un UPDATE condicional, por lo que nunca se supera
+ga_max_participants aunque lleguen cientos de inscripciones a la vez. Sin cupos, el trigger lanza check_violation
+con la restricción 'activityseats_capacity' y el mensaje FULL_MESSAGE; fn_join_activity puede dejarlo pasar,
+volver a lanzarlo envuelto (RAISE EXCEPTION 'Error en ...: %', SQLERRM, que pierde el código y la restricción)
+o devolverlo como mensaje, por lo que también se reconoce por el texto.
+Este módulo agrega el camino rápido del backend: cuando una actividad se llena se recuerda en memoria y las
+siguientes inscripciones se rechazan sin tomar una conexión ni esperar el bloqueo de la fila de cupos.
+La marca se descarta con el evento 'entity_changed' de la actividad (alguien se retiró, cambió el máximo, ...),
+al vencer el TTL o si se pierde la conexión del canal 'database_events'; solo se usa mientras el hilo de
+`utils.db_events` está escuchando.
+"""
+import os
+import threading
+import time
+from utils import db_events
+
+CAPACITY_CONSTRAINT = 'activityseats_capacity'
+FULL_MESSAGE = 'La actividad no tiene cupos disponibles'
+
+
+def is_full_message(message) -> bool:
+    """Indica si un mensaje de la base de datos contiene el rechazo por falta de cupos del trigger de reservas."""
+    return isinstance(message, str) and FULL_MESSAGE in message
+
+
+def is_full_error(error: Exception) -> bool:
+    """Indica si un error de psycopg2 es el rechazo por falta de cupos del trigger de reservas (directo o envuelto)."""
+    pgcode = getattr(error, 'pgcode', None)
+    if pgcode == '23514':
+        return getattr(getattr(error, 'diag', None), 'constraint_name', None) == CAPACITY_CONSTRAINT
+    return pgcode == 'P0001' and is_full_message(getattr(getattr(error, 'diag', None), 'message_primary', None))
+
+
+class FullActivityCache:
+    """Actividades que se sabe que están llenas, con vencimiento."""
+
+    def __init__(self, ttl: float, max_activities: int, enabled: bool = True):
+        """
+        Args:
+            ttl (float): Segundos que se considera llena una actividad (red de seguridad además de los eventos).
+            max_activities (int): Actividades guardadas como máximo; al superarlo se descartan las vencidas.
+            enabled (bool): Si es False todas las inscripciones van a la base de datos.
+        """
+        self.ttl = ttl
+        self.max_activities = max_activities
+        self.enabled = enabled
+        self._full = {}
+        #Liberaciones por actividad, para no marcar como llena una actividad que cambió durante la consulta
+        self._releases = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    def is_full(self, activity_id: int) -> bool:
+        """Indica si la actividad se sabe llena; en ese caso la inscripción se puede rechazar sin consultar."""
+        if not self.enabled:
+            return False
+        db_events.ensure_started()
+        if not db_events.is_listening():
+            return False
+        expires = self._full.get(activity_id)
+        if expires is None or expires < time.monotonic():
+            return False
+        self._rejected += 1
+        return True
+
+    def generation(self, activity_id: int) -> tuple:
+        return (self._generation, self._releases.get(activity_id, 0))
+
+    def mark_full(self, activity_id: int, generation: tuple):
+        """Recuerda la actividad como llena si no cambió desde `generation` (ver `generation`)."""
+        if not self.enabled or not db_events.is_listening():
+            return
+        with self._lock:
+            if generation != (self._generation, self._releases.get(activity_id, 0)):
+                return
+            now = time.monotonic()
+            if len(self._full) >= self.max_activities:
+                self._full = {key: expires for key, expires in self._full.items() if expires >= now}
+                if len(self._full) >= self.max_activities:
+                    return
+            self._full[activity_id] = now + self.ttl
+
+    def release(self, activity_id: int):
+        """Descarta la marca de la actividad (se liberó un cupo o cambió su máximo)."""
+        with self._lock:
+            if activity_id not in self._releases and len(self._releases) >= self.max_activities:
+                self._generation += 1
+                self._releases = {}
+            self._releases[activity_id] = self._releases.get(activity_id, 0) + 1
+            self._full.pop(activity_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._releases = {}
+            self._full = {}
+
+    def handle_event(self, data: dict):
+        """Aplica un evento 'entity_changed': las etiquetas 'activity:<id>' liberan la marca de esa actividad."""
+        for tag in data.get('tags') or ():
+            family, _, activity_id = tag.partition(':')
+            if family == 'activity' and activity_id.isdigit():
+                self.release(int(activity_id))
+            elif tag == 'activity':
+                self.clear()
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'listening': db_events.is_listening(),
+            'full_activities': len(self._full),
+            'rejected': self._rejected
+        }
+
+
+full_activities = FullActivityCache(
+    ttl=float(os.getenv('SEATS_FULL_CACHE_TTL', 5)),
+    max_activities=int(os.getenv('SEATS_FULL_CACHE_MAX_ACTIVITIES', 10000)),
+    enabled=os.getenv('SEATS_FULL_CACHE_ENABLED', 'true').lower() == 'true'
+)
+
+db_events.subscribe('entity_changed', full_activities.handle_event)
+db_events.on_reset(full_activities.clear)
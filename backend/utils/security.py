@@ -1,16 +1,90 @@
 import bcrypt
 import random
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 load_dotenv()
 
+#Costo de bcrypt para los hashes nuevos; los hashes guardados con otro costo se recalculan al iniciar sesión
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+#bcrypt libera el GIL, por lo que cada hilo del pool usa un núcleo; el pool limita cuántos núcleos ocupa a la vez
+_hash_executor = ThreadPoolExecutor(max_workers=int(os.getenv('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1),
+                                    thread_name_prefix='bcrypt')
+#Operaciones aceptadas a la vez (en curso o en espera) y segundos máximos de espera por una
+_hash_slots = threading.BoundedSemaphore(int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+_COST_PATTERN = re.compile(r'^\$2[abxy]?\$(\d{2})\$')
+
+
+class PasswordHashBusyError(Exception):
+    """El pool de hashing está saturado: hay demasiados inicios de sesión o registros en curso."""
+    pass
+
+
+def _run_hashing(fn, *args):
+    """Ejecuta `fn` en el pool de hashing y espera el resultado.
+    Lanza PasswordHashBusyError si no hay capacidad o si el resultado no llega a tiempo; la espera del cupo y la
+    del resultado comparten un solo plazo de PASSWORD_HASH_TIMEOUT segundos."""
+    deadline = time.monotonic() + PASSWORD_HASH_TIMEOUT
+    if not _hash_slots.acquire(timeout=PASSWORD_HASH_TIMEOUT):
+        raise PasswordHashBusyError("El servicio está ocupado, intente nuevamente")
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    #El cupo se libera cuando bcrypt termina, aunque ya no se espere el resultado, para que el límite se cumpla
+    future.add_done_callback(lambda _: _hash_slots.release())
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        raise PasswordHashBusyError("El servicio está ocupado, intente nuevamente")
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+def _checkpw(input_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(input_password.encode(), hashed_password.encode())
+
 def hash_password(password: str) -> str:
     """Codificacion de la contraseña"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return _run_hashing(_hashpw, password, BCRYPT_ROUNDS)
 
 def validate_password(input_password: str, hashed_password: str) -> bool:
     """Validar si la contraseña es correcta"""
-    return bcrypt.checkpw(input_password.encode(), hashed_password.encode())
+    return _run_hashing(_checkpw, input_password, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash se generó con un costo distinto de BCRYPT_ROUNDS."""
+    match = _COST_PATTERN.match(hashed_password or '')
+    return match is not None and int(match.group(1)) != BCRYPT_ROUNDS
+
+def submit_rehash(password: str, on_hashed) -> bool:
+    """
+    Calcula en segundo plano el hash de la contraseña con el costo actual y llama a `on_hashed(nuevo_hash)`.
+    No espera el resultado; si el pool está saturado no hace nada (se reintentará en el próximo inicio de sesión).
+    Devuelve si se programó.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        return False
+
+    def rehash():
+        try:
+            on_hashed(_hashpw(password, BCRYPT_ROUNDS))
+        except Exception as e:
+            print(f"Error recalculando el hash de la contraseña: {e}")
+        finally:
+            _hash_slots.release()
+
+    try:
+        _hash_executor.submit(rehash)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    return True
 
 def gen_random_fp_code() -> int:
     return str(random.randint(100000, 999999))
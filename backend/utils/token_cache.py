@@ -0,0 +1,138 @@
+"""
+Módulo de caché de refresh tokens.
+Guarda en memoria, por usuario, el resultado de verificar cada jti (activo o revocado) para que /api/auth/refresh
+no consulte la base de datos en cada renovación del access token.
+Las entradas se cargan bajo demanda con la primera verificación de cada jti y se mantienen coherentes con el
+evento 'refresh_tokens_changed' del canal 'database_events' (ver fn_notify_refresh_tokens):
+- 'created': el jti se registra como activo y los demás jti conocidos del usuario pasan a revocados, porque
+  sp_create_user_refresh_token revoca los tokens anteriores.
+- 'revoked' (cierre de sesión, cambio o restablecimiento de contraseña): todos los jti del usuario pasan a revocados.
+La coherencia depende de esos eventos, no del TTL: el cliente renueva una vez por vida del access token
+(ACCESS_TOKEN_EXPIRES, 15 minutos), por lo que un TTL menor haría que casi toda renovación consultara la base de
+datos. Por defecto las entradas duran lo mismo que el refresh token (REFRESH_TOKEN_EXPIRES); el TTL solo acota
+cuánto se ve una revocación hecha en la base de datos sin emitir el evento. Con un TTL menor que
+ACCESS_TOKEN_EXPIRES la caché no acierta nunca en renovaciones sucesivas.
+La caché solo se usa mientras el hilo de `utils.db_events` está escuchando; si la conexión se pierde se vacía,
+porque los eventos de ese intervalo no se pueden recuperar, y las verificaciones vuelven a la base de datos.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from utils import db_events
+from utils.security import refresh_token_ttl
+
+EVENT = 'refresh_tokens_changed'
+REVOKED = ('Token revocado', False)
+
+
+class RefreshTokenCache:
+    """Caché LRU por usuario de los resultados de verificación de refresh tokens."""
+
+    def __init__(self, ttl: float, max_users: int, enabled: bool = True):
+        """
+        Args:
+            ttl (float): Segundos que se conserva cada resultado (red de seguridad además de los eventos).
+            max_users (int): Usuarios guardados como máximo; se descartan los menos usados.
+            enabled (bool): Si es False todas las verificaciones van a la base de datos.
+        """
+        self.ttl = ttl
+        self.max_users = max_users
+        self.enabled = enabled
+        self._users = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def lookup(self, user_id: int, jti: str) -> tuple | None:
+        """Resultado guardado (mensaje, éxito) del jti, o None si hay que consultar la base de datos."""
+        if not self.enabled:
+            return None
+        db_events.ensure_started()
+        if not db_events.is_listening():
+            return None
+        with self._lock:
+            tokens = self._users.get(user_id)
+            entry = tokens.get(jti) if tokens is not None else None
+            if entry is None or entry[1] < time.monotonic():
+                self._misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self._hits += 1
+            return entry[0]
+
+    def generation(self) -> int:
+        return self._generation
+
+    def remember(self, user_id: int, jti: str, result: tuple, generation: int):
+        """Guarda el resultado de la base de datos si no hubo revocaciones desde `generation`."""
+        if not self.enabled or not db_events.is_listening():
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._set(user_id, jti, (tuple(result), time.monotonic() + self.ttl))
+
+    def token_created(self, user_id: int, jti: str):
+        """Registra el jti como activo; los anteriores del usuario quedan revocados."""
+        with self._lock:
+            self._revoke(user_id)
+            self._set(user_id, jti, (('Token válido', True), time.monotonic() + self.ttl))
+
+    def user_revoked(self, user_id: int):
+        """Marca como revocados todos los jti conocidos del usuario."""
+        with self._lock:
+            self._revoke(user_id)
+
+    def _revoke(self, user_id: int):
+        self._generation += 1
+        tokens = self._users.get(user_id)
+        if tokens:
+            expires = time.monotonic() + self.ttl
+            for jti in tokens:
+                tokens[jti] = (REVOKED, expires)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._users.clear()
+
+    def _set(self, user_id: int, jti: str, entry: tuple):
+        tokens = self._users.get(user_id)
+        if tokens is None:
+            tokens = self._users[user_id] = {}
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+        tokens[jti] = entry
+
+    def handle_event(self, data: dict):
+        """Aplica un evento 'refresh_tokens_changed'."""
+        user_id = data.get('user_id')
+        if user_id is None:
+            return
+        if data.get('action') == 'created' and data.get('jti'):
+            self.token_created(user_id, data['jti'])
+        else:
+            self.user_revoked(user_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'listening': db_events.is_listening(),
+                'users': len(self._users),
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+refresh_tokens = RefreshTokenCache(
+    ttl=float(os.getenv('REFRESH_TOKEN_CACHE_TTL') or refresh_token_ttl()),
+    max_users=int(os.getenv('REFRESH_TOKEN_CACHE_MAX_USERS', 50000)),
+    enabled=os.getenv('REFRESH_TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+)
+
+db_events.subscribe(EVENT, refresh_tokens.handle_event)
+db_events.on_reset(refresh_tokens.clear)
@@ -7,39 +7,66 @@ import Http from '@/services/http';
 import type { 
   ImageUploadRequestDTO, 
   ImageUploadResponseDTO, 
-  ProfilePhotoUpdateDTO 
+  ProfilePhotoUpdateDTO,
+  UploadJobDTO
 } from './models/Image';
 
+/** Espera máxima por una subida de foto antes de darla por fallida */
+const UPLOAD_WAIT_MS = 60000;
+
 class ImageDao {
   /**
-   * Sube una imagen genérica a /api/images/upload
+   * Actualiza la foto de perfil del usuario autenticado (PUT /api/users/me/photo).
+   * El backend procesa la imagen en segundo plano: se espera a que termine la subida.
    */
-  static async uploadGenericImage(file: File): Promise<{ imageUrl: string }> {
+  static async updateProfilePhoto(file: File): Promise<ImageUploadResponseDTO> {
     const formData = new FormData();
-    formData.append('image', file);
+    formData.append('profileImage', file);
 
-    const response = await Http.post('/api/images/upload', formData, {
+    const response = await Http.put<UploadJobDTO>('/api/users/me/photo', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    return { imageUrl: await ImageDao.waitForUpload(response.data.job_id) };
   }
 
   /**
-   * Actualiza la foto de perfil del usuario autenticado usando FormData
-   * Implementa la especificación del endpoint /api/users/profile-picture
+   * Actualiza la foto de un club del que el usuario es dueño (PUT /api/groups/:id/photo).
    */
-  static async updateProfilePhoto(file: File): Promise<{ imageUrl: string }> {
+  static async updateClubPhoto(clubId: number, file: File): Promise<ImageUploadResponseDTO> {
     const formData = new FormData();
-    formData.append('profileImage', file);
+    formData.append('image', file);
 
-    const response = await Http.post('/api/users/me/change-profile-picture', formData, {
+    const response = await Http.put<UploadJobDTO>(`/api/groups/${clubId}/photo`, formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    return { imageUrl: await ImageDao.waitForUpload(response.data.job_id) };
+  }
+
+  /**
+   * Consulta GET /api/uploads/:jobId hasta que la subida termina y devuelve la URL de la foto.
+   * Respeta el encabezado Retry-After del backend entre consultas.
+   */
+  static async waitForUpload(jobId: string): Promise<string> {
+    const deadline = Date.now() + UPLOAD_WAIT_MS;
+    while (true) {
+      const response = await Http.get<UploadJobDTO>(`/api/uploads/${jobId}`);
+      const job = response.data;
+      if (job.status === 'done' && job.profile_photo_url) {
+        return job.profile_photo_url;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'No se pudo subir la imagen.');
+      }
+      if (Date.now() >= deadline) {
+        throw new Error('La subida de la imagen está tardando demasiado, intente nuevamente.');
+      }
+      const retryAfter = Number(response.headers['retry-after']) || 1;
+      await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+    }
   }
 
   /**
@@ -19,6 +19,17 @@ export interface ImageUploadResponseDTO {
   imageUrl: string;
 }
 
+/**
+ * DTO del estado de una subida de foto (PUT .../photo responde 202 con job_id; GET /api/uploads/:id)
+ */
+export interface UploadJobDTO {
+  job_id: string;
+  status: 'pending' | 'done' | 'failed';
+  status_url?: string;
+  profile_photo_url?: string | null;
+  error?: string | null;
+}
+
 /**
  * DTO para actualizar foto de perfil
  */
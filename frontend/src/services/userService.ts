@@ -1,4 +1,6 @@
 import http from './http';
+import ImageDao from './dao/ImageDao';
+import type { UploadJobDTO } from './dao/models/Image';
 
 export const userService = {
   /**
@@ -12,13 +14,14 @@ export const userService = {
     formData.append('profileImage', file);
 
     try {
-      const response = await http.post<{ imageUrl: string }>('/users/profile-picture', formData, {
+      const response = await http.put<UploadJobDTO>('/api/users/me/photo', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
         onUploadProgress,
       });
-      return response.data.imageUrl;
+      // El backend procesa la imagen en segundo plano y responde con el ID de la subida
+      return await ImageDao.waitForUpload(response.data.job_id);
     } catch (error) {
       console.error('Error al subir la imagen de perfil:', error);
       throw new Error('No se pudo actualizar la imagen de perfil.');